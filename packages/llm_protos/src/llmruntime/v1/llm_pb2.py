@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x17llmruntime/v1/llm.proto\x12\rllmruntime.v1\"\xb8\x02\n\x0fGenerateRequest\x12\r\n\x05model\x18\x01 \x01(\t\x12\x0e\n\x06prompt\x18\x02 \x01(\t\x12\x0e\n\x06system\x18\x03 \x01(\t\x12<\n\x07options\x18\x04 \x03(\x0b\x32+.llmruntime.v1.GenerateRequest.OptionsEntry\x12\x11\n\tjson_mode\x18\x05 \x01(\x08\x12\x13\n\x0bjson_schema\x18\x06 \x01(\t\x12\x12\n\nmax_tokens\x18\x07 \x01(\x05\x12\x13\n\x0btemperature\x18\x08 \x01(\x02\x12\x0f\n\x07user_id\x18\t \x01(\t\x12\x12\n\nrequest_id\x18\n \x01(\t\x12\x12\n\ntimeout_ms\x18\x0b \x01(\x05\x1a.\n\x0cOptionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"l\n\x10GenerateResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\x12\x10\n\x08provider\x18\x03 \x01(\t\x12\x15\n\rfinish_reason\x18\x04 \x01(\t\x12\x12\n\nrequest_id\x18\x05 \x01(\t\"d\n\rGenerateChunk\x12\r\n\x05\x64\x65lta\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\x12\x10\n\x08provider\x18\x03 \x01(\t\x12\x0c\n\x04\x64one\x18\x04 \x01(\x08\x12\x15\n\rfinish_reason\x18\x05 \x01(\t\"\x0f\n\rHealthRequest\"Q\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x18\n\x10provider_default\x18\x02 \x01(\t\x12\x15\n\rmodel_default\x18\x03 \x01(\t2\xf2\x01\n\nLlmRuntime\x12K\n\x08Generate\x12\x1e.llmruntime.v1.GenerateRequest\x1a\x1f.llmruntime.v1.GenerateResponse\x12P\n\x0eGenerateStream\x12\x1e.llmruntime.v1.GenerateRequest\x1a\x1c.llmruntime.v1.GenerateChunk0\x01\x12\x45\n\x06Health\x12\x1c.llmruntime.v1.HealthRequest\x1a\x1d.llmruntime.v1.HealthResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x17llmruntime/v1/llm.proto\x12\rllmruntime.v1\"\xdd\x02\n\x0fGenerateRequest\x12\r\n\x05model\x18\x01 \x01(\t\x12\x0e\n\x06prompt\x18\x02 \x01(\t\x12\x0e\n\x06system\x18\x03 \x01(\t\x12<\n\x07options\x18\x04 \x03(\x0b\x32+.llmruntime.v1.GenerateRequest.OptionsEntry\x12\x11\n\tjson_mode\x18\x05 \x01(\x08\x12\x13\n\x0bjson_schema\x18\x06 \x01(\t\x12\x12\n\nmax_tokens\x18\x07 \x01(\x05\x12\x13\n\x0btemperature\x18\x08 \x01(\x02\x12\x0f\n\x07user_id\x18\t \x01(\t\x12\x12\n\nrequest_id\x18\n \x01(\t\x12\x12\n\ntimeout_ms\x18\x0b \x01(\x05\x12\x0f\n\x07\x63ontext\x18\x0c \x01(\t\x12\x12\n\nsession_id\x18\r \x01(\t\x1a.\n\x0cOptionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"l\n\x10GenerateResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\x12\x10\n\x08provider\x18\x03 \x01(\t\x12\x15\n\rfinish_reason\x18\x04 \x01(\t\x12\x12\n\nrequest_id\x18\x05 \x01(\t\"d\n\rGenerateChunk\x12\r\n\x05\x64\x65lta\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\x12\x10\n\x08provider\x18\x03 \x01(\t\x12\x0c\n\x04\x64one\x18\x04 \x01(\x08\x12\x15\n\rfinish_reason\x18\x05 \x01(\t\"\x0f\n\rHealthRequest\"Q\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x18\n\x10provider_default\x18\x02 \x01(\t\x12\x15\n\rmodel_default\x18\x03 \x01(\t\"\x0f\n\rModelsRequest\"\x94\x03\n\tModelInfo\x12\x10\n\x08provider\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\x12\r\n\x05state\x18\x03 \x01(\t\x12\x19\n\x11last_used_unix_ms\x18\x04 \x01(\x03\x12\x19\n\x11loaded_at_unix_ms\x18\x05 \x01(\x03\x12\x17\n\x0fload_latency_ms\x18\x06 \x01(\x05\x12\r\n\x05\x65rror\x18\x07 \x01(\t\x12\x17\n\x0f\x65wma_latency_ms\x18\x08 \x01(\x02\x12\x12\n\nerror_rate\x18\t \x01(\x02\x12\x10\n\x08inflight\x18\n \x01(\x05\x12\x0f\n\x07\x62reaker\x18\x0b \x01(\t\x12\x17\n\x0fprefix_requests\x18\x0c \x01(\x03\x12\x13\n\x0bprefix_hits\x18\r \x01(\x03\x12\x1c\n\x14prefix_continuations\x18\x0e \x01(\x03\x12\x1b\n\x13prefix_reused_chars\x18\x0f \x01(\x03\x12\x1c\n\x14prefix_prefill_chars\x18\x10 \x01(\x03\x12\x0e\n\x06hedged\x18\x11 \x01(\x03\x12\x12\n\nhedge_wins\x18\x12 \x01(\x03\":\n\x0eModelsResponse\x12(\n\x06models\x18\x01 \x03(\x0b\x32\x18.llmruntime.v1.ModelInfo2\xb9\x02\n\nLlmRuntime\x12K\n\x08Generate\x12\x1e.llmruntime.v1.GenerateRequest\x1a\x1f.llmruntime.v1.GenerateResponse\x12P\n\x0eGenerateStream\x12\x1e.llmruntime.v1.GenerateRequest\x1a\x1c.llmruntime.v1.GenerateChunk0\x01\x12\x45\n\x06Health\x12\x1c.llmruntime.v1.HealthRequest\x1a\x1d.llmruntime.v1.HealthResponse\x12\x45\n\x06Models\x12\x1c.llmruntime.v1.ModelsRequest\x1a\x1d.llmruntime.v1.ModelsResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,17 +34,23 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GENERATEREQUEST_OPTIONSENTRY']._loaded_options = None
   _globals['_GENERATEREQUEST_OPTIONSENTRY']._serialized_options = b'8\001'
   _globals['_GENERATEREQUEST']._serialized_start=43
-  _globals['_GENERATEREQUEST']._serialized_end=355
-  _globals['_GENERATEREQUEST_OPTIONSENTRY']._serialized_start=309
-  _globals['_GENERATEREQUEST_OPTIONSENTRY']._serialized_end=355
-  _globals['_GENERATERESPONSE']._serialized_start=357
-  _globals['_GENERATERESPONSE']._serialized_end=465
-  _globals['_GENERATECHUNK']._serialized_start=467
-  _globals['_GENERATECHUNK']._serialized_end=567
-  _globals['_HEALTHREQUEST']._serialized_start=569
-  _globals['_HEALTHREQUEST']._serialized_end=584
-  _globals['_HEALTHRESPONSE']._serialized_start=586
-  _globals['_HEALTHRESPONSE']._serialized_end=667
-  _globals['_LLMRUNTIME']._serialized_start=670
-  _globals['_LLMRUNTIME']._serialized_end=912
+  _globals['_GENERATEREQUEST']._serialized_end=392
+  _globals['_GENERATEREQUEST_OPTIONSENTRY']._serialized_start=346
+  _globals['_GENERATEREQUEST_OPTIONSENTRY']._serialized_end=392
+  _globals['_GENERATERESPONSE']._serialized_start=394
+  _globals['_GENERATERESPONSE']._serialized_end=502
+  _globals['_GENERATECHUNK']._serialized_start=504
+  _globals['_GENERATECHUNK']._serialized_end=604
+  _globals['_HEALTHREQUEST']._serialized_start=606
+  _globals['_HEALTHREQUEST']._serialized_end=621
+  _globals['_HEALTHRESPONSE']._serialized_start=623
+  _globals['_HEALTHRESPONSE']._serialized_end=704
+  _globals['_MODELSREQUEST']._serialized_start=706
+  _globals['_MODELSREQUEST']._serialized_end=721
+  _globals['_MODELINFO']._serialized_start=724
+  _globals['_MODELINFO']._serialized_end=1128
+  _globals['_MODELSRESPONSE']._serialized_start=1130
+  _globals['_MODELSRESPONSE']._serialized_end=1188
+  _globals['_LLMRUNTIME']._serialized_start=1191
+  _globals['_LLMRUNTIME']._serialized_end=1504
 # @@protoc_insertion_point(module_scope)
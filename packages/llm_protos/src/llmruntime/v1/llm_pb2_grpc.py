@@ -50,6 +50,11 @@ class LlmRuntimeStub(object):
                 request_serializer=llmruntime_dot_v1_dot_llm__pb2.HealthRequest.SerializeToString,
                 response_deserializer=llmruntime_dot_v1_dot_llm__pb2.HealthResponse.FromString,
                 _registered_method=True)
+        self.Models = channel.unary_unary(
+                '/llmruntime.v1.LlmRuntime/Models',
+                request_serializer=llmruntime_dot_v1_dot_llm__pb2.ModelsRequest.SerializeToString,
+                response_deserializer=llmruntime_dot_v1_dot_llm__pb2.ModelsResponse.FromString,
+                _registered_method=True)
 
 
 class LlmRuntimeServicer(object):
@@ -74,6 +79,13 @@ class LlmRuntimeServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def Models(self, request, context):
+        """Per-model load state as seen by the runtime (warm-up / keep-alive).
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LlmRuntimeServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -92,6 +104,11 @@ def add_LlmRuntimeServicer_to_server(servicer, server):
                     request_deserializer=llmruntime_dot_v1_dot_llm__pb2.HealthRequest.FromString,
                     response_serializer=llmruntime_dot_v1_dot_llm__pb2.HealthResponse.SerializeToString,
             ),
+            'Models': grpc.unary_unary_rpc_method_handler(
+                    servicer.Models,
+                    request_deserializer=llmruntime_dot_v1_dot_llm__pb2.ModelsRequest.FromString,
+                    response_serializer=llmruntime_dot_v1_dot_llm__pb2.ModelsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'llmruntime.v1.LlmRuntime', rpc_method_handlers)
@@ -184,3 +201,30 @@ class LlmRuntime(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def Models(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/llmruntime.v1.LlmRuntime/Models',
+            llmruntime_dot_v1_dot_llm__pb2.ModelsRequest.SerializeToString,
+            llmruntime_dot_v1_dot_llm__pb2.ModelsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,104 @@
+# packages/schemas/schemas/fingerprints.py
+"""
+MinHash signatures for near-duplicate detection across applicants.
+
+A signature is NUM_PERM ints: the minimum of each of NUM_PERM hash functions over a
+set of shingles. The fraction of equal positions in two signatures estimates the
+Jaccard similarity of the two sets. The hash functions are seeded constants, so a
+signature computed in one service (bank statements in extract_validate) compares
+with one computed in another (the orchestrator's index), across restarts.
+
+LSH banding: a signature is cut into BANDS bands of ROWS values; two sets with
+Jaccard J share at least one band with probability 1 - (1 - J**ROWS)**BANDS
+(~0.98 at J=0.8, ~0.5 at J=0.5), so candidates come from bucket lookups, not scans.
+"""
+from __future__ import annotations
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, List, Sequence, Set
+import numpy as np
+
+NUM_PERM = 64
+BANDS, ROWS = 16, 4
+
+_P = (1 << 31) - 1  # Mersenne prime: (a * x + b) % _P stays below 2**63 for x, a, b < _P
+_rng = np.random.default_rng(0x5EED_F1A6)
+_A = _rng.integers(1, _P, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, _P, NUM_PERM, dtype=np.uint64)[:, None]
+_CHUNK = 8192  # hashes per step: NUM_PERM x _CHUNK uint64 = 4 MB
+
+
+def token_hashes(tokens: Iterable[str]) -> np.ndarray:
+    """Stable 64-bit hash per distinct token (Python's hash() is salted per process)."""
+    uniq = set(tokens)
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little") for t in uniq),
+        dtype=np.uint64, count=len(uniq),
+    )
+
+
+def minhash(hashes: np.ndarray) -> List[int]:
+    """Signature of a set given as 64-bit hashes of its members; [] for an empty set."""
+    hv = np.asarray(hashes, dtype=np.uint64) % np.uint64(_P)
+    if not hv.size:
+        return []
+    sig = np.full(NUM_PERM, _P, dtype=np.uint64)
+    for start in range(0, hv.size, _CHUNK):
+        part = hv[None, start:start + _CHUNK]
+        sig = np.minimum(sig, ((_A * part + _B) % np.uint64(_P)).min(axis=1))
+    return sig.tolist()
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def pack(sig: Sequence[int]) -> str:
+    """Compact text form of a signature (hex of little-endian uint32s) for key-value stores."""
+    return np.asarray(sig, dtype="<u4").tobytes().hex()
+
+
+def similarities(sig: Sequence[int], packed: Sequence[str]) -> np.ndarray:
+    """similarity(sig, s) for every packed signature s, in one array operation."""
+    if not len(sig) or not len(packed):
+        return np.zeros(len(packed))
+    mat = np.frombuffer(bytes.fromhex("".join(packed)), dtype="<u4").reshape(len(packed), -1)
+    if mat.shape[1] != len(sig):
+        raise ValueError("packed signatures do not match the signature length")
+    return (mat == np.asarray(sig, dtype="<u4")).mean(axis=1)
+
+
+def band_keys(sig: Sequence[int]) -> List[str]:
+    """One LSH bucket id per band ("<band>:<hash>"); [] for an empty signature."""
+    if len(sig) != NUM_PERM:
+        return []
+    arr = np.asarray(sig, dtype="<u4")
+    return [f"{b}:{hashlib.blake2b(arr[b * ROWS:(b + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+            for b in range(BANDS)]
+
+
+# ---------------------------------------------------------------- text
+
+_ADDRESS_WORDS = {
+    "st": "street", "str": "street", "rd": "road", "ave": "avenue", "bldg": "building", "blg": "building",
+    "apt": "apartment", "flat": "apartment", "fl": "floor", "no": "", "nr": "", "po": "pobox", "box": "",
+}
+
+
+def normalize_address(text: str) -> str:
+    """Case/accents/punctuation folded, common abbreviations expanded: 'Bldg. 5, St 12' -> 'building 5 street 12'."""
+    t = unicodedata.normalize("NFKD", text or "")
+    t = "".join(ch for ch in t if not unicodedata.combining(ch)).casefold()
+    words = (_ADDRESS_WORDS.get(w, w) for w in re.split(r"[^\w]+", t))
+    return " ".join(w for w in words if w)
+
+
+def text_shingles(text: str, k: int = 4) -> Set[str]:
+    """Character k-grams (spaces included, so word boundaries count)."""
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
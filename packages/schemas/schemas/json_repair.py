@@ -0,0 +1,152 @@
+# packages/schemas/schemas/json_repair.py
+"""
+Local JSON extraction + repair for LLM output.
+
+Handles the usual failure modes without another LLM round trip:
+  - markdown fences / prose around the payload
+  - trailing commas
+  - output truncated mid-object (max_tokens hit): containers are closed at
+    the last complete value; a trailing string, number or literal that may
+    have been cut short is dropped together with its key
+"""
+from __future__ import annotations
+import json
+import re
+from typing import Any, List, Optional, Tuple, Type, Union
+
+_OPEN = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_VALUE_START = re.compile(r"[\[{]")
+_MAX_REPAIR_TRIES = 32
+_MAX_CANDIDATES = 16
+
+
+def _loads(s: str) -> Any:
+    try:
+        return json.loads(s, strict=False)  # strict=False tolerates raw newlines inside strings
+    except ValueError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", s), strict=False)
+
+
+class IncrementalJSONParser:
+    """
+    Scans text (fed in chunks, e.g. from a token stream) for the first JSON
+    object/array. `feed()` returns True as soon as the top-level value is
+    closed; `close()` returns the parsed value, repairing a truncated tail
+    (`truncated` is then True).
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._stack: List[str] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._pos = 0
+        self.consumed = 0  # characters of input seen, including prose before the value
+        # (index into the buffer, open containers) where cutting yields valid JSON
+        self._safe: List[Tuple[int, str]] = []
+        self.complete = False
+        self.truncated = False
+
+    def feed(self, chunk: str) -> bool:
+        for ch in chunk:
+            if self.complete:
+                break
+            self.consumed += 1
+            if not self._started:
+                if ch not in _OPEN:
+                    continue
+                self._started = True
+            self._buf.append(ch)
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._safe.append((self._pos, "".join(self._stack)))
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in _OPEN:
+                self._stack.append(_OPEN[ch])
+                self._safe.append((self._pos, "".join(self._stack)))
+            elif ch in "}]":
+                if self._stack and self._stack[-1] == ch:
+                    self._stack.pop()
+                if not self._stack:
+                    self.complete = True
+                else:
+                    self._safe.append((self._pos, "".join(self._stack)))
+            elif ch == ",":
+                self._safe.append((self._pos - 1, "".join(self._stack)))
+        return self.complete
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buf)
+
+    def close(self) -> Any:
+        """Parsed value; raises ValueError if nothing usable was seen."""
+        if not self._started:
+            raise ValueError("no JSON value found")
+        buf = self.text
+        if self.complete:
+            return _loads(buf)
+        # truncated: back off to the last cut point that ends a complete value.
+        # A scalar still open at the end (string, number, true/false/null) may
+        # be cut short, so it never survives: "1234" could have been "12345".
+        self.truncated = True
+        for idx, stack in reversed(self._safe[-_MAX_REPAIR_TRIES:]):
+            cut = buf[:idx].rstrip().rstrip(",:").rstrip()
+            try:
+                return _loads(cut + "".join(reversed(stack)))
+            except ValueError:
+                continue
+        raise ValueError("could not repair truncated JSON")
+
+
+def extract_json(
+    text: Optional[str],
+    expect: Optional[Union[Type[dict], Type[list]]] = None,
+    default: Any = None,
+    allow_truncated: bool = True,
+) -> Any:
+    """
+    Return the first top-level JSON value in `text` (optionally of type
+    `expect`), repairing fences, trailing commas and truncation. `default` if
+    none found. With allow_truncated=False a value that had to be cut back
+    (lossy) is not returned either; use it where a partial object is worse
+    than none.
+    """
+    if not text:
+        return default
+    s = text.strip()
+    try:
+        out = json.loads(s)
+        if expect is None or isinstance(out, expect):
+            return out
+    except ValueError:
+        pass
+
+    start = 0
+    for _ in range(_MAX_CANDIDATES):
+        # next top-level candidate: values nested in a rejected one are never returned
+        m = _VALUE_START.search(s, start)
+        if not m:
+            return default
+        p = IncrementalJSONParser()
+        p.feed(s[m.start():])
+        try:
+            out = p.close()
+            if (expect is None or isinstance(out, expect)) and (allow_truncated or not p.truncated):
+                return out
+        except ValueError:
+            pass
+        if not p.complete:
+            return default  # ran to the end of the text: nothing follows
+        start = m.start() + p.consumed
+    return default
@@ -289,6 +289,11 @@ def nullsafe_dict(model: BaseModel) -> Dict[str, Any]:
     return {k: v for k, v in model.model_dump().items() if v is not None}
 
 # ----- Extraction results -----
+class ExtractError(BaseModel):
+    code: Literal["invalid_document","not_found","upstream_error","internal_error"]
+    message: str
+    retryable: bool = True     # False: resubmitting the same file will fail again
+
 class ExtractResult(BaseModel):
     application_id: str
     applicant_eid: str         # NEW: link by EID
@@ -297,6 +302,9 @@ class ExtractResult(BaseModel):
     raw: Dict[str, Any] = {}
     facts: Dict[str, Any] = {}
     parser_version: str = "v0-mock"
+    # per-document outcome in /extract/batch; failed documents carry empty facts
+    status: Literal["ok","error"] = "ok"
+    error: Optional[ExtractError] = None
 
 # ----- Validation -----
 class ValidationIssue(BaseModel):
@@ -0,0 +1,137 @@
+# packages/schemas/schemas/names.py
+"""
+Person-name matching shared by the services.
+
+Each distinct name is normalized once (cached) into two forms:
+  - folded: Latin lower case, accents stripped, Arabic script transliterated,
+    particles (al/el/bin/ibn/bint) dropped, "Abd al-X" joined into one token,
+    common spellings of Mohammed unified
+  - skeleton: the folded tokens reduced to consonants (vowels, w/y and doubled
+    letters dropped, ph->f, q->k), so "Muhammad", "Mohamed" and "محمد" agree
+
+similarity(a, b) = max(token_set_ratio(folded), SKELETON_WEIGHT * token_set_ratio(skeleton))
+in [0, 1]; 0 when either name is empty. The skeleton term only counts when one
+of the names is in Arabic script, which writes no short vowels: between two Latin
+names it would equate different people ("Mohammed Saeed" / "Mahmoud Saad" are
+both "mhmd sd"). Token order and extra middle names do not matter.
+similarity_pairs scores whole lists with rapidfuzz in C.
+"""
+from __future__ import annotations
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# a skeleton match is weaker evidence than a folded one (distinct spellings collapse)
+SKELETON_WEIGHT = 0.9
+
+_ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")  # harakat, tatweel
+_ARABIC = re.compile("[\u0600-\u06ff]")
+_TRANSLIT = str.maketrans({
+    "ا": "a", "أ": "a", "إ": "a", "آ": "a", "ٱ": "a", "ب": "b", "ت": "t", "ث": "th", "ج": "j",
+    "ح": "h", "خ": "kh", "د": "d", "ذ": "dh", "ر": "r", "ز": "z", "س": "s", "ش": "sh", "ص": "s",
+    "ض": "d", "ط": "t", "ظ": "z", "ع": "a", "غ": "gh", "ف": "f", "ق": "q", "ك": "k", "ل": "l",
+    "م": "m", "ن": "n", "ه": "h", "ة": "a", "و": "w", "ي": "y", "ى": "a", "ء": "", "ؤ": "", "ئ": "",
+    "پ": "p", "چ": "ch", "ژ": "zh", "گ": "g", "ک": "k", "ی": "y",
+})
+_PARTICLES = {"al", "el", "bin", "ibn", "bint", "bn"}
+_ALIASES = {v: "mohammed" for v in ("mohd", "mohamed", "mohammad", "muhammad", "muhammed", "mohamad", "mhd")}
+_ABD = re.compile(r"^abd(?:ul|el|al|ol|u|e)?$")
+_ABD_JOINED = re.compile(r"^abd((?:ul|el|al|ol)\w{2,})$")
+# the article after Abd, in either form: Abdullah / Abd Allah / عبدالله all end in "lah"
+_ABD_ARTICLE = re.compile(r"^[aeou]l(?=\w{2})")
+_NON_LATIN = re.compile(r"[^a-z]+")
+_DIGRAPHS = (("ph", "f"), ("ck", "k"), ("q", "k"))
+_VOWELS = re.compile(r"[aeiouyw]")
+_REPEATS = re.compile(r"(.)\1+")
+
+
+def _latin(token: str) -> List[str]:
+    t = unicodedata.normalize("NFKD", token)
+    t = "".join(ch for ch in t if not unicodedata.combining(ch)).casefold()
+    return _NON_LATIN.sub(" ", t).split()
+
+
+def _tokens(name: str) -> List[str]:
+    out: List[str] = []
+    for raw in _ARABIC_MARKS.sub("", unicodedata.normalize("NFKC", name)).split():
+        if _ARABIC.search(raw):
+            # the article is written attached in Arabic script: المنصوري -> mnswry. Checked
+            # on the source, since ع also transliterates to "a": علوان is alwan, not wan
+            if raw.startswith("ال") and len(raw) > 4:
+                raw = raw[2:]
+            out.append(_NON_LATIN.sub("", raw.translate(_TRANSLIT)))
+        else:
+            out.extend(_latin(raw))
+    return [t for t in out if t and t not in _PARTICLES]
+
+
+def _join_abd(tokens: List[str]) -> List[str]:
+    out: List[str] = []
+    i = 0
+    while i < len(tokens):
+        t = tokens[i]
+        if _ABD.match(t) and i + 1 < len(tokens):
+            out.append("abd" + _ABD_ARTICLE.sub("", tokens[i + 1]))
+            i += 2
+            continue
+        m = _ABD_JOINED.match(t)
+        out.append("abd" + _ABD_ARTICLE.sub("", m.group(1)) if m else t)
+        i += 1
+    return out
+
+
+def _skeleton(token: str) -> str:
+    for a, b in _DIGRAPHS:
+        token = token.replace(a, b)
+    return _REPEATS.sub(r"\1", _VOWELS.sub("", token)) or token[:1]
+
+
+@lru_cache(maxsize=200_000)
+def _forms(name: str) -> Tuple[str, str, bool]:
+    """(folded, skeleton, written in Arabic script)."""
+    tokens = [_ALIASES.get(t, t) for t in _join_abd(_tokens(name))]
+    return " ".join(tokens), " ".join(_skeleton(t) for t in tokens), bool(_ARABIC.search(name))
+
+
+def fold(name: Optional[str]) -> str:
+    """Folded form: 'Mohd. Al-Mansouri' -> 'mohammed mansouri'."""
+    return _forms(name)[0] if name else ""
+
+
+def skeleton(name: Optional[str]) -> str:
+    """Consonant skeleton of the folded form: 'محمد المنصوري' -> 'mhmd mnsr'."""
+    return _forms(name)[1] if name else ""
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Name similarity in [0, 1]."""
+    fa, sa, ara = _forms(a) if a else ("", "", False)
+    fb, sb, arb = _forms(b) if b else ("", "", False)
+    if not fa or not fb:
+        return 0.0
+    score = fuzz.token_set_ratio(fa, fb)
+    if ara or arb:
+        score = max(score, SKELETON_WEIGHT * fuzz.token_set_ratio(sa, sb))
+    return score / 100.0
+
+
+def _all(names: Sequence[Optional[str]]) -> Tuple[List[str], List[str], np.ndarray]:
+    forms = [_forms(n) if n else ("", "", False) for n in names]
+    return [f for f, _, _ in forms], [s for _, s, _ in forms], np.array([x for _, _, x in forms], dtype=bool)
+
+
+def similarity_pairs(a: Sequence[Optional[str]], b: Sequence[Optional[str]], workers: int = 1) -> np.ndarray:
+    """similarity(a[i], b[i]) for every i, as float64."""
+    if len(a) != len(b):
+        raise ValueError("similarity_pairs needs sequences of equal length")
+    if not len(a):
+        return np.zeros(0)
+    fa, sa, ara = _all(a)
+    fb, sb, arb = _all(b)
+    folded = process.cpdist(fa, fb, scorer=fuzz.token_set_ratio, dtype=np.float64, workers=workers)
+    skel = process.cpdist(sa, sb, scorer=fuzz.token_set_ratio, dtype=np.float64, workers=workers)
+    return np.where(ara | arb, np.maximum(folded, SKELETON_WEIGHT * skel), folded) / 100.0
+
@@ -0,0 +1,42 @@
+# Run from packages/schemas: python -m pytest tests
+import pytest
+
+from schemas.names import fold, similarity, similarity_pairs
+
+NAME_MATCH_MIN = 0.85  # extract_validate default policy
+
+MATCHES = [
+    ("Mohd. Al-Mansouri", "محمد المنصوري"),
+    ("Alwan Hassan", "علوان حسن"),
+    ("Abdullah Saeed", "عبدالله سعيد"),
+    ("Abdulrahman Ali", "Abd al-Rahman Ali"),
+    ("Muhammad Ahmed", "Mohamed Ahmed"),
+    ("Fatima Hassan", "Fatma Hasan"),
+]
+NON_MATCHES = [
+    ("Mohammed Saeed", "Mahmoud Saad"),
+    ("Sara Khalid", "Omar Khalid"),
+    ("Ahmed Ali", "Yousef Ibrahim"),
+]
+
+
+@pytest.mark.parametrize("a,b", MATCHES)
+def test_transliterations_match(a, b):
+    assert similarity(a, b) >= NAME_MATCH_MIN
+
+
+@pytest.mark.parametrize("a,b", NON_MATCHES)
+def test_different_people_do_not_match(a, b):
+    assert similarity(a, b) < NAME_MATCH_MIN
+
+
+def test_abd_forms_fold_alike():
+    assert fold("Abdullah Saeed") == fold("Abd Allah Saeed")
+    assert fold("Abdelaziz") == fold("Abdul Aziz") == fold("Abd Al Aziz")
+    assert fold("عبدالله") == fold("عبد الله")
+
+
+def test_pairs_agree_with_similarity():
+    a = [a for a, _ in MATCHES + NON_MATCHES] + [None]
+    b = [b for _, b in MATCHES + NON_MATCHES] + ["Ali"]
+    assert similarity_pairs(a, b).tolist() == pytest.approx([similarity(x, y) for x, y in zip(a, b)])
@@ -0,0 +1,63 @@
+"""
+Bank statement parsing benchmark.
+
+    python -m app.bench_bank --rows 100000 --repeat 3
+
+Generates a synthetic multi-year statement (CSV) and times the path
+/extract/batch runs (bank.extract_from_object) over an in-memory stream instead
+of MinIO: stream -> typed frame -> BankFacts + fingerprint, plus the cost of
+materializing BankTxn models for comparison.
+"""
+import argparse
+import io
+import time
+import numpy as np
+import pandas as pd
+from .services import bank as bank_svc
+
+_DESCRIPTIONS = np.array([
+    "SALARY ACME LLC", "ATM CASH WITHDRAWAL", "RENT PAYMENT EJARI", "CARREFOUR", "LOAN INSTALLMENT",
+    "CREDIT CARD PAYMENT", "DEWA UTILITIES", "NSF RETURN FEE", "TRANSFER FROM FRIEND", "ETISALAT",
+])
+
+def synthetic_statement(rows: int, seed: int = 7) -> bytes:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2019-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 5 * 365, rows)), unit="D")
+    desc = _DESCRIPTIONS[rng.integers(0, len(_DESCRIPTIONS), rows)]
+    amount = np.where(np.char.startswith(desc.astype(str), "SALARY"), 12000.0, -rng.gamma(2.0, 150.0, rows)).round(2)
+    df = pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Amount": amount,
+        "Description": desc,
+        "Account_ID": rng.integers(1000, 1003, rows),
+    })
+    return df.to_csv(index=False).encode()
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    data = synthetic_statement(args.rows)
+    parse = lambda: bank_svc.frame_from_stream(io.BufferedReader(io.BytesIO(data)), "statement.csv")
+    frame = parse()
+    facts = bank_svc.features_from_frame(frame)
+
+    print(f"rows={len(frame):,}  csv={len(data) / 1e6:.1f} MB  frame={frame.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(f"frame_from_stream     {_time(parse, args.repeat) * 1000:8.1f} ms")
+    print(f"features_from_frame   {_time(lambda: bank_svc.features_from_frame(frame), args.repeat) * 1000:8.1f} ms")
+    print(f"statement_fingerprint {_time(lambda: bank_svc.statement_fingerprint(frame), args.repeat) * 1000:8.1f} ms")
+    print(f"raw_from_frame (BankTxn models, for reference) {_time(lambda: bank_svc.raw_from_frame(frame), 1) * 1000:8.1f} ms")
+    print(facts.model_dump())
+
+if __name__ == "__main__":
+    main()
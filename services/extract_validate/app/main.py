@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import extract, validate
+from .services import executor
 
 app = FastAPI(title="Extraction & Validation Service")
 
@@ -26,6 +27,10 @@ setup_logging()
 app.include_router(extract.router)
 app.include_router(validate.router)
 
+@app.on_event("shutdown")
+def _shutdown_pools():
+    executor.shutdown()
+
 @app.get("/healthz")
 def health():
     return {"ok": True}
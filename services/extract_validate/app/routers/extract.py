@@ -1,13 +1,27 @@
+import asyncio
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+import grpc
+import urllib3
 from fastapi import APIRouter
+from minio.error import S3Error
 from pydantic import BaseModel
 from typing import List, Optional
-from schemas.models import DocumentRef, ExtractResult, ApplicantForm, EIDRaw, ResumeRaw
+from schemas.models import DocumentRef, ExtractError, ExtractResult, ApplicantForm, EIDRaw, ResumeRaw
+from ..settings import settings
+from ..services.executor import run_cpu, run_io
+from ..services.file_loader import fetch_object, object_etag
+from ..services.result_cache import cache_key, get_cache
+from ..services.categorize import get_categorizer
 from ..services import eid as eid_svc
 from ..services import bank as bank_svc
 from ..services import assets as assets_svc
 from ..services import credit as credit_svc
 from ..services import resume as resume_svc
 
+logger = logging.getLogger("extract_validate.extract")
+
 router = APIRouter(prefix="/extract", tags=["extract"])
 
 class ExtractBatchRequest(BaseModel):
@@ -20,74 +34,176 @@ class ExtractBatchRequest(BaseModel):
     eid_raw: Optional[EIDRaw] = None
     # For resume, you can pass pre-extracted text
     resume_raw: Optional[ResumeRaw] = None
+    # Ignore cached extraction results (they are still refreshed with the new output)
+    force_refresh: bool = False
+
+async def _extract_eid(req: ExtractBatchRequest, d: DocumentRef) -> ExtractResult:
+    # prefer provided raw mock; else make a dummy
+    raw = req.eid_raw or EIDRaw(
+        name_ar="محمد علي", name_en="Mohammed Ali",
+        dob=req.form.dob if req.form else "1992-01-01",
+        nationality=req.form.nationality if req.form else "Syria",
+        gender="M",
+        issue_date="2023-01-01", expiry_date="2026-01-01",
+        residency_type="resident",
+        occupation="Engineer", issue_emirate="Dubai",
+        employer="Setplex", eid_number="784198765432101"
+    )
+    facts = eid_svc.to_facts(raw, req.form)  # uses name match & demographic band
+    return ExtractResult(application_id=req.application_id, applicant_eid = req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
+                         raw=raw.model_dump(), facts=facts.model_dump())
+
+async def _extract_bank(req: ExtractBatchRequest, d: DocumentRef) -> ExtractResult:
+    # the worker streams the object itself: statement bytes never pass through this process;
+    # raw carries only the statement fingerprint (duplicate detection), not the transactions
+    facts, raw = await run_cpu(bank_svc.extract_from_object, d.object_key)
+    return ExtractResult(application_id=req.application_id,applicant_eid = req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
+                         raw=raw, facts=facts)
+
+async def _extract_assets(req: ExtractBatchRequest, d: DocumentRef) -> ExtractResult:
+    # Prefer the real form from the request (it has applicant_eid + income)
+    if req.form is not None:
+        form_for_assets = req.form
+    else:
+        # Safe minimal default so the endpoint still works in manual tests
+        form_for_assets = ApplicantForm(
+            applicant_eid=d.applicant_eid,          # from DocumentRef
+            declared_monthly_income=1.0,            # avoid divide-by-zero
+            employment_status="employed",
+            housing_type="rent",
+            household_size=1,
+            dependents=[],
+        )
+
+    facts = await run_cpu(assets_svc.facts_from_object, d.object_key, form_for_assets)
+    return ExtractResult(
+        application_id=req.application_id,
+        applicant_eid=req.applicant_eid,
+        doc_id=d.doc_id,
+        doc_type=d.doc_type,
+        raw={},                       # we only care about facts here
+        facts=facts.model_dump(),
+    )
+
+async def _extract_credit(req: ExtractBatchRequest, d: DocumentRef) -> ExtractResult:
+    facts = await run_cpu(credit_svc.facts_from_object, d.object_key)
+    return ExtractResult(application_id=req.application_id,applicant_eid = req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
+                         raw={}, facts=facts.model_dump())
+
+async def _extract_resume(req: ExtractBatchRequest, d: DocumentRef) -> ExtractResult:
+    data, fname = await run_io(fetch_object, d.object_key)       # ⬅️ fetch from MinIO
+    raw = await resume_svc.raw_from_bytes_async(data, fname)     # ⬅️ extract text (page-parallel)
+    facts = await run_io(resume_svc.features_from_raw, raw)      # ⬅️ LLM to JSON facts
+    return ExtractResult(
+        application_id=req.application_id, applicant_eid = req.applicant_eid,doc_id=d.doc_id, doc_type=d.doc_type,
+        raw={}, facts=facts.model_dump()
+    )
+
+def _error_for(exc: BaseException) -> ExtractError:
+    """Map an extractor failure to a client-facing error (and whether a retry can help)."""
+    if isinstance(exc, S3Error):
+        if exc.code in ("NoSuchKey", "NoSuchBucket"):
+            return ExtractError(code="not_found", message=f"object not found: {exc.code}", retryable=False)
+        return ExtractError(code="upstream_error", message=f"storage error: {exc.code}", retryable=True)
+    if isinstance(exc, (grpc.RpcError, urllib3.exceptions.HTTPError, BrokenProcessPool, TimeoutError, ConnectionError)):
+        return ExtractError(code="upstream_error", message=str(exc) or type(exc).__name__, retryable=True)
+    if isinstance(exc, (ValueError, KeyError, TypeError)):
+        # malformed / unsupported file: only a corrected upload will help
+        return ExtractError(code="invalid_document", message=str(exc) or type(exc).__name__, retryable=False)
+    return ExtractError(code="internal_error", message=str(exc) or type(exc).__name__, retryable=True)
+
+def _cache_version(req: ExtractBatchRequest, d: DocumentRef) -> Optional[str]:
+    """
+    Everything besides the file bytes that the facts depend on; None = not cacheable
+    (EID facts come from the request, not from the stored object).
+    """
+    if d.doc_type == "bank":
+        return f"bank:{bank_svc.EXTRACTOR_VERSION}:{get_categorizer().fingerprint}"
+    if d.doc_type == "assets_liabilities":
+        # the ratios divide by the declared income
+        income = req.form.declared_monthly_income if req.form is not None else 1.0
+        return f"assets:{assets_svc.EXTRACTOR_VERSION}:{income!r}"
+    if d.doc_type == "credit_report":
+        return f"credit:{credit_svc.EXTRACTOR_VERSION}"
+    if d.doc_type == "resume":
+        return (f"resume:{resume_svc.EXTRACTOR_VERSION}:{os.getenv('RESUME_MODEL', 'gpt-3.5-turbo')}"
+                f":{settings.RESUME_RULES}:{settings.RESUME_CHUNK_CHARS}")
+    return None
+
+# cache entries are {"facts", "raw"}; part of the key so older facts-only entries never match
+_CACHE_ENTRY_FORMAT = "e2"
+
+def _resume_on_read(facts: dict) -> dict:
+    # tenure / gaps / current employment depend on today's date: re-derive from the cached extraction
+    return resume_svc.facts_from_structured(facts.get("structured") or {}).model_dump()
+
+# doc types whose cached facts are partly date-dependent and refreshed on every hit
+_REFRESH_ON_READ = {"resume": _resume_on_read}
+
+async def _extract_cached(req: ExtractBatchRequest, d: DocumentRef, extractor) -> ExtractResult:
+    """
+    A repeat extraction of an unchanged document costs one stat_object: facts and raw
+    are served from the result cache under (object_key, ETag, extractor version).
+    """
+    version = _cache_version(req, d)
+    if version is None:
+        return await extractor(req, d)
+    etag = await run_io(object_etag, d.object_key)
+    key = cache_key(d.object_key, etag, f"{version}:{_CACHE_ENTRY_FORMAT}")
+    cache = get_cache()
+    if not req.force_refresh:
+        entry = await run_io(cache.get, key)
+        if entry is not None:
+            refresh = _REFRESH_ON_READ.get(d.doc_type)
+            facts = refresh(entry["facts"]) if refresh else entry["facts"]
+            return ExtractResult(application_id=req.application_id, applicant_eid=req.applicant_eid, doc_id=d.doc_id,
+                                 doc_type=d.doc_type, raw=entry["raw"], facts=facts)
+    result = await extractor(req, d)
+    await run_io(cache.put, key, {"facts": result.facts, "raw": result.raw})
+    return result
+
+_EXTRACTORS = {
+    "eid": _extract_eid,
+    "bank": _extract_bank,
+    "assets_liabilities": _extract_assets,
+    "credit_report": _extract_credit,
+    "resume": _extract_resume,
+}
 
 @router.post("/batch", response_model=List[ExtractResult])
-def extract_batch(req: ExtractBatchRequest):
+async def extract_batch(req: ExtractBatchRequest):
+    """
+    Documents are extracted concurrently (at most EXTRACT_CONCURRENCY at a time):
+    MinIO reads and the resume LLM call run in threads, parsing in the CPU pool.
+
+    Returns one ExtractResult per supported document, in input order. A document
+    that fails gets status="error" and an `error` object instead of facts; the rest
+    of the batch is still returned. Retry by resubmitting only the failed documents
+    (those with error.retryable) -- successful extracts need not be redone.
+
+    Facts of stored documents are cached per (object_key, ETag, extractor version);
+    date-dependent resume facts (tenure, gaps) are re-derived on every hit. Set
+    force_refresh to re-extract anyway.
+    """
+    sem = asyncio.Semaphore(max(1, settings.EXTRACT_CONCURRENCY))
+
+    async def one(d: DocumentRef) -> Optional[ExtractResult]:
+        extractor = _EXTRACTORS.get(d.doc_type)
+        if extractor is None:
+            return None
+        async with sem:
+            return await _extract_cached(req, d, extractor)
+
+    outcomes = await asyncio.gather(*(one(d) for d in req.documents), return_exceptions=True)
+
     results: list[ExtractResult] = []
-    for d in req.documents:
-        if d.doc_type == "eid":
-            # prefer provided raw mock; else make a dummy
-            raw = req.eid_raw or EIDRaw(
-                name_ar="محمد علي", name_en="Mohammed Ali",
-                dob=req.form.dob if req.form else "1992-01-01",
-                nationality=req.form.nationality if req.form else "Syria",
-                gender="M",
-                issue_date="2023-01-01", expiry_date="2026-01-01",
-                residency_type="resident",
-                occupation="Engineer", issue_emirate="Dubai",
-                employer="Setplex", eid_number="784198765432101"
-            )
-            facts = eid_svc.to_facts(raw, req.form)  # uses name match & demographic band
-            results.append(ExtractResult(application_id=req.application_id, applicant_eid = req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
-                                         raw=raw.model_dump(), facts=facts.model_dump()))
-
-        elif d.doc_type == "bank":
-            raw = bank_svc.load_bank_raw(d.object_key)
-            facts = bank_svc.features_from_raw(raw)
-            results.append(ExtractResult(application_id=req.application_id,applicant_eid = req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
-                                         raw={}, facts=facts.model_dump()))
-
-        elif d.doc_type == "assets_liabilities":
-            raw = assets_svc.load_assets_raw(d.object_key)
-
-            # Prefer the real form from the request (it has applicant_eid + income)
-            if req.form is not None:
-                form_for_assets = req.form
-            else:
-                # Safe minimal default so the endpoint still works in manual tests
-                form_for_assets = ApplicantForm(
-                    applicant_eid=d.applicant_eid,          # from DocumentRef
-                    declared_monthly_income=1.0,            # avoid divide-by-zero
-                    employment_status="employed",
-                    housing_type="rent",
-                    household_size=1,
-                    dependents=[],
-                )
-
-            facts = assets_svc.features_from_raw(raw, form_for_assets)
-            results.append(
-                ExtractResult(
-                    application_id=req.application_id,
-                    applicant_eid=d.applicant_eid,
-                    doc_id=d.doc_id,
-                    doc_type=d.doc_type,
-                    raw={},                       # we only care about facts here
-                    facts=facts.model_dump(),
-                )
-            )
-
-
-        elif d.doc_type == "credit_report":
-            raw = credit_svc.load_credit_raw(d.object_key)
-            facts = credit_svc.features_from_raw(raw)
-            results.append(ExtractResult(application_id=req.application_id,applicant_eid = req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
-                                         raw={}, facts=facts.model_dump()))
-
-        elif d.doc_type == "resume":
-           raw = resume_svc.load_resume_raw(d.object_key)   # ⬅️ fetch from MinIO + extract text
-           facts = resume_svc.features_from_raw(raw)        # ⬅️ LLM to JSON facts
-           results.append(ExtractResult(
-               application_id=req.application_id, applicant_eid = req.applicant_eid,doc_id=d.doc_id, doc_type=d.doc_type,
-               raw={}, facts=facts.model_dump()
-           ))
+    for d, out in zip(req.documents, outcomes):
+        if isinstance(out, BaseException):
+            logger.error("extraction failed for %s (%s): %r", d.doc_id, d.doc_type, out)
+            results.append(ExtractResult(
+                application_id=req.application_id, applicant_eid=req.applicant_eid, doc_id=d.doc_id, doc_type=d.doc_type,
+                status="error", error=_error_for(out),
+            ))
+        elif out is not None:
+            results.append(out)
     return results
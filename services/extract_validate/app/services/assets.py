@@ -1,24 +1,22 @@
-import io
 import pandas as pd
 from schemas.models import AssetsRaw, AssetRow, LiabilityRow, AssetsLiabilitiesFacts, ApplicantForm
-from .minio_client import client
-from ..settings import settings
+from .file_loader import open_object
+from .tabular import iter_table
 
-def _read_frame(data: bytes) -> pd.DataFrame:
-    try:
-        return pd.read_excel(io.BytesIO(data))
-    except Exception:
-        return pd.read_csv(io.BytesIO(data))
+# Bump when a change alters the facts produced for the same file (invalidates the extraction cache)
+EXTRACTOR_VERSION = "1"
 
 def load_assets_raw(object_key: str) -> AssetsRaw:
-    c = client()
     # expect a single workbook with two sheets OR a zip of two files; for simplicity read one file with a 'sheet' column hint
-    resp = c.get_object(settings.MINIO_BUCKET, object_key)
-    data = resp.read()
-    resp.close(); resp.release_conn()
+    with open_object(object_key) as (stream, fname):
+        df = pd.concat(list(iter_table(stream, fname, text_columns=("kind", "type"))), ignore_index=True)
+    return assets_raw_from_frame(df)
 
-    df = _read_frame(data)
-    df.columns = [c.strip().lower() for c in df.columns]
+def facts_from_object(object_key: str, form: ApplicantForm) -> AssetsLiabilitiesFacts:
+    """Stream + parse + featurize in one call (top-level so it can run in a worker process)."""
+    return features_from_raw(load_assets_raw(object_key), form)
+
+def assets_raw_from_frame(df: pd.DataFrame) -> AssetsRaw:
     # we’ll assume rows differentiate by a 'kind' column: 'asset' or 'liability'
     if "kind" not in df.columns:
         raise ValueError("Assets file must include a 'kind' column with values 'asset' or 'liability'.")
@@ -1,44 +1,120 @@
-import io
-from datetime import date, timedelta
+from datetime import timedelta
+from typing import BinaryIO
+import numpy as np
 import pandas as pd
+from schemas import fingerprints
 from schemas.models import BankRaw, BankTxn, BankFacts
-from .minio_client import client
-from ..settings import settings
+from .file_loader import open_object
+from .tabular import iter_table
+from .categorize import get_categorizer
+
+# Bump when a change alters the facts produced for the same file (invalidates the extraction cache)
+EXTRACTOR_VERSION = "2"
+
+# Columnar statement layout used end to end (one row per transaction)
+BANK_COLUMNS = ["date", "amount", "description", "category", "account_id"]
+_TEXT_COLUMNS = ("description", "category", "account_id")
+
+# taxonomy categories the facts are derived from (see categorize.DEFAULT_TAXONOMY)
+NSF_RETURN, DEBT_PAYMENT, SALARY, CASH_WITHDRAWAL, RENT = "nsf_return", "debt_payment", "salary", "cash_withdrawal", "rent"
 
 def load_bank_raw(object_key: str) -> BankRaw:
-    c = client()
-    resp = c.get_object(settings.MINIO_BUCKET, object_key)
-    data = resp.read()
-    resp.close(); resp.release_conn()
-
-    # try excel then csv
-    try:
-        df = pd.read_excel(io.BytesIO(data))
-    except Exception:
-        df = pd.read_csv(io.BytesIO(data))
-
-    # normalize columns
-    df.columns = [c.strip().lower() for c in df.columns]
+    return raw_from_frame(load_bank_frame(object_key))
+
+def extract_from_object(object_key: str) -> tuple[dict, dict]:
+    """
+    (facts, raw summary) for ExtractResult: one read of the statement for both (top-level
+    so it can run in a worker process: the statement bytes never cross the process boundary).
+    """
+    df = load_bank_frame(object_key)
+    return features_from_frame(df).model_dump(), statement_fingerprint(df)
+
+def load_bank_frame(object_key: str) -> pd.DataFrame:
+    with open_object(object_key) as (stream, fname):
+        return frame_from_stream(stream, fname)
+
+def frame_from_stream(stream: BinaryIO, name: str | None = None) -> pd.DataFrame:
+    """
+    Parse the statement straight off a buffered stream, chunk by chunk, into typed columns
+    (datetime64 date, float64 amount, str description, category / account_id as object),
+    invalid rows dropped. Only the typed columns are kept, so memory stays bounded by the
+    statement's rows, not its bytes; no per-row Python objects.
+    """
+    parts = [_typed_frame(chunk) for chunk in iter_table(stream, name, text_columns=_TEXT_COLUMNS)]
+    return categorize_frame(pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0])
+
+def _typed_frame(df: pd.DataFrame) -> pd.DataFrame:
     required = {"date","amount","description"}
     if not required.issubset(set(df.columns)):
         raise ValueError(f"Bank file missing required columns: {required}")
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
-    txns = [
-        BankTxn(
-            date=r["date"],
-            amount=float(r["amount"]),
-            description=str(r.get("description","")),
-            category=r.get("category"),
-            account_id=str(r.get("account_id")) if pd.notna(r.get("account_id")) else None
-        )
-        for _, r in df.iterrows()
-        if pd.notna(r["date"]) and pd.notna(r["amount"])
-    ]
-    return BankRaw(txns=txns)
+    out = pd.DataFrame({
+        "date": pd.to_datetime(df["date"], errors="coerce").dt.normalize(),
+        "amount": pd.to_numeric(df["amount"], errors="coerce").astype("float64"),
+        "description": df["description"].fillna("").astype(str),
+    })
+    out["category"] = df["category"].astype(object).where(df["category"].notna(), None) if "category" in df.columns else None
+    out["account_id"] = df["account_id"].astype(str).where(df["account_id"].notna(), None) if "account_id" in df.columns else None
+    return out[out["date"].notna() & out["amount"].notna()].reset_index(drop=True)
+
+def categorize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Classify every description once: `category_mask` holds all matched taxonomy
+    categories (used for facts); `category` keeps a label supplied in the file,
+    otherwise the highest-priority match.
+    """
+    labels, masks = get_categorizer().classify(df["description"])
+    df["category_mask"] = masks
+    df["category"] = df["category"].where(df["category"].notna(), pd.Series(labels, index=df.index))
+    return df
+
+def statement_fingerprint(df: pd.DataFrame, max_accounts: int = 10) -> dict:
+    """
+    Compact summary for cross-applicant duplicate checks: a MinHash signature over the
+    set of (day, amount in cents, description) transactions, so near-identical
+    statements have near-equal signatures, plus the account ids (IBANs) seen.
+    """
+    if df.empty:
+        return {"txn_count": 0, "txn_minhash": [], "account_ids": []}
+    rows = pd.DataFrame({
+        "day": df["date"].values.astype("datetime64[D]").astype("int64"),
+        "cents": np.round(df["amount"].to_numpy() * 100).astype("int64"),
+        "description": df["description"].str.upper().str.split().str.join(" "),
+    })
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    accounts = df["account_id"].dropna().astype(str).str.strip() if "account_id" in df.columns else pd.Series(dtype=object)
+    return {
+        "txn_count": int(len(df)),
+        "txn_minhash": fingerprints.minhash(np.unique(hashes)),
+        "account_ids": [a for a in accounts[accounts != ""].unique().tolist()[:max_accounts]],
+    }
+
+def raw_from_frame(df: pd.DataFrame) -> BankRaw:
+    """Materialize BankTxn models (only for callers that need the row objects)."""
+    dates = df["date"].dt.date.tolist()
+    optional = lambda col: df[col].astype(object).where(df[col].notna(), None).tolist()
+    return BankRaw(txns=[
+        BankTxn(date=d, amount=a, description=desc, category=cat, account_id=acc)
+        for d, a, desc, cat, acc in zip(dates, df["amount"].tolist(), df["description"].tolist(),
+                                        optional("category"), optional("account_id"))
+    ])
+
+def frame_from_raw(raw: BankRaw) -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.to_datetime([t.date for t in raw.txns]),
+        "amount": np.fromiter((t.amount for t in raw.txns), dtype="float64", count=len(raw.txns)),
+        "description": [t.description for t in raw.txns],
+        "category": [t.category for t in raw.txns],
+        "account_id": [t.account_id for t in raw.txns],
+    }, columns=BANK_COLUMNS)
 
 def features_from_raw(raw: BankRaw) -> BankFacts:
-    if not raw.txns:
+    return features_from_frame(frame_from_raw(raw))
+
+def features_from_frame(df: pd.DataFrame) -> BankFacts:
+    if not df.empty and "category_mask" not in df.columns:
+        df = categorize_frame(df.copy())
+    if df.empty:
         # safe defaults
         return BankFacts(
             salary_inflow_mean_3m=0, salary_variance_3m=0,
@@ -47,54 +123,56 @@ def features_from_raw(raw: BankRaw) -> BankFacts:
             nsf_return_count_3m=0, debt_payment_ratio_3m=0,
             income_stability_index=0, cash_withdraw_pct=0, rent_detected=False
         )
-    # Convert to DataFrame for rolling stats
-    df = pd.DataFrame([t.model_dump() for t in raw.txns])
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
-    # infer inflow/outflow convention: inflow = positive
-    inflow = df[df["amount"] > 0]["amount"]
-    outflow = df[df["amount"] < 0]["amount"].abs()
+    # stable sort keeps same-day transactions in statement order for the running balance
+    df = df.sort_values("date", kind="mergesort")
 
     # last 3 months window
-    end = df["date"].max().date()
-    start = end - timedelta(days=90)
-    d3 = df[(df["date"].dt.date >= start) & (df["date"].dt.date <= end)]
-    inflow3 = d3[d3["amount"] > 0]["amount"]
-    outflow3 = d3[d3["amount"] < 0]["amount"].abs()
-
-    salary_inflow_mean_3m = float(inflow3.mean() if not inflow3.empty else 0.0)
-    salary_variance_3m = float(inflow3.var() if len(inflow3) > 1 else 0.0)
+    dates = df["date"].to_numpy()
+    end = dates.max()
+    start = end - np.timedelta64(timedelta(days=90))
+    window = dates >= start
+    amount = df["amount"].to_numpy()[window]
+    masks = df["category_mask"].to_numpy()[window]
+    # infer inflow/outflow convention: inflow = positive
+    is_in = amount > 0
+    is_out = amount < 0
+    inflow3 = amount[is_in]
+    outflow3 = -amount[is_out]
+
+    salary_inflow_mean_3m = float(inflow3.mean()) if inflow3.size else 0.0
+    salary_variance_3m = float(inflow3.var(ddof=1)) if inflow3.size > 1 else 0.0
     total_inflow = float(inflow3.sum())
     total_outflow = float(outflow3.sum())
 
     expense_to_income_ratio_3m = (total_outflow / total_inflow) if total_inflow > 0 else 0.0
 
     # naive daily balance curve (approx): start 0, cum-sum
-    d3["balance"] = d3["amount"].cumsum()
-    avg_balance_3m = float(d3["balance"].mean()) if len(d3) else 0.0
-    min_balance_3m = float(d3["balance"].min()) if len(d3) else 0.0
+    balance = np.cumsum(amount)
+    avg_balance_3m = float(balance.mean()) if balance.size else 0.0
+    min_balance_3m = float(balance.min()) if balance.size else 0.0
 
-    avg_daily_outflow = float(outflow3.mean()) if len(outflow3) else 0.0
+    avg_daily_outflow = float(outflow3.mean()) if outflow3.size else 0.0
     liquidity_buffer_days = (avg_balance_3m / avg_daily_outflow) if avg_daily_outflow > 0 else 0.0
 
+    cat = get_categorizer()
+    has = lambda category: cat.has(masks, category)
+
     # nsf/returned detection via description keywords (mock heuristic)
-    nsf_return_count_3m = int((d3["description"].str.contains("RETURN|NSF|BOUNCE", case=False, na=False)).sum())
+    nsf_return_count_3m = int(has(NSF_RETURN).sum())
 
     # debt payments (loan/cc) heuristics
-    debt_mask = d3["description"].str.contains("LOAN|CREDIT CARD|CC BILL|INSTALLMENT", case=False, na=False)
-    debt_payments = d3[debt_mask & (d3["amount"] < 0)]["amount"].abs().sum()
+    debt_payments = float(np.abs(amount[has(DEBT_PAYMENT) & is_out]).sum())
     debt_payment_ratio_3m = float(debt_payments / total_inflow) if total_inflow > 0 else 0.0
 
     # income stability: detect payroll periodicity (monthly)
-    payroll_mask = d3["description"].str.contains("SAL|PAYROLL|SALARY", case=False, na=False) & (d3["amount"] > 0)
-    income_stability_index = min(1.0, payroll_mask.sum() / 3.0) if len(d3) else 0.0
+    payroll_count = int((has(SALARY) & is_in).sum())
+    income_stability_index = min(1.0, payroll_count / 3.0) if amount.size else 0.0
 
     cash_withdraw_pct = float(
-        d3[d3["description"].str.contains("ATM|CASH WITHDRAW", case=False, na=False) & (d3["amount"] < 0)]["amount"].abs().sum()
-        / total_outflow
+        np.abs(amount[has(CASH_WITHDRAWAL) & is_out]).sum() / total_outflow
     ) if total_outflow > 0 else 0.0
 
-    rent_detected = bool((d3["description"].str.contains("RENT|LANDLORD|TENANCY|EJARI", case=False, na=False)).any())
+    rent_detected = bool(has(RENT).any())
 
     return BankFacts(
         salary_inflow_mean_3m=salary_inflow_mean_3m,
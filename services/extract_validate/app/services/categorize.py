@@ -0,0 +1,96 @@
+import hashlib
+import json
+import operator
+import re
+from functools import lru_cache, reduce
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..settings import settings
+
+# category -> keywords (case-insensitive substrings). Order is priority: when a
+# description hits several categories, the first one listed becomes its label.
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    "nsf_return": ["RETURN", "NSF", "BOUNCE"],
+    "debt_payment": ["LOAN", "CREDIT CARD", "CC BILL", "INSTALLMENT"],
+    "salary": ["SAL", "PAYROLL", "SALARY"],
+    "cash_withdrawal": ["ATM", "CASH WITHDRAW"],
+    "rent": ["RENT", "LANDLORD", "TENANCY", "EJARI"],
+}
+
+class Categorizer:
+    """
+    Single-pass keyword classifier for transaction descriptions.
+
+    All keywords are compiled into one alternation inside a lookahead (case-insensitive),
+    so one `finditer` reports a keyword at every position where one occurs (the longest
+    one there). The keywords that also match at that position are exactly its prefixes,
+    so each keyword's mask includes the categories of the keywords it starts with:
+    "CASH" in one category still counts where "CASH WITHDRAW" of another matched. Each
+    distinct description is scanned once and the result is broadcast back to the rows.
+
+    A description maps to a bit mask of all categories it hits plus a single label
+    (highest-priority category) for `BankTxn.category`.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        if len(taxonomy) > 62:
+            raise ValueError("bank taxonomy supports at most 62 categories")
+        self.categories = list(taxonomy)
+        # identifies the taxonomy in extraction cache keys: edited keywords invalidate cached facts
+        self.fingerprint = hashlib.sha1(json.dumps(taxonomy, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.bits = {c: 1 << i for i, c in enumerate(self.categories)}
+        self._kw_mask: Dict[str, int] = {}
+        for cat, keywords in taxonomy.items():
+            for kw in keywords:
+                k = kw.strip().upper()
+                if k:
+                    self._kw_mask[k] = self._kw_mask.get(k, 0) | self.bits[cat]
+        # the longest keyword at a position stands for all the shorter ones that match there
+        self._kw_mask = {k: reduce(operator.or_, (m for j, m in self._kw_mask.items() if k.startswith(j)))
+                         for k in self._kw_mask}
+        alternation = "|".join(re.escape(k) for k in sorted(self._kw_mask, key=len, reverse=True))
+        # keywords are upper-cased and matched against upper-cased text: much faster than re.IGNORECASE
+        self._rx = re.compile(f"(?=({alternation}))") if alternation else None
+
+    def mask_of(self, text: str) -> int:
+        if self._rx is None or not isinstance(text, str) or not text:
+            return 0
+        mask = 0
+        for m in self._rx.finditer(text.upper()):
+            mask |= self._kw_mask[m.group(1)]
+        return mask
+
+    def label_of(self, mask: int) -> Optional[str]:
+        if not mask:
+            return None
+        return self.categories[(mask & -mask).bit_length() - 1]
+
+    def classify(self, descriptions: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """(labels as object array, int64 masks), aligned with `descriptions`."""
+        codes, uniques = pd.factorize(descriptions, sort=False, use_na_sentinel=False)
+        masks = np.fromiter((self.mask_of(u) for u in uniques), dtype=np.int64, count=len(uniques))
+        labels = np.array([self.label_of(int(m)) for m in masks], dtype=object)
+        return labels[codes], masks[codes]
+
+    def has(self, masks: np.ndarray, category: str) -> np.ndarray:
+        bit = self.bits.get(category)
+        if bit is None:
+            return np.zeros(len(masks), dtype=bool)
+        return (masks & bit) != 0
+
+def load_taxonomy(path: str) -> Dict[str, List[str]]:
+    if not path:
+        return DEFAULT_TAXONOMY
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(v, list) for v in data.values()):
+        raise ValueError(f"{path}: expected {{category: [keywords, ...]}}")
+    return {str(k): [str(x) for x in v] for k, v in data.items()}
+
+@lru_cache(maxsize=4)
+def _categorizer(path: str) -> Categorizer:
+    return Categorizer(load_taxonomy(path))
+
+def get_categorizer() -> Categorizer:
+    return _categorizer(settings.BANK_TAXONOMY_PATH)
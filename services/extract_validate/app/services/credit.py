@@ -1,22 +1,21 @@
-import io
 import pandas as pd
 from schemas.models import CreditRaw, CreditFacts
-from .minio_client import client
-from ..settings import settings
+from .file_loader import open_object
+from .tabular import iter_table
 
-def load_credit_raw(object_key: str) -> CreditRaw:
-    c = client()
-    resp = c.get_object(settings.MINIO_BUCKET, object_key)
-    data = resp.read()
-    resp.close(); resp.release_conn()
+# Bump when a change alters the facts produced for the same file (invalidates the extraction cache)
+EXTRACTOR_VERSION = "1"
 
-    try:
-        df = pd.read_excel(io.BytesIO(data))
-    except Exception:
-        df = pd.read_csv(io.BytesIO(data))
+def load_credit_raw(object_key: str) -> CreditRaw:
+    with open_object(object_key) as (stream, fname):
+        df = pd.concat(list(iter_table(stream, fname, text_columns=("status",))), ignore_index=True)
+    return credit_raw_from_frame(df)
 
-    df.columns = [c.strip().lower() for c in df.columns]
+def facts_from_object(object_key: str) -> CreditFacts:
+    """Stream + parse + featurize in one call (top-level so it can run in a worker process)."""
+    return features_from_raw(load_credit_raw(object_key))
 
+def credit_raw_from_frame(df: pd.DataFrame) -> CreditRaw:
     # Optional metadata row could include score/score_band; for simplicity assume columns may exist
     score = int(df.attrs.get("score", 700)) if hasattr(df, "attrs") else None
     score_band = None
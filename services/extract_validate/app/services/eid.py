@@ -1,6 +1,6 @@
 from datetime import date
 from dateutil.relativedelta import relativedelta
-from rapidfuzz import fuzz
+from schemas import names
 from schemas.models import EIDRaw, EIDFacts, ApplicantForm
 
 def nationality_group(nat: str) -> str:
@@ -27,7 +27,7 @@ def residency_days(expiry: date) -> int:
     return max(0, (expiry - today).days)
 
 def name_match_score(eid_en: str, form_full: str) -> float:
-    return fuzz.token_set_ratio(eid_en or "", form_full or "") / 100.0
+    return names.similarity(eid_en, form_full)
 
 def demo_band(age: int, household_size: int) -> str:
     if age < 25: return "youth"
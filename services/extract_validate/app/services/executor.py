@@ -0,0 +1,42 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+from ..settings import settings
+
+_cpu_pool: Optional[Executor] = None
+
+def cpu_pool() -> Optional[Executor]:
+    """Shared process pool for CPU-bound parsing; None when EXTRACT_CPU_WORKERS=0."""
+    global _cpu_pool
+    if _cpu_pool is None and settings.EXTRACT_CPU_WORKERS > 0:
+        # spawn, not fork: the parent holds gRPC channels and threads that do not survive fork
+        _cpu_pool = ProcessPoolExecutor(
+            max_workers=settings.EXTRACT_CPU_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _cpu_pool
+
+async def run_cpu(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a picklable, top-level function in the process pool (or a thread if disabled)."""
+    pool = cpu_pool()
+    if pool is None:
+        return await asyncio.to_thread(fn, *args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, partial(fn, *args))
+    except BrokenProcessPool:
+        # a worker died (OOM, segfault in a parser); start a fresh pool for the next call
+        shutdown()
+        raise
+
+async def run_io(fn: Callable[..., Any], *args: Any) -> Any:
+    """Blocking I/O (MinIO, LLM RPC) off the event loop."""
+    return await asyncio.to_thread(fn, *args)
+
+def shutdown() -> None:
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
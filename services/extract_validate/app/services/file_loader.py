@@ -1,13 +1,65 @@
 import io, os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
 from minio import Minio
 from ..settings import settings
 from .minio_client import client
 
-def fetch_object(object_key: str) -> tuple[bytes, str]:
+_CHUNK = 256 * 1024
+
+class ObjectTooLarge(ValueError):
+    """The stored object exceeds MINIO_MAX_OBJECT_BYTES."""
+
+def object_name(object_key: str) -> str:
+    # last path chunk is the filename after "__"
+    return os.path.basename(object_key).split("__", 1)[-1]
+
+class _BoundedReader(io.RawIOBase):
+    """Raw stream over an HTTP response that fails once more than `limit` bytes arrive."""
+
+    def __init__(self, resp, object_key: str, limit: int):
+        self._resp = resp
+        self._key = object_key
+        self._limit = limit
+        self._seen = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._resp.readinto(b)
+        self._seen += n
+        if self._limit and self._seen > self._limit:
+            raise ObjectTooLarge(f"{self._key}: object larger than {self._limit} bytes")
+        return n
+
+def _check_size(object_key: str, length) -> None:
+    limit = settings.MINIO_MAX_OBJECT_BYTES
+    if limit and length is not None and int(length) > limit:
+        raise ObjectTooLarge(f"{object_key}: object is {int(length)} bytes, limit is {limit}")
+
+@contextmanager
+def open_object(object_key: str) -> Iterator[tuple[BinaryIO, str]]:
+    """
+    Stream an object: yields (buffered reader, filename). The size limit is checked
+    against Content-Length up front and enforced again while reading, so nothing
+    past MINIO_MAX_OBJECT_BYTES is ever buffered. The connection goes back to the
+    pool on exit.
+    """
     c: Minio = client()
     resp = c.get_object(settings.MINIO_BUCKET, object_key)
-    data = resp.read()
-    resp.close(); resp.release_conn()
-    # last path chunk is the filename after "__"
-    fname = os.path.basename(object_key).split("__", 1)[-1]
-    return data, fname
+    try:
+        _check_size(object_key, resp.headers.get("Content-Length"))
+        raw = _BoundedReader(resp, object_key, settings.MINIO_MAX_OBJECT_BYTES)
+        yield io.BufferedReader(raw, buffer_size=_CHUNK), object_name(object_key)
+    finally:
+        resp.close(); resp.release_conn()
+
+def object_etag(object_key: str) -> str:
+    """One HEAD request: the ETag changes whenever the stored bytes do."""
+    return client().stat_object(settings.MINIO_BUCKET, object_key).etag
+
+def fetch_object(object_key: str) -> tuple[bytes, str]:
+    """Whole object in memory (for formats that need random access: PDF, DOCX, XLSX)."""
+    with open_object(object_key) as (stream, fname):
+        return stream.read(), fname
@@ -1,4 +1,5 @@
-import json, requests
+import requests
+from schemas.json_repair import extract_json
 from ..settings import settings
 
 _JSON_SCHEMA = """
@@ -40,24 +41,17 @@ def _call_ollama(prompt: str) -> str:
 
 def extract_resume_fields(resume_text: str) -> dict:
     prompt = _build_prompt(resume_text)
-    out = _call_ollama(prompt).strip()
-    # best-effort extract JSON
-    # Some models wrap JSON in markdown fences; unwrap if needed.
-    if out.startswith("```"):
-        out = out.strip("` \n")
-        # remove possible language tag like json
-        if out.lower().startswith("json"):
-            out = out[4:].lstrip()
-    # try parse
-    try:
-        return json.loads(out)
-    except Exception:
-        # minimal fallback
-        return {
-            "employment_current": True,
-            "employment_tenure_months": 12,
-            "recent_job_gap_days": 0,
-            "occupation_code": "NA",
-            "education_level_band": "bachelor",
-            "sector_match_to_inflows": True
-        }
+    out = _call_ollama(prompt)
+    # best-effort extract JSON (fences / prose / truncation repaired locally)
+    data = extract_json(out, expect=dict)
+    if data is not None:
+        return data
+    # minimal fallback
+    return {
+        "employment_current": True,
+        "employment_tenure_months": 12,
+        "recent_job_gap_days": 0,
+        "occupation_code": "NA",
+        "education_level_band": "bachelor",
+        "sector_match_to_inflows": True,
+    }
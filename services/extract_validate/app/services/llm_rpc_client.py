@@ -5,19 +5,13 @@ import grpc
 from typing import Optional, Dict, Any
 
 from llmruntime.v1 import llm_pb2, llm_pb2_grpc  # stubs from packages/llm_protos
+from schemas.json_repair import extract_json
 
 LLM_ADDR = os.getenv("LLM_RUNTIME_ADDR", "llm_runtime:51051")
 
 def _best_effort_json(text: str) -> Dict[str, Any]:
-    s = text.strip()
-    if s.startswith("```"):
-        s = s.strip("` \n")
-        if s.lower().startswith("json"):
-            s = s[4:].lstrip()
-    try:
-        return json.loads(s)
-    except Exception:
-        return {}
+    # fences, surrounding prose, trailing commas and truncated output are repaired locally
+    return extract_json(text, expect=dict, default={})
 
 def ask_json(
     *,
@@ -1,10 +1,30 @@
+import os
+from functools import lru_cache
+import certifi
+import urllib3
+from urllib3.util import Retry, Timeout
 from minio import Minio
 from ..settings import settings
 
+@lru_cache(maxsize=1)
 def client() -> Minio:
+    """
+    One client per process, shared by all requests (Minio is thread-safe). Its urllib3
+    pool keeps up to MINIO_POOL_MAXSIZE keep-alive connections, enough for every
+    concurrent extraction, so reads reuse sockets instead of reconnecting per object.
+    """
+    http = urllib3.PoolManager(
+        maxsize=settings.MINIO_POOL_MAXSIZE,
+        block=True,  # wait for a free connection rather than opening unpooled ones
+        timeout=Timeout(connect=settings.MINIO_CONNECT_TIMEOUT_S, read=settings.MINIO_READ_TIMEOUT_S),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
     return Minio(
         endpoint=settings.MINIO_ENDPOINT,
         access_key=settings.MINIO_ACCESS_KEY,
         secret_key=settings.MINIO_SECRET_KEY,
         secure=settings.MINIO_SECURE,
+        http_client=http,
     )
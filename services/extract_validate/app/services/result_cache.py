@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Protocol
+from ..settings import settings
+
+logger = logging.getLogger("extract_validate.result_cache")
+
+Facts = Dict[str, Any]
+
+def cache_key(object_key: str, etag: str, version: str) -> str:
+    """Facts are a pure function of the stored bytes (ETag) and the extractor that read them."""
+    return hashlib.sha256(f"{object_key}\0{etag}\0{version}".encode("utf-8")).hexdigest()
+
+class ResultCache(Protocol):
+    def get(self, key: str) -> Optional[Facts]: ...
+    def put(self, key: str, facts: Facts) -> None: ...
+
+class NullCache:
+    def get(self, key: str) -> Optional[Facts]:
+        return None
+
+    def put(self, key: str, facts: Facts) -> None:
+        pass
+
+class DiskLRUCache:
+    """
+    One JSON file per entry under EXTRACT_CACHE_DIR (sharded by key prefix). A hit
+    touches the file's mtime, so mtime order is recency order; once the entry count
+    passes `max_entries` the least recently used tenth is deleted. Writes go through
+    a temp file + rename, so readers in other worker processes never see partial JSON.
+    """
+
+    def __init__(self, root: str, max_entries: int):
+        self.root = root
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._count: Optional[int] = None
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Facts]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                facts = json.load(f)
+            os.utime(path)
+            return facts
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, facts: Facts) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(facts, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._count is None:
+                self._count = len(self._entries())
+            else:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _entries(self) -> list[os.DirEntry]:
+        out = []
+        for shard in os.scandir(self.root):
+            if shard.is_dir():
+                out.extend(e for e in os.scandir(shard.path) if e.name.endswith(".json"))
+        return out
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        keep = int(self.max_entries * 0.9)
+        for e in entries[:max(0, len(entries) - keep)]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+        self._count = min(len(entries), keep)
+
+class RedisCache:
+    """Entries expire after EXTRACT_CACHE_TTL_S; run Redis with maxmemory-policy allkeys-lru to bound it."""
+
+    def __init__(self, url: str, ttl_s: int):
+        import redis  # optional dependency, only needed for this backend
+        self._r = redis.from_url(url)
+        self.ttl_s = ttl_s
+
+    def get(self, key: str) -> Optional[Facts]:
+        raw = self._r.get(f"extract:facts:{key}")
+        return json.loads(raw) if raw else None
+
+    def put(self, key: str, facts: Facts) -> None:
+        self._r.set(f"extract:facts:{key}", json.dumps(facts, ensure_ascii=False), ex=self.ttl_s or None)
+
+class _FailSoft:
+    """A cache outage must never fail an extraction: errors degrade to a miss / no-op."""
+
+    def __init__(self, inner: ResultCache):
+        self.inner = inner
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Facts]:
+        t0 = time.monotonic()
+        try:
+            facts = self.inner.get(key)
+        except Exception as e:
+            logger.warning("extract cache read failed: %r", e)
+            facts = None
+        if facts is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.debug("extract cache hit %s (%.1f ms)", key[:12], (time.monotonic() - t0) * 1000)
+        return facts
+
+    def put(self, key: str, facts: Facts) -> None:
+        try:
+            self.inner.put(key, facts)
+        except Exception as e:
+            logger.warning("extract cache write failed: %r", e)
+
+@lru_cache(maxsize=1)
+def get_cache() -> _FailSoft:
+    backend = settings.EXTRACT_CACHE.lower()
+    try:
+        if backend == "disk":
+            return _FailSoft(DiskLRUCache(settings.EXTRACT_CACHE_DIR, settings.EXTRACT_CACHE_MAX_ENTRIES))
+        if backend == "redis":
+            return _FailSoft(RedisCache(settings.EXTRACT_CACHE_REDIS_URL, settings.EXTRACT_CACHE_TTL_S))
+    except Exception as e:
+        logger.warning("extract cache %r unavailable, caching disabled: %r", backend, e)
+    return _FailSoft(NullCache())
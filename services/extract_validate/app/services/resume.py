@@ -1,11 +1,17 @@
 # services/extract_validate/app/services/resume.py
 import os, time, json, logging
-from typing import Dict, Any
-from schemas.models import ResumeRaw, ResumeFacts
-from schemas import load_json_schema                      
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date
+from typing import Dict, Any, Set, Tuple
+from schemas.models import ResumeRaw, ResumeFacts, ResumeExtraction, ResumeDerived
+from schemas import load_json_schema
+from ..settings import settings
 from .file_loader import fetch_object
-from .text_extract import file_to_text
+from .text_extract import file_to_text, file_to_text_async
 from .llm_rpc_client import ask_json
+from .resume_chunks import ResumeChunk, derive, merge_extractions, plan_chunks, sub_schema, validate_lenient
+from .resume_rules import RuleExtraction, education_band, pre_extract
 
 logger = logging.getLogger("extract_validate.resume")
 
@@ -18,6 +24,12 @@ SYSTEM_PROMPT = (
     "- Respond with ONLY JSON (no prose, no code fences)."
 )
 
+# Bump when the prompt, schema or fact derivation changes (invalidates the extraction cache)
+EXTRACTOR_VERSION = "3"
+
+# per-chunk LLM calls are blocking gRPC requests; shared across concurrent resumes
+_llm_pool = ThreadPoolExecutor(max_workers=settings.RESUME_LLM_CONCURRENCY, thread_name_prefix="resume-llm")
+
 def _truncate(s: str, n: int = 1000) -> str:
     if s is None:
         return ""
@@ -25,57 +37,105 @@ def _truncate(s: str, n: int = 1000) -> str:
 
 def load_resume_raw(object_key: str) -> ResumeRaw:
     data, fname = fetch_object(object_key)
-    text = file_to_text(data, fname)
-    return ResumeRaw(text=text)
+    return raw_from_bytes(data, fname)
 
-def features_from_raw(raw: ResumeRaw) -> ResumeFacts:
-    schema = load_json_schema("resume_extraction")
-    model = os.getenv("RESUME_MODEL", "gpt-3.5-turbo")
+def raw_from_bytes(data: bytes, fname: str) -> ResumeRaw:
+    """Text extraction only (CPU-bound; top-level so it can run in a worker process)."""
+    return ResumeRaw(text=file_to_text(data, fname))
 
-    prompt = f"Resume text:\n{raw.text[:20000]}\n\nExtract exactly per the provided JSON Schema."
-
-    logger.info(
-        "LLM resume extraction: request",
-        extra={
-            "llm_model": model,
-            "prompt_preview": _truncate(prompt, 600),
-            "system_preview": _truncate(SYSTEM_PROMPT, 600),
-        },
-    )
+async def raw_from_bytes_async(data: bytes, fname: str) -> ResumeRaw:
+    """Text extraction in the CPU pool; PDFs are split across workers by page."""
+    return ResumeRaw(text=await file_to_text_async(data, fname))
 
+def _extract_chunk(chunk: ResumeChunk, schema: Dict[str, Any], model: str) -> Dict[str, Any]:
+    prompt = f"Resume section ({chunk.group}):\n{chunk.text}\n\nExtract exactly per the provided JSON Schema."
     t0 = time.monotonic()
     data: Dict[str, Any] = ask_json(
         prompt=prompt,
         system=SYSTEM_PROMPT,
         model=model,
-        json_schema=schema,
+        json_schema=sub_schema(schema, chunk.properties),
         temperature=0.1,
         max_tokens=1500,
     )
-    latency_ms = int((time.monotonic() - t0) * 1000)
     logger.info(
-        "LLM resume extraction: response",
+        "LLM resume extraction: chunk response",
         extra={
             "llm_model": model,
-            "latency_ms": latency_ms,
+            "chunk_group": chunk.group,
+            "chunk_chars": len(chunk.text),
+            "latency_ms": int((time.monotonic() - t0) * 1000),
             "json_size": len(json.dumps(data, ensure_ascii=False)),
             "keys": list(data.keys())[:15],
         },
     )
+    # a chunk only answers for its own sub-schema; fields of the wrong shape are dropped, not fatal
+    return validate_lenient(ResumeExtraction, {k: v for k, v in data.items() if k in chunk.properties})
+
+def _remaining(chunk: ResumeChunk, covered: Set[str]) -> Tuple[str, ...]:
+    """Properties of `chunk` the rules did not already fill with confidence."""
+    props = tuple(p for p in chunk.properties if p not in covered)
+    if chunk.group == "profile" and set(chunk.sections) <= {"header"}:
+        # the lines above the first heading only carry name and contact details
+        props = tuple(p for p in props if p in ("name", "contact"))
+    return props
+
+def extract_structured(text: str) -> Dict[str, Any]:
+    """
+    Rule-based pre-extraction runs first (RESUME_RULES); what it covers with
+    confidence is not asked of the LLM. The remaining section-aware chunks
+    (experience, education, skills, profile) are extracted in parallel, each against
+    its slice of resume_extraction.schema.json, then merged deterministically (rule
+    values first) and validated as ResumeExtraction. Each chunk is validated on its
+    own first, dropping values of the wrong shape, so LLM drift never fails the
+    document. The result depends only on the text (it is what the extraction cache
+    keeps); `derived` is added by facts_from_structured.
+    """
+    schema = load_json_schema("resume_extraction")
+    model = os.getenv("RESUME_MODEL", "gpt-3.5-turbo")
+    all_props = tuple(p for p in schema["properties"] if p != "derived")
+    chunks = plan_chunks(text, settings.RESUME_CHUNK_CHARS, all_props)
+    pre = pre_extract(text) if settings.RESUME_RULES else RuleExtraction()
+    todo = [replace(c, properties=props) for c in chunks if (props := _remaining(c, pre.covered))]
+
+    logger.info(
+        "LLM resume extraction: request",
+        extra={
+            "llm_model": model,
+            "chunks": [f"{c.group}:{len(c.text)}" for c in todo],
+            "rules_covered": sorted(pre.covered),
+            "chunks_skipped": len(chunks) - len(todo),
+            "system_preview": _truncate(SYSTEM_PROMPT, 600),
+        },
+    )
+    t0 = time.monotonic()
+    parts = list(_llm_pool.map(lambda c: _extract_chunk(c, schema, model), todo))
+    logger.info("LLM resume extraction: %d/%d chunks in %d ms", len(todo), len(chunks), int((time.monotonic() - t0) * 1000))
+
+    return validate_lenient(ResumeExtraction, merge_extractions([pre.data] + parts))
+
+def features_from_raw(raw: ResumeRaw) -> ResumeFacts:
+    return facts_from_structured(extract_structured(raw.text))
+
+def facts_from_structured(structured: Dict[str, Any], today: date | None = None) -> ResumeFacts:
+    """
+    Canonical facts from a structured extraction. `derived` (tenure, gaps, current
+    employment) depends on today's date, so it is recomputed from the experience on
+    every call -- also for extractions served from the cache.
+    """
+    data = {k: v for k, v in structured.items() if k != "derived"}
+    data["derived"] = ResumeDerived.model_validate(derive(data, today)).model_dump(exclude_none=True)
+    derived = data["derived"]
 
     # derive your six canonical features from the structured JSON (fallbacks if missing)
-    employment_current = bool(data.get("derived", {}).get("employment_current",
-                            data.get("employment_current", False)))
-    employment_tenure_months = int(data.get("derived", {}).get("employment_tenure_months",
-                                data.get("employment_tenure_months", 0)))
-    recent_job_gap_days = int(data.get("derived", {}).get("recent_job_gap_days",
-                            data.get("recent_job_gap_days", 0)))
-    occupation_code = str(data.get("derived", {}).get("occupation_code",
-                        data.get("occupation_code", "NA")))
-    education_level_band = str(data.get("derived", {}).get("education_level_band",
-                              data.get("education_level_band", "bachelor")))
-    sector_match_to_inflows = bool(data.get("derived", {}).get("sector_match_to_inflows",
-                                 data.get("sector_match_to_inflows", False)))
+    employment_current = bool(derived.get("employment_current", False))
+    employment_tenure_months = int(derived.get("latest_tenure_months", 0))
+    # the trailing gap (open end) is the one since the last job
+    open_gaps = [g for g in derived.get("employment_gaps", []) if g.get("end") is None]
+    recent_job_gap_days = int(open_gaps[-1].get("days") or 0) if open_gaps and not employment_current else 0
+    occupation_code = str(derived.get("occupation_code", data.get("occupation_code", "NA")))
+    education_level_band = str(education_band(data.get("education")) or data.get("education_level_band", "bachelor"))
+    sector_match_to_inflows = bool(derived.get("sector_match_to_inflows", data.get("sector_match_to_inflows", False)))
 
     # pack BOTH: canonical features + full structured payload
     return ResumeFacts(
@@ -85,5 +145,5 @@ def features_from_raw(raw: ResumeRaw) -> ResumeFacts:
         occupation_code=occupation_code,
         education_level_band=education_level_band,
         sector_match_to_inflows=sector_match_to_inflows,
-        structured=data,   # 👈 everything the LLM returned
+        structured=data,   # 👈 merged extraction (LLM chunks + derived)
     )
@@ -0,0 +1,264 @@
+import copy
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+# Section headings as they appear in CVs -> canonical section
+SECTION_ALIASES: Dict[str, List[str]] = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"],
+    "education": ["education", "education and training", "academic background", "academic qualifications",
+                  "qualifications"],
+    "skills": ["skills", "key skills", "technical skills", "core competencies", "competencies",
+               "technologies", "tools", "languages", "skills and languages"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications",
+                       "courses", "training"],
+    "projects": ["projects", "key projects", "personal projects"],
+    "other": ["awards", "honors", "honours", "achievements", "publications", "volunteering",
+              "volunteer experience", "interests", "hobbies", "references"],
+}
+
+# Chunk groups: which sections go into one prompt, and which top-level properties of
+# resume_extraction.schema.json that prompt is asked for. "header" is the text above
+# the first heading (name, contact lines).
+CHUNK_GROUPS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "profile": (("header", "summary", "certifications", "projects", "other"),
+                ("name", "contact", "summary", "certifications", "projects", "publications", "awards",
+                 "volunteering", "availability", "work_preferences", "visa_right_to_work")),
+    "experience": (("experience",), ("experience",)),
+    "education": (("education",), ("education",)),
+    "skills": (("skills",), ("skills",)),
+}
+
+_HEADING = re.compile(
+    r"^[\s#*\-•|]*(" + "|".join(sorted((re.escape(a) for aliases in SECTION_ALIASES.values() for a in aliases),
+                                       key=len, reverse=True)) + r")[\s:|\-]*$",
+    re.IGNORECASE,
+)
+_ALIAS_TO_SECTION = {a: s for s, aliases in SECTION_ALIASES.items() for a in aliases}
+
+@dataclass(frozen=True)
+class ResumeChunk:
+    group: str
+    text: str
+    properties: Tuple[str, ...]
+    sections: Tuple[str, ...] = ()
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """(section, text) in document order; a heading line starts a new section."""
+    out: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.splitlines():
+        m = _HEADING.match(line) if len(line) <= 60 else None
+        if m:
+            out.append((_ALIAS_TO_SECTION[m.group(1).lower()], []))
+        else:
+            out[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in out if any(l.strip() for l in lines)]
+
+def _pack(text: str, max_chars: int) -> List[str]:
+    """Greedy split at paragraph, then line, boundaries into pieces of at most max_chars."""
+    pieces: List[str] = []
+    for para in re.split(r"\n\s*\n", text):
+        for line in (para.splitlines() if len(para) > max_chars else [para]):
+            pieces.extend(line[i:i + max_chars] for i in range(0, max(len(line), 1), max_chars))
+    chunks, cur = [], ""
+    for p in pieces:
+        if cur and len(cur) + 2 + len(p) > max_chars:
+            chunks.append(cur)
+            cur = p
+        else:
+            cur = f"{cur}\n\n{p}" if cur else p
+    if cur.strip():
+        chunks.append(cur)
+    return chunks
+
+def plan_chunks(text: str, max_chars: int, all_properties: Tuple[str, ...]) -> List[ResumeChunk]:
+    """
+    Section-aware chunks. Sections of a group are joined in document order; a group
+    longer than max_chars is split into several chunks with the same sub-schema.
+    A CV without recognizable headings is split by size, each chunk asked for
+    `all_properties`.
+    """
+    sections = split_sections(text)
+    if all(name == "header" for name, _ in sections):
+        return [ResumeChunk("full", c, all_properties, ("header",)) for c in _pack(text, max_chars)]
+    chunks: List[ResumeChunk] = []
+    for group, (members, props) in CHUNK_GROUPS.items():
+        present = tuple(dict.fromkeys(name for name, _ in sections if name in members))
+        body = "\n\n".join(t for name, t in sections if name in members)
+        chunks.extend(ResumeChunk(group, c, props, present) for c in _pack(body, max_chars) if body)
+    return chunks
+
+def sub_schema(schema: Dict[str, Any], properties: Tuple[str, ...]) -> Dict[str, Any]:
+    sub = {k: v for k, v in schema.items() if k != "properties"}
+    sub["properties"] = {p: copy.deepcopy(schema["properties"][p]) for p in properties if p in schema["properties"]}
+    return sub
+
+# ---------------------------------------------------------------- deterministic merge
+
+def _norm(v: Any) -> str:
+    return re.sub(r"\W+", " ", str(v or "")).strip().casefold()
+
+def _identity(item: Any) -> Any:
+    """Key under which list items from different chunks are the same entry."""
+    if isinstance(item, dict):
+        for fields in (("company", "title", "start_date"), ("degree", "institution"), ("name",)):
+            if any(item.get(f) for f in fields):
+                return (fields,) + tuple(_norm(item.get(f)) for f in fields)
+        return json.dumps(item, sort_keys=True, default=str)
+    return _norm(item) if isinstance(item, str) else json.dumps(item, sort_keys=True, default=str)
+
+def _empty(v: Any) -> bool:
+    return v is None or v == "" or v == [] or v == {}
+
+def _merge(a: Any, b: Any) -> Any:
+    """Earlier value wins for scalars; objects merge per key; lists union by identity."""
+    if _empty(a):
+        return b
+    if _empty(b):
+        return a
+    if isinstance(a, dict) and isinstance(b, dict):
+        return {k: _merge(a.get(k), b.get(k)) for k in list(a) + [k for k in b if k not in a]}
+    if isinstance(a, list) and isinstance(b, list):
+        merged: Dict[Any, Any] = {}
+        for item in a + b:
+            key = _identity(item)
+            merged[key] = _merge(merged[key], item) if key in merged else item
+        return list(merged.values())
+    return a
+
+def merge_extractions(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chunk results in document order -> one extraction; same input, same output."""
+    out: Dict[str, Any] = {}
+    for p in parts:
+        if isinstance(p, dict):
+            out = _merge(out, {k: v for k, v in p.items() if k != "derived"})
+    return out
+
+# ---------------------------------------------------------------- lenient validation
+
+_DROPPED = object()
+_MAX_REPAIR_PASSES = 8
+
+def _drop_at(obj: Any, loc: Tuple[Any, ...]) -> None:
+    """Mark the deepest value along `loc` that exists (union / type tags stop the walk)."""
+    parent, key, cur = None, None, obj
+    for part in loc:
+        if isinstance(cur, dict) and part in cur or isinstance(cur, list) and isinstance(part, int) and 0 <= part < len(cur):
+            parent, key, cur = cur, part, cur[part]
+        else:
+            break
+    if parent is not None:
+        parent[key] = _DROPPED
+
+def _purge(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _purge(v) for k, v in obj.items() if v is not _DROPPED}
+    if isinstance(obj, list):
+        return [_purge(v) for v in obj if v is not _DROPPED]
+    return obj
+
+def validate_lenient(model: Type[BaseModel], data: Any) -> Dict[str, Any]:
+    """
+    LLM output -> a dict valid for `model`. Values that do not fit (team_size_managed
+    "5-10", skills given as a list, a string where an object belongs) are dropped at
+    the failing location instead of failing the whole document.
+    """
+    data = copy.deepcopy(data) if isinstance(data, dict) else {}
+    for _ in range(_MAX_REPAIR_PASSES):
+        try:
+            return model.model_validate(data).model_dump(exclude_none=True)
+        except ValidationError as e:
+            for err in e.errors():
+                _drop_at(data, err["loc"])
+            data = _purge(data)
+    return {}
+
+# ---------------------------------------------------------------- derived fields
+
+_PRESENT = {"present", "current", "now", "today", "ongoing", "till date", "to date"}
+
+def parse_month(s: Optional[str]) -> Optional[date]:
+    """'2021-03', '2021-03-15', '2021' -> first day of that month (year -> January)."""
+    if not s:
+        return None
+    m = re.match(r"^\s*(\d{4})(?:[-/.](\d{1,2}))?", str(s))
+    if not m:
+        return None
+    month = int(m.group(2) or 1)
+    return date(int(m.group(1)), month if 1 <= month <= 12 else 1, 1)
+
+def _months(a: date, b: date) -> int:
+    return max(0, (b.year - a.year) * 12 + (b.month - a.month))
+
+_SENIORITY_TITLES = [(level, re.compile(rx, re.IGNORECASE)) for level, rx in (
+    ("cxo", r"\b(chief|ceo|cto|cfo|coo|cio)\b"), ("vp", r"\b(vice president|vp)\b"),
+    ("director", r"\b(director|head of)\b"), ("principal", r"\bprincipal\b"), ("staff", r"\bstaff\b"),
+    ("senior", r"\b(senior|sr\.?|lead)\b"), ("junior", r"\b(junior|jr\.?|intern|trainee|graduate)\b"),
+)]
+
+def _seniority(years: float, title: str) -> str:
+    for level, rx in _SENIORITY_TITLES:
+        if rx.search(title):
+            return level
+    if years <= 0:
+        return "unknown"
+    return "junior" if years < 2 else "mid" if years < 5 else "senior"
+
+def derive(extraction: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Any]:
+    """ResumeDerived fields computed from the experience list (never asked of the LLM)."""
+    today = today or date.today()
+    # validated extractions only hold dicts here; anything else is skipped, never raised on
+    experience = [e for e in extraction.get("experience") or [] if isinstance(e, dict)]
+    dated = []
+    for e in experience:
+        start = parse_month(e.get("start_date"))
+        if start is not None:
+            dated.append((start, str(e.get("end_date") or "").strip().lower(), e))
+    dated.sort(key=lambda d: d[0])
+    spans = []
+    for i, (start, end_raw, e) in enumerate(dated):
+        # an open-ended entry counts as current only if nothing says otherwise and it is the latest job
+        current = bool(e.get("is_current")) or end_raw in _PRESENT or (
+            not end_raw and e.get("is_current") is None and i == len(dated) - 1)
+        end = today if current else (parse_month(end_raw) or start)
+        spans.append((start, max(start, end), current, e))
+
+    # union of employment intervals, and the holes between them (plus after the last job)
+    merged: List[List[date]] = []
+    for start, end, _, _ in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    employment_current = any(s[2] for s in spans)
+    gaps = [{"start": a[1].isoformat()[:7], "end": b[0].isoformat()[:7], "days": (b[0] - a[1]).days}
+            for a, b in zip(merged, merged[1:]) if (b[0] - a[1]).days > 31]
+    if merged and not employment_current and (today - merged[-1][1]).days > 31:
+        gaps.append({"start": merged[-1][1].isoformat()[:7], "end": None, "days": (today - merged[-1][1]).days})
+
+    years = round(sum(_months(a, b) for a, b in merged) / 12.0, 1)
+    latest = max(spans, key=lambda s: s[0]) if spans else None
+    teams = [e.get("team_size_managed") for e in experience if isinstance(e.get("team_size_managed"), int)]
+    industries = Counter(str(e["industry"]).strip() for e in experience if e.get("industry"))
+    skills = extraction.get("skills") if isinstance(extraction.get("skills"), dict) else {}
+    skill_counts = Counter()
+    for s in (skills.get("hard") or []) + (skills.get("tools") or []) + [x for e in experience for x in (e.get("skills_used") or [])]:
+        skill_counts[str(s).strip()] += 1
+
+    return {
+        "years_experience_total": years if spans else None,
+        "seniority_level": _seniority(years, str(latest[3].get("title") or "") if latest else ""),
+        "employment_current": employment_current if spans else None,
+        "latest_tenure_months": _months(latest[0], latest[1]) if latest else None,
+        "largest_team_managed": max(teams) if teams else None,
+        "primary_industries": [i for i, _ in industries.most_common(3)] or None,
+        "skills_top": [s for s, _ in skill_counts.most_common(10) if s] or None,
+        "employment_gaps": gaps or None,
+    }
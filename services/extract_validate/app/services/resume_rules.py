@@ -0,0 +1,246 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .resume_chunks import split_sections
+
+# Deterministic (regex + dictionary) resume extraction. Fields found with high
+# confidence are "covered" and not asked of the LLM again.
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"(?<![\w/])\+?\d[\d\s().-]{7,}\d(?![\w/])")
+_LINKEDIN = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/in/[\w%-]+/?", re.IGNORECASE)
+_GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+/?", re.IGNORECASE)
+_URL = re.compile(r"https?://[^\s|,;]+", re.IGNORECASE)
+
+_MONTHS = {m: i for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+_DATE = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4}|\d{1,2}[/.]\d{4}|\d{4}[/.-]\d{1,2}(?!\d)|\d{4})"
+_RANGE = re.compile(
+    rf"\b(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|present|current|now|today)\b",
+    re.IGNORECASE,
+)
+_YEAR = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+_SEP = re.compile(r"\s+(?:at|@)\s+|\s*[,|]\s*|\s+[–—-]\s+")
+
+_TITLE_WORDS = re.compile(
+    r"\b(engineer|developer|manager|analyst|officer|assistant|director|consultant|specialist|lead|head|"
+    r"intern|accountant|teacher|nurse|driver|technician|administrator|architect|designer|coordinator|"
+    r"supervisor|executive|clerk|cashier|representative|agent|associate|scientist|advisor|president|"
+    r"founder|owner|programmer|operator|salesman|sales|trainee)\b",
+    re.IGNORECASE,
+)
+
+# degree keyword -> education band used in ResumeFacts
+_DEGREES: List[Tuple[str, str]] = [
+    (r"ph\.?\s?d|doctorate|doctor of", "masters+"),
+    (r"master(?:'?s)?|m\.?\s?sc|mba|m\.?\s?eng|m\.?a\.|mphil", "masters+"),
+    (r"bachelor(?:'?s)?|b\.?\s?sc|b\.?\s?eng|b\.?\s?tech|b\.?a\.|bcom|b\.?\s?com|bba", "bachelor"),
+    (r"diploma|associate degree|higher diploma", "hs"),
+    (r"high school|secondary school|thanaweya|general secondary", "hs"),
+]
+_DEGREE = re.compile(r"\b(" + "|".join(rx for rx, _ in _DEGREES) + r")", re.IGNORECASE)
+_DEGREE_BANDS = [(re.compile(rf"^(?:{rx})", re.IGNORECASE), band) for rx, band in _DEGREES]
+_INSTITUTION = re.compile(r"\b(university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+
+KNOWN_SKILLS: Dict[str, List[str]] = {
+    "hard": ["python", "java", "javascript", "typescript", "c++", "c#", "go", "sql", "r", "scala", "php", "ruby",
+             "machine learning", "deep learning", "data analysis", "statistics", "accounting", "bookkeeping",
+             "project management", "customer service", "sales", "marketing", "networking", "cybersecurity",
+             "autocad", "html", "css", "react", "angular", "django", "fastapi", "spring", "node.js", "pandas",
+             "electrical maintenance", "welding", "nursing", "teaching", "logistics", "procurement"],
+    "tools": ["excel", "word", "powerpoint", "ms office", "microsoft office", "sap", "oracle", "salesforce",
+              "docker", "kubernetes", "aws", "azure", "gcp", "git", "jira", "tableau", "power bi", "linux",
+              "postgresql", "mysql", "mongodb", "redis", "spark", "hadoop", "quickbooks", "photoshop"],
+    "soft": ["communication", "teamwork", "leadership", "problem solving", "time management", "negotiation"],
+}
+KNOWN_LANGUAGES = ["arabic", "english", "french", "hindi", "urdu", "tagalog", "spanish", "german", "russian",
+                   "persian", "farsi", "turkish", "malayalam", "bengali", "chinese", "mandarin"]
+_PROFICIENCY = {"native": "native", "mother tongue": "native", "fluent": "advanced", "advanced": "advanced",
+                "professional": "advanced", "intermediate": "intermediate", "conversational": "intermediate",
+                "basic": "basic", "beginner": "basic", "elementary": "basic"}
+_SKILL_INDEX = {s: kind for kind, skills in KNOWN_SKILLS.items() for s in skills}
+_LANG_RX = re.compile(r"\b(" + "|".join(KNOWN_LANGUAGES) + r")\b(?:\s*[(:\-–]\s*(" + "|".join(_PROFICIENCY) + r"))?",
+                      re.IGNORECASE)
+
+@dataclass
+class RuleExtraction:
+    data: Dict[str, Any] = field(default_factory=dict)
+    # top-level ResumeExtraction properties complete enough to skip the LLM for
+    covered: Set[str] = field(default_factory=set)
+
+def iso_date(s: str) -> Optional[str]:
+    """'Mar 2021' / '03/2021' / '2021-03' -> '2021-03'; '2021' -> '2021'; present -> None."""
+    s = s.strip().lower()
+    m = re.match(r"([a-z]{3})[a-z]*\.?\s+(\d{4})$", s)
+    if m and m.group(1) in _MONTHS:
+        return f"{m.group(2)}-{_MONTHS[m.group(1)]:02d}"
+    m = re.match(r"(\d{1,2})[/.](\d{4})$", s) or re.match(r"(\d{4})[/.-](\d{1,2})$", s)
+    if m:
+        year, month = (m.group(2), m.group(1)) if len(m.group(1)) <= 2 else (m.group(1), m.group(2))
+        return f"{year}-{int(month):02d}" if 1 <= int(month) <= 12 else year
+    return s if re.fullmatch(r"\d{4}", s) else None
+
+def education_band(education: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """Highest band over the degrees listed ("hs" < "bachelor" < "masters+")."""
+    order = {"hs": 0, "bachelor": 1, "masters+": 2}
+    best = None
+    for e in education or []:
+        degree = str(e.get("degree") or "").strip()
+        m = _DEGREE.search(degree)
+        for rx, band in _DEGREE_BANDS:
+            if m and rx.match(m.group(1)) and (best is None or order[band] > order[best]):
+                best = band
+    return best
+
+def _contact(text: str) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    if m := _EMAIL.search(text):
+        out["email"] = m.group(0)
+    for m in _PHONE.finditer(text):
+        if sum(ch.isdigit() for ch in m.group(0)) >= 9 and not _RANGE.search(m.group(0)):
+            out["phone"] = re.sub(r"\s+", " ", m.group(0).strip())
+            break
+    if m := _LINKEDIN.search(text):
+        out["linkedin"] = m.group(0)
+    if m := _GITHUB.search(text):
+        out["github"] = m.group(0)
+    for m in _URL.finditer(text):
+        if "linkedin.com" not in m.group(0).lower() and "github.com" not in m.group(0).lower():
+            out["website"] = m.group(0)
+            break
+    return out
+
+def _name(header: str) -> Optional[str]:
+    """
+    The first header line, when it reads as a name and sits where a name does: right
+    above the contact block (email / phone within the next few lines). A job title
+    or a heading in that position ("Senior Software Engineer") is not a name.
+    """
+    lines = [l.strip() for l in header.splitlines() if l.strip()]
+    if not lines:
+        return None
+    line, below = lines[0], "\n".join(lines[1:4])
+    words = line.split()
+    if not (2 <= len(words) <= 5 and all(re.fullmatch(r"[^\W\d_](?:[^\W\d_]|['.-])*", w) for w in words)):
+        return None
+    if line.lower() in ("curriculum vitae", "resume") or _TITLE_WORDS.search(line) or _DEGREE.search(line):
+        return None
+    if not (_EMAIL.search(below) or _PHONE.search(below)):
+        return None
+    return line
+
+def _title_company(text: str) -> Tuple[Optional[str], Optional[str]]:
+    parts = [p.strip(" -–—|,:") for p in _SEP.split(text) if p and p.strip(" -–—|,:")]
+    if len(parts) < 2:
+        return None, None
+    titles = [p for p in parts[:2] if _TITLE_WORDS.search(p)]
+    if len(titles) != 1:
+        return None, None
+    title = titles[0]
+    company = parts[1] if parts[0] == title else parts[0]
+    return title, company
+
+def _experience(section: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Entries from date-range lines; confident only when the whole section was parsed:
+    each range yielded a title, company and start date, and every other line is the
+    title line of a range. Anything else (an undated entry, bullet points with the
+    achievements and skills used) only the LLM can fill, so the section is left to it.
+    """
+    lines = section.splitlines()
+    items, complete, used = [], True, set()
+    for i, line in enumerate(lines):
+        m = _RANGE.search(line)
+        if not m:
+            continue
+        used.add(i)
+        rest = (line[:m.start()] + " " + line[m.end():]).strip(" -–—|,:()")
+        if not rest:
+            prev = next((j for j in range(i - 1, -1, -1) if lines[j].strip()), None)
+            if prev is not None:
+                used.add(prev)
+                rest = lines[prev].strip(" -–—|,:")
+        title, company = _title_company(rest)
+        end_raw = m.group("end").lower()
+        current = end_raw in ("present", "current", "now", "today")
+        item = {"title": title, "company": company, "start_date": iso_date(m.group("start")),
+                "end_date": None if current else iso_date(m.group("end")), "is_current": current}
+        complete = complete and bool(title and company and item["start_date"])
+        items.append({k: v for k, v in item.items() if v is not None})
+    if any(line.strip() and i not in used for i, line in enumerate(lines)):
+        complete = False
+    return items, complete and bool(items)
+
+def _education(section: str) -> Tuple[List[Dict[str, Any]], bool]:
+    lines = [l.strip() for l in section.splitlines() if l.strip()]
+    items, complete = [], True
+    for i, line in enumerate(lines):
+        m = _DEGREE.search(line)
+        if not m:
+            continue
+        item: Dict[str, Any] = {"degree": m.group(1).strip()}
+        after = line[m.end():]
+        if f := re.match(r"\s*(?:of|in)?\s*(?:science|arts|engineering)?\s*(?:in\s+)?([A-Za-z &]+)", after):
+            if f.group(1).strip() and not _INSTITUTION.search(f.group(1)):
+                item["field"] = f.group(1).strip()
+        source = line
+        for cand in [p.strip() for p in re.split(r"[,|–—]| - ", line)] + lines[i + 1:i + 2]:
+            if _INSTITUTION.search(cand) and not _DEGREE.search(cand):
+                item["institution"] = _YEAR.sub("", _RANGE.sub("", cand)).strip(" ,-–—()")
+                source = line if cand in line else f"{line} {cand}"
+                break
+        if r := _RANGE.search(source):
+            item["start_date"], item["end_date"] = iso_date(r.group("start")), iso_date(r.group("end"))
+        elif years := _YEAR.findall(source):
+            item["end_date"] = years[-1]
+        complete = complete and "institution" in item
+        items.append(item)
+    return items, complete and bool(items)
+
+def _skills(section: str) -> Tuple[Dict[str, Any], bool]:
+    tokens = [t.strip(" -*•·\t") for t in re.split(r"[,;•|/\n]", section)]
+    tokens = [re.sub(r"^(?:skills|languages|tools|technical skills|soft skills)\s*:\s*", "", t, flags=re.IGNORECASE)
+              for t in tokens if t and len(t) <= 40]
+    out: Dict[str, List[Any]] = {}
+    unknown = 0
+    for t in tokens:
+        if lang := _LANG_RX.match(t):
+            entry = {"name": lang.group(1).capitalize()}
+            if lang.group(2):
+                entry["proficiency"] = _PROFICIENCY[lang.group(2).lower()]
+            out.setdefault("languages", []).append(entry)
+        elif t.lower() in _SKILL_INDEX:
+            out.setdefault(_SKILL_INDEX[t.lower()], []).append(t)
+        elif t.rstrip(":").lower() not in ("skills", "languages", "tools", "technical skills", "soft skills"):
+            unknown += 1
+    # confident only when every listed item is a known skill or language: the LLM is
+    # still asked whenever the section holds anything the dictionary cannot place
+    return out, bool(out) and unknown == 0
+
+def pre_extract(text: str) -> RuleExtraction:
+    sections = split_sections(text)
+    by_name: Dict[str, str] = {}
+    for name, body in sections:
+        by_name[name] = f"{by_name[name]}\n{body}" if name in by_name else body
+    headed = any(name != "header" for name, _ in sections)
+    res = RuleExtraction()
+
+    if name := _name(by_name.get("header", "")):
+        res.data["name"] = name
+        res.covered.add("name")
+    contact = _contact(by_name.get("header", "") if headed else text[:2000])
+    if contact:
+        res.data["contact"] = contact
+        if "email" in contact and "phone" in contact:
+            res.covered.add("contact")
+
+    # without headings there is no section to vouch for, so nothing beyond contact is covered
+    if not headed:
+        return res
+    for prop, extractor in (("experience", _experience), ("education", _education), ("skills", _skills)):
+        if prop not in by_name:
+            continue
+        value, confident = extractor(by_name[prop])
+        if confident:
+            res.data[prop] = value
+            res.covered.add(prop)
+    return res
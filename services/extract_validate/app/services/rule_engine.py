@@ -0,0 +1,460 @@
+import ast
+import hashlib
+import json
+import logging
+import operator
+import os
+import string
+import threading
+import time
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+import numpy as np
+from schemas.models import ValidationIssue
+
+logger = logging.getLogger("extract_validate.rules")
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+class RuleError(ValueError):
+    """A rule config that does not compile (bad expression, unknown name, cycle, ...)."""
+
+
+# =========================
+# Signals
+# =========================
+
+@dataclass(frozen=True)
+class Signal:
+    """
+    A named per-application input that rules can reference. A source signal (no deps)
+    reads the batch: fn(batch) -> array of len n. A derived signal gets its deps'
+    arrays, restricted to the rows where all of them are present: fn(*deps) -> array.
+    Missing values are NaN (numbers) or None (objects); booleans are stored as 1.0/0.0.
+    """
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "f":
+        return ~np.isnan(values)
+    return np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+
+
+def _as_signal(values: Any, n: int) -> np.ndarray:
+    a = np.asarray(values)
+    if a.dtype.kind in "biu":
+        return a.astype(np.float64)
+    if a.dtype.kind != "f" and a.dtype != object:
+        a = a.astype(object)
+    if a.shape != (n,):
+        raise ValueError(f"signal returned shape {a.shape}, expected ({n},)")
+    return a
+
+
+def _missing(like: np.ndarray, n: int) -> np.ndarray:
+    return np.full(n, np.nan) if like.dtype.kind == "f" else np.full(n, None, dtype=object)
+
+
+# =========================
+# Expressions
+# =========================
+# A rule expression is a Python expression over signal and param names, limited to
+# arithmetic, comparisons (chains allowed), and/or/not and a few functions. It is
+# compiled once into closures that work on whole numpy arrays.
+
+_BIN = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_CMP = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+        ast.Eq: operator.eq, ast.NotEq: operator.ne}
+_FUNCS = {"abs": np.abs, "min": np.minimum, "max": np.maximum}
+
+Expr = Callable[[Dict[str, Any]], Any]
+
+
+def _truth(x: Any) -> np.ndarray:
+    a = np.asarray(x)
+    if a.dtype == bool:
+        return a
+    if a.dtype.kind in "fiu":
+        return np.nan_to_num(a) != 0
+    return np.array([bool(v) for v in a.ravel()], dtype=bool).reshape(a.shape)
+
+
+def compile_expr(text: str, known: FrozenSet[str]) -> Tuple[Expr, FrozenSet[str]]:
+    """(evaluator over an env of arrays/scalars, names it references)."""
+    try:
+        tree = ast.parse(str(text), mode="eval")
+    except SyntaxError as e:
+        raise RuleError(f"invalid expression {text!r}: {e.msg}") from None
+    names = set()
+
+    def build(node: ast.AST) -> Expr:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float, str)):
+            value = node.value
+            return lambda env: value
+        if isinstance(node, ast.Name):
+            if node.id not in known:
+                raise RuleError(f"unknown name {node.id!r} in {text!r}")
+            names.add(node.id)
+            key = node.id
+            return lambda env: env[key]
+        if isinstance(node, ast.BoolOp):
+            parts = [build(v) for v in node.values]
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda env: reduce(op, (_truth(p(env)) for p in parts))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            inner = build(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda env: ~_truth(inner(env))
+            return lambda env: -inner(env)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BIN:
+            op, left, right = _BIN[type(node.op)], build(node.left), build(node.right)
+            return lambda env: op(left(env), right(env))
+        if isinstance(node, ast.Compare) and all(type(o) in _CMP for o in node.ops):
+            ops = [_CMP[type(o)] for o in node.ops]
+            operands = [build(node.left)] + [build(c) for c in node.comparators]
+
+            def compare(env):
+                values = [o(env) for o in operands]
+                return reduce(np.logical_and, (op(values[i], values[i + 1]) for i, op in enumerate(ops)))
+            return compare
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCS
+                and not node.keywords):
+            fn, args = _FUNCS[node.func.id], [build(a) for a in node.args]
+            return lambda env: fn(*(a(env) for a in args))
+        raise RuleError(f"unsupported syntax ({type(node).__name__}) in {text!r}")
+
+    return build(tree.body), frozenset(names)
+
+
+# =========================
+# Rules
+# =========================
+
+_RULE_KEYS = {"id", "key", "when", "severity", "confidence", "message", "sources", "suggest", "unless", "enabled"}
+
+
+@dataclass
+class _Tier:
+    when: Optional[Expr]
+    level: str
+    confidence: float
+
+
+@dataclass
+class CompiledRule:
+    id: str
+    key: str
+    when: Expr
+    tiers: List[_Tier]
+    message: str
+    message_fields: Tuple[str, ...]
+    sources: List[str]
+    suggest: Optional[str]
+    unless: Tuple[str, ...]
+    inputs: Tuple[str, ...]       # signals that must be present for a row to be evaluated
+    spec: Dict[str, Any]
+
+
+@dataclass
+class RuleStats:
+    evaluated: int = 0            # rows the condition ran on
+    skipped: int = 0              # rows with a missing input (or suppressed by `unless`)
+    hits: int = 0
+    seconds: float = 0.0
+
+
+def _compile_rule(spec: Dict[str, Any], known: FrozenSet[str], signals: FrozenSet[str]) -> CompiledRule:
+    rid = spec.get("id")
+    if not rid or not isinstance(rid, str):
+        raise RuleError(f"rule without an id: {spec!r}")
+    unknown = set(spec) - _RULE_KEYS
+    if unknown:
+        raise RuleError(f"{rid}: unknown keys {sorted(unknown)}")
+    if "when" not in spec:
+        raise RuleError(f"{rid}: missing 'when'")
+    used = set()
+    when, names = compile_expr(spec["when"], known)
+    used |= names
+
+    severity = spec.get("severity")
+    if isinstance(severity, str):
+        severity = [{"level": severity}]
+    if not isinstance(severity, list) or not severity:
+        raise RuleError(f"{rid}: 'severity' must be a level or a list of tiers")
+    tiers = []
+    for i, tier in enumerate(severity):
+        level = tier.get("level")
+        if level not in SEVERITY_RANK:
+            raise RuleError(f"{rid}: severity level must be one of {list(SEVERITY_RANK)}, got {level!r}")
+        if ("when" in tier) == (i == len(severity) - 1):
+            raise RuleError(f"{rid}: every severity tier but the last needs 'when'; the last is the default")
+        cond = None
+        if "when" in tier:
+            cond, names = compile_expr(tier["when"], known)
+            used |= names
+        tiers.append(_Tier(cond, level, float(tier.get("confidence", spec.get("confidence", 0.8)))))
+
+    message = str(spec.get("message") or rid)
+    try:
+        fields = tuple(dict.fromkeys(f for _, f, _, _ in string.Formatter().parse(message) if f))
+    except ValueError as e:
+        raise RuleError(f"{rid}: bad message template: {e}") from None
+    for f in fields:
+        if f not in known:
+            raise RuleError(f"{rid}: unknown name {f!r} in message")
+    used |= set(fields)
+    suggest = spec.get("suggest")
+    if suggest is not None:
+        if suggest not in signals:
+            raise RuleError(f"{rid}: 'suggest' must name a signal, got {suggest!r}")
+        used.add(suggest)
+
+    return CompiledRule(
+        id=rid, key=str(spec.get("key") or rid), when=when, tiers=tiers, message=message,
+        message_fields=fields, sources=list(spec.get("sources") or []), suggest=suggest,
+        unless=tuple(spec.get("unless") or ()), inputs=tuple(sorted(used & signals)), spec=spec,
+    )
+
+
+def _toposort(items: Dict[str, Sequence[str]], what: str) -> List[str]:
+    """Depth-first order with every dependency first; ties keep the input order."""
+    order, state = [], {}
+
+    def visit(name: str, path: Tuple[str, ...]) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "active":
+            raise RuleError(f"{what} dependency cycle: {' -> '.join(path + (name,))}")
+        state[name] = "active"
+        for dep in items[name]:
+            visit(dep, path + (name,))
+        state[name] = "done"
+        order.append(name)
+
+    for name in items:
+        visit(name, ())
+    return order
+
+
+class RulePlan:
+    """
+    A rule config compiled against a signal registry: the signals the enabled rules
+    need, in dependency order, and the rules in dependency order (`unless` edges).
+    Issues for an application come out in config order.
+    """
+
+    def __init__(self, config: Dict[str, Any], signals: Dict[str, Signal], source: str = "builtin"):
+        if not isinstance(config, dict) or not isinstance(config.get("rules"), list):
+            raise RuleError("rule config must be an object with a 'rules' list")
+        self.source = source
+        self.version = hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.loaded_at = time.time()
+        self.params: Dict[str, Any] = dict(config.get("params") or {})
+        clash = set(self.params) & set(signals)
+        if clash:
+            raise RuleError(f"params shadow signals: {sorted(clash)}")
+        for k, v in self.params.items():
+            if isinstance(v, bool) or not isinstance(v, (int, float, str)):
+                raise RuleError(f"param {k!r} must be a number or string")
+        known = frozenset(self.params) | frozenset(signals)
+
+        rules = [_compile_rule(r, known, frozenset(signals)) for r in config["rules"] if r.get("enabled", True)]
+        self.rules = {}
+        for r in rules:
+            if r.id in self.rules:
+                raise RuleError(f"duplicate rule id {r.id!r}")
+            self.rules[r.id] = r
+        for r in rules:
+            for u in r.unless:
+                if u not in self.rules:
+                    raise RuleError(f"{r.id}: 'unless' refers to unknown or disabled rule {u!r}")
+        self.config_order = [r.id for r in rules]
+        self.rule_order = _toposort({r.id: r.unless for r in rules}, "rule")
+
+        needed, stack = set(), [s for r in rules for s in r.inputs]
+        while stack:
+            s = stack.pop()
+            if s not in needed:
+                needed.add(s)
+                stack.extend(signals[s].deps)
+        self.signals = [signals[s] for s in _toposort({s: signals[s].deps for s in signals if s in needed}, "signal")]
+
+        self._lock = threading.Lock()
+        self.stats = {rid: RuleStats() for rid in self.config_order}
+        self.signal_seconds = {s.name: 0.0 for s in self.signals}
+
+    def evaluate(self, batch: Any, n: int) -> Tuple[List[List[ValidationIssue]], np.ndarray]:
+        """(issues per application, worst severity rank per application; -1 = none)."""
+        values: Dict[str, np.ndarray] = {}
+        present: Dict[str, np.ndarray] = {}
+        signal_seconds: Dict[str, float] = {}
+        with np.errstate(all="ignore"):
+            for sig in self.signals:
+                t0 = time.perf_counter()
+                if not sig.deps:
+                    out = _as_signal(sig.fn(batch), n)
+                else:
+                    rows = reduce(np.logical_and, (present[d] for d in sig.deps))
+                    idx = np.flatnonzero(rows)
+                    out = np.full(n, np.nan)
+                    if idx.size:
+                        part = _as_signal(sig.fn(*(values[d][idx] for d in sig.deps)), idx.size)
+                        out = _missing(part, n)
+                        out[idx] = part
+                values[sig.name] = out
+                present[sig.name] = _present(out)
+                signal_seconds[sig.name] = time.perf_counter() - t0
+
+            hits: Dict[str, np.ndarray] = {}
+            found: Dict[str, Tuple[np.ndarray, List[ValidationIssue]]] = {}
+            stats: Dict[str, RuleStats] = {}
+            for rid in self.rule_order:
+                rule = self.rules[rid]
+                t0 = time.perf_counter()
+                rows = np.ones(n, dtype=bool)
+                for s in rule.inputs:
+                    rows &= present[s]
+                for u in rule.unless:
+                    rows &= ~hits[u]
+                idx = np.flatnonzero(rows)
+                hit_idx, issues = idx[:0], []
+                if idx.size:
+                    env = {**self.params, **{s: values[s][idx] for s in rule.inputs}}
+                    cond = np.broadcast_to(_truth(rule.when(env)), idx.shape)
+                    hit_idx = idx[cond]
+                    issues = self._issues(rule, hit_idx, values)
+                mask = np.zeros(n, dtype=bool)
+                mask[hit_idx] = True
+                hits[rid] = mask
+                found[rid] = (hit_idx, issues)
+                stats[rid] = RuleStats(int(idx.size), n - int(idx.size), int(hit_idx.size),
+                                       time.perf_counter() - t0)
+
+        per_app: List[List[ValidationIssue]] = [[] for _ in range(n)]
+        worst = np.full(n, -1, dtype=np.int8)
+        for rid in self.config_order:
+            hit_idx, issues = found[rid]
+            for i, issue in zip(hit_idx.tolist(), issues):
+                per_app[i].append(issue)
+                worst[i] = max(worst[i], SEVERITY_RANK[issue.severity])
+
+        with self._lock:
+            for rid, s in stats.items():
+                acc = self.stats[rid]
+                acc.evaluated += s.evaluated; acc.skipped += s.skipped
+                acc.hits += s.hits; acc.seconds += s.seconds
+            for name, sec in signal_seconds.items():
+                self.signal_seconds[name] += sec
+        return per_app, worst
+
+    def _issues(self, rule: CompiledRule, hit_idx: np.ndarray, values: Dict[str, np.ndarray]) -> List[ValidationIssue]:
+        if not hit_idx.size:
+            return []
+        tier_of = [len(rule.tiers) - 1] * hit_idx.size
+        if len(rule.tiers) > 1:
+            env = {**self.params, **{s: values[s][hit_idx] for s in rule.inputs}}
+            chosen = np.full(hit_idx.size, len(rule.tiers) - 1)
+            undecided = np.ones(hit_idx.size, dtype=bool)
+            for t, tier in enumerate(rule.tiers[:-1]):
+                match = undecided & np.broadcast_to(_truth(tier.when(env)), hit_idx.shape)
+                chosen[match] = t
+                undecided &= ~match
+            tier_of = chosen.tolist()
+        columns = [values[f][hit_idx].tolist() if f in values else [self.params[f]] * hit_idx.size
+                   for f in rule.message_fields]
+        messages = ([rule.message.format(**dict(zip(rule.message_fields, row))) for row in zip(*columns)]
+                    if columns else [rule.message] * hit_idx.size)
+        suggested = values[rule.suggest][hit_idx].tolist() if rule.suggest else [None] * hit_idx.size
+        issues = []
+        for tier_index, message, suggestion in zip(tier_of, messages, suggested):
+            tier = rule.tiers[tier_index]
+            # built from compiled values: skip per-object validation
+            issues.append(ValidationIssue.model_construct(
+                code=rule.id, key=rule.key, severity=tier.level, message=message,
+                sources=list(rule.sources), confidence=tier.confidence,
+                suggested_value=None if suggestion is None else str(suggestion),
+            ))
+        return issues
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "source": self.source,
+                "loaded_at": self.loaded_at,
+                "params": self.params,
+                "evaluation_order": list(self.rule_order),
+                "signals": [s.name for s in self.signals],
+                "rules": [{**self.rules[rid].spec, "inputs": list(self.rules[rid].inputs),
+                           "stats": vars(self.stats[rid]).copy()} for rid in self.config_order],
+                "signal_seconds": dict(self.signal_seconds),
+            }
+
+
+# =========================
+# Loading / hot reload
+# =========================
+
+def load_config(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml  # optional: only for YAML rule files
+            except ImportError:
+                raise RuleError("YAML rule files need PyYAML (pip install pyyaml); or use JSON") from None
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+class RuleBook:
+    """
+    The current RulePlan. With a path, the file is re-checked at most every
+    `reload_s` seconds (mtime/size) and recompiled when it changed; a config that
+    fails to compile is logged and the previous plan stays in force.
+    """
+
+    def __init__(self, path: str, reload_s: float, signals: Dict[str, Signal], default: Dict[str, Any]):
+        self.path = path
+        self.reload_s = reload_s
+        self._signals = signals
+        self._default = default
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._checked = time.monotonic()
+        self._plan = self._compile()
+
+    def _file_stamp(self) -> Tuple[float, int]:
+        st = os.stat(self.path)
+        return st.st_mtime, st.st_size
+
+    def _compile(self) -> RulePlan:
+        if not self.path:
+            return RulePlan(self._default, self._signals)
+        self._stamp = self._file_stamp()
+        plan = RulePlan(load_config(self.path), self._signals, source=self.path)
+        logger.info("validation rules %s loaded from %s (%d rules)", plan.version, self.path, len(plan.rules))
+        return plan
+
+    def plan(self) -> RulePlan:
+        if self.path and self.reload_s > 0 and time.monotonic() - self._checked >= self.reload_s:
+            with self._lock:
+                if time.monotonic() - self._checked >= self.reload_s:
+                    self._checked = time.monotonic()
+                    try:
+                        if self._file_stamp() != self._stamp:
+                            self._plan = self._compile()
+                    except Exception as e:
+                        logger.error("validation rules in %s not reloaded (%s); keeping %s", self.path, e, self._plan.version)
+        return self._plan
+
+    def reload(self) -> RulePlan:
+        """Recompile now; raises (RuleError, OSError, ...) and keeps the old plan on failure."""
+        with self._lock:
+            self._checked = time.monotonic()
+            self._plan = self._compile()
+            return self._plan
@@ -0,0 +1,68 @@
+import csv
+import io
+import os
+from typing import BinaryIO, Iterable, Iterator, List, Literal, Optional
+import pandas as pd
+from ..settings import settings
+
+TableFormat = Literal["xlsx", "xls", "csv"]
+
+_ZIP_MAGIC = b"PK\x03\x04"                          # .xlsx / .xlsm (OOXML zip container)
+_OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"    # legacy .xls
+_DELIMITERS = ",;\t|"
+
+def sniff_format(data: bytes) -> TableFormat:
+    """Workbooks are recognized by their container magic bytes; anything else is delimited text."""
+    if data.startswith(_ZIP_MAGIC):
+        return "xlsx"
+    if data.startswith(_OLE2_MAGIC):
+        return "xls"
+    return "csv"
+
+def _normalize(col) -> str:
+    return str(col).strip().lower()
+
+def _delimiter(header_line: str, name: Optional[str]) -> str:
+    if name and os.path.splitext(name)[1].lower() == ".tsv":
+        return "\t"
+    counts = {d: header_line.count(d) for d in _DELIMITERS}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else ","
+
+def _csv_layout(head: bytes, name: Optional[str], text_columns: Iterable[str]) -> tuple[str, List[str]]:
+    """Delimiter and the raw header names of `text_columns`, from the first bytes of the file."""
+    header_line = head.decode("utf-8-sig", errors="replace").split("\n", 1)[0].rstrip("\r")
+    sep = _delimiter(header_line, name)
+    header = next(csv.reader([header_line], delimiter=sep), [])
+    wanted = {_normalize(c) for c in text_columns}
+    return sep, [h for h in header if _normalize(h) in wanted]
+
+def _read_workbook(data: bytes, fmt: TableFormat) -> pd.DataFrame:
+    """A whole .xlsx (openpyxl, read-only values) or legacy .xls as one DataFrame."""
+    df = pd.read_excel(io.BytesIO(data), engine="openpyxl" if fmt == "xlsx" else None)
+    df.columns = [_normalize(c) for c in df.columns]
+    return df
+
+def iter_table(stream: BinaryIO, name: Optional[str] = None, text_columns: Iterable[str] = (),
+               chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Uploaded sheet, from a buffered binary stream (see file_loader.open_object), as
+    DataFrames with normalized (stripped, lower-case) column names. CSV is parsed
+    TABULAR_CHUNK_ROWS rows at a time, so the file is never held in memory whole;
+    `text_columns` (normalized names) are read as strings, skipping type inference.
+    Workbooks need random access and are read in full (still bounded by the object
+    size limit) and yielded as one chunk.
+    """
+    head = stream.peek(64 * 1024)[:64 * 1024]
+    fmt = sniff_format(head)
+    if fmt != "csv":
+        yield _read_workbook(stream.read(), fmt)
+        return
+    sep, raw_text = _csv_layout(head, name, text_columns)
+    # pandas' C parser: pyarrow's streaming reader fixes column types from the first block
+    reader = pd.read_csv(stream, sep=sep, dtype={h: str for h in raw_text} or None,
+                         chunksize=chunk_rows or settings.TABULAR_CHUNK_ROWS)
+    with reader:
+        for chunk in reader:
+            chunk.columns = [_normalize(c) for c in chunk.columns]
+            yield chunk
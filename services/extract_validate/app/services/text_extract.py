@@ -1,5 +1,12 @@
-import io, os
+import asyncio, io, logging, math, os, time
 from typing import Optional
+from ..settings import settings
+from .executor import cpu_pool, run_cpu
+
+logger = logging.getLogger("extract_validate.text_extract")
+
+class PDFTooSlow(ValueError):
+    """Text extraction did not finish within RESUME_PDF_TIMEOUT_S (pathological or huge PDF)."""
 
 def ext_from_name(name: str) -> str:
     return os.path.splitext(name)[1].lower()
@@ -8,6 +15,73 @@ def pdf_to_text(data: bytes) -> str:
     from pdfminer.high_level import extract_text
     return extract_text(io.BytesIO(data)) or ""
 
+def pdf_page_count(data: bytes) -> Optional[int]:
+    """Page count from the document catalog (no page content is parsed); None if unreadable."""
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdftypes import resolve1
+    try:
+        doc = PDFDocument(PDFParser(io.BytesIO(data)))
+        return int(resolve1(resolve1(doc.catalog["Pages"])["Count"]))
+    except Exception:
+        return None
+
+def pdf_pages_to_text(data: bytes, first: int, last: int, deadline: float) -> tuple[list[str], bool]:
+    """
+    Text of pages [first, last), one string per page, each ending in a form feed as in
+    `extract_text`. Top-level so it can run in a worker process. Once `deadline` (epoch
+    seconds) has passed, no further page is started: returns (texts so far, False).
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    out = io.StringIO()
+    rsrc = PDFResourceManager()
+    device = TextConverter(rsrc, out, laparams=LAParams())
+    interpreter = PDFPageInterpreter(rsrc, device)
+    texts: list[str] = []
+    try:
+        for page in PDFPage.get_pages(io.BytesIO(data), pagenos=range(first, last)):
+            if time.time() > deadline:
+                return texts, False
+            interpreter.process_page(page)
+            texts.append(out.getvalue())
+            out.seek(0); out.truncate()
+    finally:
+        device.close()
+    return texts, True
+
+async def pdf_to_text_parallel(data: bytes) -> str:
+    """
+    Page-parallel `pdf_to_text`: the first RESUME_PDF_MAX_PAGES pages are split into
+    contiguous ranges, one per CPU worker, and reassembled in page order. The whole
+    document must finish within RESUME_PDF_TIMEOUT_S, else PDFTooSlow.
+    """
+    timeout = settings.RESUME_PDF_TIMEOUT_S
+    deadline = time.time() + timeout
+    count = await asyncio.to_thread(pdf_page_count, data)
+    pages = min(count, settings.RESUME_PDF_MAX_PAGES) if count is not None else settings.RESUME_PDF_MAX_PAGES
+    if count is not None and count > pages:
+        logger.info("PDF has %d pages; extracting the first %d", count, pages)
+    if pages <= 0:
+        return ""
+
+    workers = settings.EXTRACT_CPU_WORKERS if cpu_pool() is not None else 1
+    size = math.ceil(pages / workers)
+    ranges = [(start, min(start + size, pages)) for start in range(0, pages, size)]
+    try:
+        parts = await asyncio.wait_for(
+            asyncio.gather(*(run_cpu(pdf_pages_to_text, data, a, b, deadline) for a, b in ranges)),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        raise PDFTooSlow(f"PDF text extraction exceeded {timeout:g}s") from None
+    if not all(done for _, done in parts):
+        raise PDFTooSlow(f"PDF text extraction exceeded {timeout:g}s")
+    return "".join(text for texts, _ in parts for text in texts)
+
 def docx_to_text(data: bytes) -> str:
     from docx import Document
     f = io.BytesIO(data)
@@ -22,3 +96,9 @@ def file_to_text(data: bytes, filename: str) -> str:
         return docx_to_text(data)
     # You can add .rtf/.txt as needed. For legacy .doc use textract (optional).
     raise ValueError(f"Unsupported resume format: {ext}. Use PDF or DOCX.")
+
+async def file_to_text_async(data: bytes, filename: str) -> str:
+    """`file_to_text` off the event loop: PDFs page-parallel in the CPU pool, DOCX in one task."""
+    if ext_from_name(filename) == ".pdf":
+        return await pdf_to_text_parallel(data)
+    return await run_cpu(file_to_text, data, filename)
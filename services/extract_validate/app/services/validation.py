@@ -0,0 +1,286 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import re
+import numpy as np
+from schemas import names
+from schemas.models import ValidationReport
+from ..settings import settings
+from .rule_engine import RuleBook, Signal
+
+# =========================
+# Helpers (pure functions)
+# =========================
+
+def _safe_float(x: Any, default: float = 0.0) -> float:
+    try:
+        if x is None:
+            return default
+        if isinstance(x, (int, float)):
+            return float(x)
+        return float(str(x).strip().replace(",", ""))
+    except Exception:
+        return default
+
+
+def _pct_diff(a: float, b: float) -> float:
+    """Symmetric percentage difference in [0, 1+] (0==same)."""
+    a = float(a); b = float(b)
+    denom = max(1.0, (abs(a) + abs(b)) / 2.0)
+    return abs(a - b) / denom
+
+
+@lru_cache(maxsize=65536)
+def _days_between(d: str, today: date) -> Optional[int]:
+    try:
+        if "T" in d:
+            dt = datetime.fromisoformat(d)
+            return (dt.date() - today).days
+        else:
+            dt = date.fromisoformat(d)
+            return (dt - today).days
+    except Exception:
+        return None
+
+
+def _days_until(d: Optional[str], today: Optional[date] = None) -> Optional[int]:
+    """
+    Expect ISO date "YYYY-MM-DD" (or any datetime parseable by fromisoformat).
+    Returns days from today. None if not parseable / missing.
+    """
+    if not d:
+        return None
+    return _days_between(str(d), today or date.today())
+
+
+_IBAN_RE = re.compile(r"^[A-Z]{2}\d{2}[A-Z0-9]{11,30}$")  # len 15-34 typical
+
+
+@lru_cache(maxsize=65536)
+def _looks_like_iban(iban: Optional[str]) -> bool:
+    if not iban:
+        return False
+    s = iban.replace(" ", "").upper()
+    return bool(_IBAN_RE.match(s))
+
+
+_NON_DIGIT = re.compile(r"\D")
+
+
+@lru_cache(maxsize=65536)
+def _eid_checksum_ok(eid: Optional[str]) -> bool:
+    """
+    Very light EID checksum placeholder:
+    - digits only, length 15 (common formatted)
+    - simple Luhn-like mod10 on last digit (toy; replace with real algo if available)
+    """
+    if not eid:
+        return False
+    digits = _NON_DIGIT.sub("", eid)
+    if len(digits) < 9:
+        return False
+    # Luhn-style check
+    total = 0
+    parity = (len(digits) - 1) % 2
+    for i, ch in enumerate(digits):
+        d = ord(ch) - 48
+        if i % 2 == parity:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+_ADDRESS_JUNK = re.compile(r"\W+")
+
+
+@lru_cache(maxsize=65536)
+def _norm_address(s: str) -> str:
+    return _ADDRESS_JUNK.sub(" ", s).strip().lower()
+
+
+
+
+# =========================
+# Signals (rule inputs)
+# =========================
+# Everything a rule can look at. Source signals read the batch; derived ones are
+# computed only for the rows where all their inputs are present.
+
+@dataclass
+class _Batch:
+    forms: List[Dict[str, Any]]
+    bank: List[Dict[str, Any]]
+    eid: List[Dict[str, Any]]
+    profile: List[Dict[str, Any]]  # optional normalized profile (name/dob/address)
+    today: date
+
+
+def _form_fields(form: Any) -> Dict[str, Any]:
+    """Declared + extra fields of a form model (plain dict lookups instead of getattr misses)."""
+    return {**vars(form), **(getattr(form, "__pydantic_extra__", None) or {})}
+
+
+def _numbers(values) -> np.ndarray:
+    return np.array([_safe_float(v, np.nan) for v in values], dtype=np.float64)
+
+
+def _texts(values) -> np.ndarray:
+    """Truthy values as str, the rest missing."""
+    return np.array([str(v) if v else None for v in values], dtype=object)
+
+
+def _rowwise(fn: Callable[..., Any], dtype=object) -> Callable[..., np.ndarray]:
+    return lambda *cols: np.array([fn(*row) for row in zip(*cols)], dtype=dtype)
+
+
+def _eid_days_left(eid_doc: Dict[str, Any], today: date) -> float:
+    # accept either bank/eid facts: "residency_valid_days_remaining" or "eid_expiry_date"
+    if "residency_valid_days_remaining" in eid_doc:
+        try:
+            return float(int(eid_doc.get("residency_valid_days_remaining")))
+        except Exception:
+            pass
+    days = _days_until(eid_doc.get("eid_expiry_date"), today)
+    return np.nan if days is None else float(days)
+
+
+def _first(*refs: Tuple[str, str]) -> Callable[["_Batch"], np.ndarray]:
+    """First truthy value among (batch list, key) refs, per application."""
+    def read(b: "_Batch") -> np.ndarray:
+        docs = [(getattr(b, src), key) for src, key in refs]
+        return _texts(next((d[i][k] for d, k in docs if d[i].get(k)), None) for i in range(len(b.forms)))
+    return read
+
+
+def _norm_or_none(s: str) -> Optional[str]:
+    return _norm_address(s) or None
+
+
+SIGNALS: Dict[str, Signal] = {s.name: s for s in (
+    Signal("declared_income", lambda b: _numbers(f.get("declared_monthly_income") for f in b.forms)),
+    Signal("observed_income", lambda b: _numbers(x.get("salary_inflow_mean_3m") for x in b.bank)),  # 3m mean inflow
+    Signal("expenses", lambda b: _numbers(x.get("monthly_outflow_mean_3m") for x in b.bank)),
+    Signal("income_diff",  # symmetric relative difference, 0 == same
+           lambda d, o: np.abs(d - o) / np.maximum(1.0, (np.abs(d) + np.abs(o)) / 2.0),
+           ("declared_income", "observed_income")),
+    Signal("income_diff_pct", lambda diff: np.floor(diff * 100), ("income_diff",)),
+    Signal("margin", lambda o, e: (o - e) / np.maximum(1.0, o), ("observed_income", "expenses")),
+    Signal("eid_days_left", lambda b: np.array([_eid_days_left(e, b.today) for e in b.eid], dtype=np.float64)),
+    Signal("iban", lambda b: _texts((f.get("iban") or "").strip() for f in b.forms)),
+    Signal("iban_valid", _rowwise(_looks_like_iban, bool), ("iban",)),
+    Signal("emirates_id", lambda b: _texts(f.get("emirates_id") for f in b.forms)),
+    Signal("eid_checksum_ok", _rowwise(_eid_checksum_ok, bool), ("emirates_id",)),
+    Signal("form_name", lambda b: _texts(f.get("full_name") or f.get("name") for f in b.forms)),
+    Signal("doc_name", _first(("profile", "full_name"), ("eid", "full_name"), ("bank", "account_holder_name"))),
+    Signal("name_similarity", lambda a, b: names.similarity_pairs(a.tolist(), b.tolist()), ("form_name", "doc_name")),
+    Signal("form_dob", lambda b: _texts(f.get("dob") for f in b.forms)),
+    Signal("doc_dob", _first(("profile", "dob"), ("eid", "dob"))),
+    Signal("form_address", lambda b: _texts(f.get("address") for f in b.forms)),
+    Signal("doc_address", _first(("profile", "address"), ("bank", "address"), ("eid", "address"))),
+    Signal("form_address_norm", _rowwise(_norm_or_none), ("form_address",)),
+    Signal("doc_address_norm", _rowwise(_norm_or_none), ("doc_address",)),
+)}
+
+
+# =========================
+# Rules
+# =========================
+# Built-in policy; VALIDATION_RULES_PATH points at a JSON/YAML file of the same shape
+# to replace it without a redeploy. A rule fires for an application when all the
+# signals it mentions are present and `when` holds; the first severity tier whose
+# `when` holds (else the last) sets severity and confidence. `unless` suppresses a
+# rule where any of the listed rules fired.
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "params": {
+        "income_mismatch_pct": 0.25,
+        "income_mismatch_high_pct": 0.50,
+        "margin_band": 0.05,            # expenses within ±5% of income
+        "eid_expiry_warning_days": 60,
+        "eid_expiry_urgent_days": 30,
+        "name_match_min": 0.85,         # schemas.names.similarity (fuzzy, transliteration-aware)
+        "name_match_high": 0.5,
+    },
+    "rules": [
+        {"id": "INCOME_MISMATCH", "key": "declared_monthly_income",
+         "when": "declared_income > 0 and observed_income > 0 and income_diff > income_mismatch_pct",
+         "severity": [{"when": "income_diff > income_mismatch_high_pct", "level": "high", "confidence": 0.9},
+                      {"level": "medium", "confidence": 0.8}],
+         "message": "Declared monthly income differs from observed bank inflow by {income_diff_pct:.0f}%.",
+         "sources": ["form", "bank"], "suggest": "observed_income"},
+        {"id": "INCOME_NEGATIVE_MARGIN", "key": "observed_margin",
+         "when": "observed_income > 0 and margin < -margin_band",
+         "severity": "high", "confidence": 0.85,
+         "message": "Observed expenses exceed observed income (negative margin).", "sources": ["bank"]},
+        {"id": "INCOME_TIGHT_MARGIN", "key": "observed_margin",
+         "when": "observed_income > 0 and margin < margin_band", "unless": ["INCOME_NEGATIVE_MARGIN"],
+         "severity": "low", "confidence": 0.7,
+         "message": "Observed expenses nearly equal observed income (tight margin).", "sources": ["bank"]},
+        {"id": "EID_EXPIRED", "key": "eid.expiry", "when": "eid_days_left < 0",
+         "severity": "critical", "confidence": 0.95,
+         "message": "Residency/EID is expired.", "sources": ["eid"]},
+        {"id": "EID_EXPIRING_SOON", "key": "eid.expiry", "when": "0 <= eid_days_left <= eid_expiry_warning_days",
+         "severity": [{"when": "eid_days_left <= eid_expiry_urgent_days", "level": "high", "confidence": 0.9},
+                      {"level": "medium", "confidence": 0.8}],
+         "message": "Residency/EID will expire in {eid_days_left:.0f} days.", "sources": ["eid"]},
+        {"id": "IBAN_FORMAT_INVALID", "key": "iban", "when": "not iban_valid",
+         "severity": "medium", "confidence": 0.85,
+         "message": "IBAN does not match expected format.", "sources": ["form"]},
+        {"id": "EID_CHECKSUM_FAIL", "key": "emirates_id", "when": "not eid_checksum_ok",
+         "severity": "high", "confidence": 0.9,
+         "message": "EID checksum validation failed.", "sources": ["form"]},
+        {"id": "NAME_MISMATCH", "key": "full_name", "when": "name_similarity < name_match_min",
+         "severity": [{"when": "name_similarity < name_match_high", "level": "high"}, {"level": "medium"}],
+         "confidence": 0.85,
+         "message": "Name mismatch across documents (similarity={name_similarity:.2f}).",
+         "sources": ["form", "eid", "bank"], "suggest": "doc_name"},
+        {"id": "DOB_MISMATCH", "key": "dob", "when": "form_dob != doc_dob",
+         "severity": "high", "confidence": 0.9,
+         "message": "Date of birth differs across documents.", "sources": ["form", "eid"], "suggest": "doc_dob"},
+        {"id": "ADDRESS_MISMATCH", "key": "address", "when": "form_address_norm != doc_address_norm",
+         "severity": "medium", "confidence": 0.75,
+         "message": "Address differs across documents.", "sources": ["form", "eid", "bank"],
+         "suggest": "doc_address"},
+    ],
+}
+
+
+@lru_cache(maxsize=1)
+def rule_book() -> RuleBook:
+    return RuleBook(settings.VALIDATION_RULES_PATH, settings.VALIDATION_RULES_RELOAD_S, SIGNALS, DEFAULT_RULES)
+
+
+# =========================
+# Batch evaluation
+# =========================
+
+def validate_many(reqs: Sequence[Any], today: Optional[date] = None) -> List[ValidationReport]:
+    """
+    Validate many applications (objects with application_id, form, facts_by_doc) in
+    one pass of the current rule plan: signals and rule conditions are evaluated as
+    arrays over all applications. One report per request, issues in rule order.
+    """
+    facts = [r.facts_by_doc or {} for r in reqs]
+    batch = _Batch(
+        forms=[_form_fields(r.form) for r in reqs],
+        bank=[f.get("bank") or {} for f in facts],
+        eid=[f.get("eid") or {} for f in facts],
+        profile=[f.get("profile") or {} for f in facts],
+        today=today or date.today(),
+    )
+    issues, worst = rule_book().plan().evaluate(batch, len(reqs))
+
+    # critical -> halt; high or medium -> ask_user (clarification is likely enough); else proceed
+    actions = np.array(["proceed", "proceed", "ask_user", "ask_user", "halt"], dtype=object)[worst + 1]
+    return [
+        ValidationReport.model_construct(
+            application_id=r.application_id,
+            issues=issues[i],
+            next_action=actions[i],
+            reconciled={},  # placeholder (can be filled by Reconciliation Agent later)
+        )
+        for i, r in enumerate(reqs)
+    ]
@@ -7,8 +7,49 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_SECURE: bool = False
     MINIO_BUCKET: str = "documents"
+    # shared client: pooled keep-alive connections, per-read timeouts, and the largest
+    # object extraction will read (bytes; 0 = unlimited)
+    MINIO_POOL_MAXSIZE: int = 16
+    MINIO_CONNECT_TIMEOUT_S: float = 5.0
+    MINIO_READ_TIMEOUT_S: float = 60.0
+    MINIO_MAX_OBJECT_BYTES: int = 50 * 1024 * 1024
 
 
     LLM_ENDPOINT: str = "http://ollama:11434"  # docker service name
     LLM_MODEL: str = "llama3.2:latest"   # pulled above
+
+    # /extract/batch: documents processed at once, and worker processes for the
+    # CPU-bound parsers (pandas / pdfminer); 0 = parse in threads instead
+    EXTRACT_CONCURRENCY: int = 8
+    EXTRACT_CPU_WORKERS: int = 2
+
+    # Resume PDFs: pages beyond the cap are ignored; the whole document must be
+    # extracted within the timeout (pages are spread over the CPU workers)
+    RESUME_PDF_MAX_PAGES: int = 30
+    RESUME_PDF_TIMEOUT_S: float = 20.0
+    # Resume LLM extraction: section-aware chunks of at most this many characters,
+    # extracted in parallel (threads shared by all resumes in flight)
+    RESUME_CHUNK_CHARS: int = 6000
+    RESUME_LLM_CONCURRENCY: int = 4
+    # Regex/dictionary pre-extraction; sections it fills with confidence skip the LLM
+    RESUME_RULES: bool = True
+
+    # Bank transaction categories: JSON {category: [keywords]}; empty = built-in taxonomy
+    BANK_TAXONOMY_PATH: str = ""
+
+    # /extract/batch result cache keyed by (object_key, ETag, extractor version):
+    # "disk" (LRU files under EXTRACT_CACHE_DIR), "redis", or "off"
+    EXTRACT_CACHE: str = "disk"
+    EXTRACT_CACHE_DIR: str = "/tmp/extract_validate-cache"
+    EXTRACT_CACHE_MAX_ENTRIES: int = 10_000
+    EXTRACT_CACHE_REDIS_URL: str = "redis://redis:6379/1"
+    EXTRACT_CACHE_TTL_S: int = 7 * 24 * 3600
+
+    # Validation rules: JSON/YAML file replacing the built-in policy (empty = built-in);
+    # re-read when it changes, checked at most every VALIDATION_RULES_RELOAD_S (0 = never)
+    VALIDATION_RULES_PATH: str = ""
+    VALIDATION_RULES_RELOAD_S: float = 5.0
+
+    # rows per chunk when a CSV is parsed straight off the object stream
+    TABULAR_CHUNK_ROWS: int = 50_000
 settings = Settings()
@@ -0,0 +1,28 @@
+# Run from services/extract_validate: python -m pytest tests
+import io
+import math
+
+from app.services.bank import features_from_frame, frame_from_stream
+
+CSV = b"""date,amount,description
+2026-01-01,12000,SALARY ACME TECH
+2026-01-05,-3000,GROCERIES CARREFOUR
+2026-02-01,12000,SALARY ACME TECH
+2026-02-06,-2500,DEWA UTILITIES
+"""
+
+
+def _facts(data: bytes):
+    return features_from_frame(frame_from_stream(io.BufferedReader(io.BytesIO(data)), "s.csv"))
+
+
+def test_no_matching_outflows_give_positive_zero():
+    facts = _facts(CSV)
+    for value in (facts.debt_payment_ratio_3m, facts.cash_withdraw_pct):
+        assert value == 0.0 and math.copysign(1.0, value) == 1.0
+
+
+def test_debt_and_cash_shares():
+    facts = _facts(CSV + b"2026-02-10,-1000,ATM CASH WITHDRAWAL\n2026-02-15,-2400,LOAN INSTALLMENT\n")
+    assert facts.cash_withdraw_pct == 1000 / 8900
+    assert facts.debt_payment_ratio_3m == 2400 / 24000
@@ -0,0 +1,28 @@
+# Run from services/extract_validate: python -m pytest tests
+import pandas as pd
+
+from app.services.categorize import DEFAULT_TAXONOMY, Categorizer
+
+
+def _categories(cat: Categorizer, text: str):
+    return {c for c in cat.categories if cat.mask_of(text) & cat.bits[c]}
+
+
+def test_default_taxonomy():
+    cat = Categorizer(DEFAULT_TAXONOMY)
+    assert _categories(cat, "Salary ACME TECH") == {"salary"}
+    assert _categories(cat, "ATM cash withdrawal - loan return") == {"cash_withdrawal", "debt_payment", "nsf_return"}
+    assert _categories(cat, "GROCERIES") == set()
+
+
+def test_shorter_keyword_of_another_category_at_the_same_position():
+    cat = Categorizer({"withdrawal": ["CASH WITHDRAW"], "cash": ["CASH"], "card": ["CARD"]})
+    assert _categories(cat, "cash withdraw mall") == {"withdrawal", "cash"}
+    assert _categories(cat, "cashback card") == {"cash", "card"}
+
+
+def test_label_follows_priority_order():
+    cat = Categorizer({"cash": ["CASH"], "withdrawal": ["CASH WITHDRAW"]})
+    labels, masks = cat.classify(pd.Series(["CASH WITHDRAW 1", None, "CASH WITHDRAW 1"]))
+    assert labels.tolist() == ["cash", None, "cash"]
+    assert masks[0] == cat.bits["cash"] | cat.bits["withdrawal"] and masks[1] == 0
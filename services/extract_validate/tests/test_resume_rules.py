@@ -0,0 +1,65 @@
+# Run from services/extract_validate: python -m pytest tests
+from app.services.resume_rules import pre_extract
+
+HEADER = """Ahmed Ali Hassan
+ahmed.hassan@example.com | +971 50 123 4567 | linkedin.com/in/ahmedhassan
+"""
+
+TERSE_CV = HEADER + """
+Experience
+Software Engineer at Acme Tech, Jan 2020 - Present
+Data Analyst, Gulf Bank, 2017 - 2019
+
+Education
+BSc Computer Science, American University of Sharjah, 2013 - 2017
+
+Skills
+Python, SQL, Docker, Excel, English (fluent), Arabic (native)
+"""
+
+
+def test_terse_cv_is_covered_without_the_llm():
+    res = pre_extract(TERSE_CV)
+    assert res.covered == {"name", "contact", "experience", "education", "skills"}
+    assert res.data["name"] == "Ahmed Ali Hassan"
+    assert [(e["title"], e["company"], e["start_date"]) for e in res.data["experience"]] == [
+        ("Software Engineer", "Acme Tech", "2020-01"), ("Data Analyst", "Gulf Bank", "2017")]
+    assert res.data["experience"][0]["is_current"] is True
+    assert res.data["education"][0]["institution"] == "American University of Sharjah"
+    assert res.data["skills"]["languages"] == [{"name": "English", "proficiency": "advanced"},
+                                               {"name": "Arabic", "proficiency": "native"}]
+
+
+def test_bullet_points_leave_experience_to_the_llm():
+    cv = TERSE_CV.replace("Jan 2020 - Present\n",
+                          "Jan 2020 - Present\n- Cut report latency by 40% with Spark\n")
+    res = pre_extract(cv)
+    assert "experience" not in res.covered and "experience" not in res.data
+    assert {"name", "contact", "education", "skills"} <= res.covered
+
+
+def test_undated_title_line_leaves_experience_to_the_llm():
+    cv = TERSE_CV.replace("Data Analyst, Gulf Bank, 2017 - 2019", "Data Analyst, Gulf Bank, 2017 - 2019\n"
+                                                                  "Intern at Emirates NBD")
+    assert "experience" not in pre_extract(cv).covered
+
+
+def test_unknown_skill_leaves_skills_to_the_llm():
+    cv = TERSE_CV.replace("Python, SQL", "Python, SQL, Underwater basket weaving")
+    assert "skills" not in pre_extract(cv).covered
+
+
+def test_job_title_in_the_name_position_is_not_a_name():
+    cv = TERSE_CV.replace("Ahmed Ali Hassan", "Senior Software Engineer")
+    res = pre_extract(cv)
+    assert "name" not in res.covered and "name" not in res.data
+
+
+def test_name_needs_the_contact_block_below_it():
+    res = pre_extract("Ahmed Ali Hassan\nDubai, UAE\n\nExperience\nSoftware Engineer at Acme, 2020 - 2022\n")
+    assert "name" not in res.covered and "contact" not in res.covered
+
+
+def test_without_headings_only_contact_is_covered():
+    res = pre_extract(HEADER + "Software Engineer at Acme Tech, Jan 2020 - Present\nPython, SQL\n")
+    assert res.covered == {"name", "contact"}
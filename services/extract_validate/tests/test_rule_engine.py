@@ -0,0 +1,183 @@
+# Run from services/extract_validate: python -m pytest tests
+import json
+import os
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.rule_engine import RuleBook, RuleError, RulePlan, Signal, compile_expr
+from app.services.validation import DEFAULT_RULES, SIGNALS, validate_many
+
+# ---- engine, on two toy signals
+
+TOY = {
+    "x": Signal("x", lambda b: np.array(b["x"], dtype=np.float64)),
+    "y": Signal("y", lambda b: np.array(b["y"], dtype=np.float64)),
+}
+
+
+def _toy(rules, params=None):
+    return RulePlan({"params": params or {}, "rules": rules}, TOY)
+
+
+def _codes(plan, x, y):
+    issues, _ = plan.evaluate({"x": x, "y": y}, len(x))
+    return [[i.code for i in row] for row in issues]
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os')", "x.real", "x[0]", "lambda: 1", "[x]", "x if y else 1", "x ** 2", "open('f')",
+])
+def test_compile_rejects_unsupported_syntax(text):
+    with pytest.raises(RuleError, match="unsupported syntax"):
+        compile_expr(text, frozenset({"x", "y"}))
+
+
+def test_compile_rejects_unknown_names_and_bad_syntax():
+    with pytest.raises(RuleError, match="unknown name 'z'"):
+        compile_expr("x > z", frozenset({"x", "y"}))
+    with pytest.raises(RuleError, match="invalid expression"):
+        compile_expr("x >", frozenset({"x"}))
+
+
+def test_compiled_expression_works_on_arrays():
+    fn, used = compile_expr("0 <= x < max(y, 2) and not x == 1", frozenset({"x", "y"}))
+    assert used == {"x", "y"}
+    assert fn({"x": np.array([0.0, 1.0, 3.0]), "y": np.array([1.0, 5.0, 5.0])}).tolist() == [True, False, True]
+
+
+def test_unless_runs_first_and_issues_keep_config_order():
+    plan = _toy([
+        {"id": "LOW", "when": "x > 1", "unless": ["HIGH"], "severity": "low"},
+        {"id": "ANY", "when": "x > 0", "severity": "low"},
+        {"id": "HIGH", "when": "x > 10", "severity": "high"},
+    ])
+    assert plan.rule_order.index("HIGH") < plan.rule_order.index("LOW")
+    assert _codes(plan, [5.0, 20.0, 0.0], [0.0, 0.0, 0.0]) == [["LOW", "ANY"], ["ANY", "HIGH"], []]
+
+
+def test_unless_cycle_and_unknown_rule_are_rejected():
+    with pytest.raises(RuleError, match="cycle"):
+        _toy([{"id": "A", "when": "x > 0", "unless": ["B"], "severity": "low"},
+              {"id": "B", "when": "x > 0", "unless": ["A"], "severity": "low"}])
+    with pytest.raises(RuleError, match="unknown or disabled rule"):
+        _toy([{"id": "A", "when": "x > 0", "unless": ["NOPE"], "severity": "low"}])
+
+
+def test_rule_is_skipped_when_an_input_is_missing():
+    plan = _toy([{"id": "R", "when": "x > y", "severity": "low"}])
+    assert _codes(plan, [2.0, np.nan, 2.0], [1.0, 1.0, np.nan]) == [["R"], [], []]
+    stats = plan.describe()["rules"][0]["stats"]
+    assert (stats["evaluated"], stats["skipped"], stats["hits"]) == (1, 2, 1)
+
+
+def test_severity_tiers_and_message_fields():
+    plan = _toy([{"id": "R", "when": "x > 0", "message": "x={x:.0f} over {limit}",
+                  "severity": [{"when": "x > limit", "level": "high"}, {"level": "low"}]}], {"limit": 10})
+    issues, worst = plan.evaluate({"x": [5.0, 50.0], "y": [0.0, 0.0]}, 2)
+    assert [(i[0].severity, i[0].message) for i in issues] == [("low", "x=5 over 10"), ("high", "x=50 over 10")]
+    assert worst.tolist() == [0, 2]
+
+
+def _write(path, config):
+    with open(path, "w") as f:
+        json.dump(config, f)
+
+
+def test_rulebook_keeps_previous_plan_on_broken_config(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write(path, {"rules": [{"id": "R", "when": "x > 0", "severity": "low"}]})
+    book = RuleBook(path, 0.001, TOY, {"rules": []})
+    good = book.plan()
+    assert list(good.rules) == ["R"]
+
+    _write(path, {"rules": [{"id": "R", "when": "x >>> 0", "severity": "low"}, {"id": "S", "when": "1"}]})
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    time.sleep(0.01)
+    assert book.plan() is good
+    with pytest.raises(RuleError):
+        book.reload()
+    assert book.plan() is good
+
+    _write(path, {"rules": [{"id": "S", "when": "y > 0", "severity": "high"}]})
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    time.sleep(0.01)
+    assert list(book.plan().rules) == ["S"]
+
+
+# ---- built-in policy, one case per rule code
+
+TODAY = date(2026, 1, 15)
+
+
+def _eid_number(prefix="78419901234567"):
+    for check in "0123456789":
+        digits = prefix + check
+        total = sum((d * 2 - 9 if d * 2 > 9 else d * 2) if i % 2 == 0 else d
+                    for i, d in enumerate(int(c) for c in digits))
+        if total % 10 == 0:
+            return digits
+
+
+def _application(form=None, bank=None, eid=None):
+    person = {"full_name": "Ahmed Ali", "dob": "1990-01-01", "address": "Villa 12, Al Barsha, Dubai"}
+    return SimpleNamespace(
+        application_id="a1",
+        form=SimpleNamespace(**{"declared_monthly_income": 10000, "iban": "AE070331234567890123456",
+                                "emirates_id": _eid_number(), **person, **(form or {})}),
+        facts_by_doc={
+            "bank": {"salary_inflow_mean_3m": 10000, "monthly_outflow_mean_3m": 6000,
+                     "account_holder_name": "Ahmed Ali", "address": person["address"], **(bank or {})},
+            "eid": {"eid_expiry_date": (TODAY + timedelta(days=365)).isoformat(), **person, **(eid or {})},
+        },
+    )
+
+
+def _issues(**changes):
+    report, = validate_many([_application(**changes)], today=TODAY)
+    return {i.code: i for i in report.issues}, report.next_action
+
+
+def test_default_policy_compiles():
+    plan = RulePlan(DEFAULT_RULES, SIGNALS)
+    assert set(plan.rules) == {r["id"] for r in DEFAULT_RULES["rules"]}
+
+
+def test_clean_application_has_no_issues():
+    assert _issues() == ({}, "proceed")
+
+
+@pytest.mark.parametrize("changes,code,severity", [
+    ({"form": {"declared_monthly_income": 20000}}, "INCOME_MISMATCH", "high"),
+    ({"form": {"declared_monthly_income": 13000}}, "INCOME_MISMATCH", "medium"),
+    ({"bank": {"monthly_outflow_mean_3m": 12000}}, "INCOME_NEGATIVE_MARGIN", "high"),
+    ({"bank": {"monthly_outflow_mean_3m": 9800}}, "INCOME_TIGHT_MARGIN", "low"),
+    ({"eid": {"eid_expiry_date": (TODAY - timedelta(days=1)).isoformat()}}, "EID_EXPIRED", "critical"),
+    ({"eid": {"eid_expiry_date": (TODAY + timedelta(days=10)).isoformat()}}, "EID_EXPIRING_SOON", "high"),
+    ({"eid": {"eid_expiry_date": (TODAY + timedelta(days=45)).isoformat()}}, "EID_EXPIRING_SOON", "medium"),
+    ({"form": {"iban": "AE12"}}, "IBAN_FORMAT_INVALID", "medium"),
+    ({"form": {"emirates_id": _eid_number()[:-1] + str((int(_eid_number()[-1]) + 1) % 10)}}, "EID_CHECKSUM_FAIL", "high"),
+    ({"eid": {"full_name": "Yousef Ibrahim"}}, "NAME_MISMATCH", "high"),
+    ({"eid": {"dob": "1991-02-03"}}, "DOB_MISMATCH", "high"),
+    ({"bank": {"address": "Flat 3, Al Nahda, Sharjah"}, "eid": {"address": "Flat 3, Al Nahda, Sharjah"}},
+     "ADDRESS_MISMATCH", "medium"),
+])
+def test_default_policy_rule(changes, code, severity):
+    found, _ = _issues(**changes)
+    assert list(found) == [code]
+    assert found[code].severity == severity
+
+
+def test_negative_margin_suppresses_tight_margin():
+    found, action = _issues(bank={"monthly_outflow_mean_3m": 12000})
+    assert "INCOME_TIGHT_MARGIN" not in found and action == "ask_user"
+
+
+def test_missing_bank_facts_skip_the_bank_rules():
+    app = _application()
+    app.facts_by_doc["bank"] = {}
+    report, = validate_many([app], today=TODAY)
+    assert report.issues == []
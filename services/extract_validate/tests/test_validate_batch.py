@@ -0,0 +1,28 @@
+# Run from services/extract_validate: python -m pytest tests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import validate
+
+app = FastAPI()
+app.include_router(validate.router)
+client = TestClient(app)
+
+
+def test_batch_malformed_json_is_422():
+    r = client.post("/validate/batch", content=b"{bad")
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_batch_malformed_ndjson_reports_line():
+    r = client.post("/validate/batch", content=b"\n{bad\n",
+                    headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 422
+    assert r.json()["detail"]["line"] == 2
+    assert r.json()["detail"]["errors"][0]["type"] == "json_invalid"
+
+
+def test_batch_invalid_request_is_422():
+    r = client.post("/validate/batch", json=[{"application_id": "a1"}])
+    assert r.status_code == 422
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import queue, threading, time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from app.settings import settings
+from app.providers import get_provider
+from app.providers.streams import StreamAbort
+from app.router import Backend, router
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _Attempt:
+    """One streamed Generate against a backend; buffers the full answer."""
+
+    def __init__(self, backend: Backend, kwargs: dict, done: "queue.Queue[Tuple[_Attempt, Exception | None]]"):
+        self.backend = backend
+        self.kwargs = kwargs
+        self.done = done
+        self.cancel = threading.Event()
+        self.abort = StreamAbort()
+        self.timed_out = False
+        self.first_token = threading.Event()
+        self.parts: List[str] = []
+        self.finish = "stop"
+
+    def run(self) -> None:
+        provider_name, model = self.backend
+        router.begin(self.backend)
+        t0 = time.monotonic()
+        ok: bool | None = False
+        err: Exception | None = None
+        stream = get_provider(provider_name).generate_stream(model=model, **self.kwargs)
+        try:
+            with self.abort.bind():
+                for delta, done, finish in stream:
+                    if self.cancel.is_set():
+                        raise _Cancelled()
+                    if delta and not self.first_token.is_set():
+                        router.record_first_token(self.backend, (time.monotonic() - t0) * 1000)
+                        self.first_token.set()
+                    self.parts.append(delta)
+                    if finish:
+                        self.finish = finish
+                    if done:
+                        break
+            ok = True
+        except _Cancelled:
+            ok = False if self.timed_out else None
+        except Exception as e:
+            if self.cancel.is_set():
+                # the read was aborted by stop(): a lost race is not scored, a timeout is
+                ok = False if self.timed_out else None
+            else:
+                err = e
+        finally:
+            # closing the generator drops the HTTP stream, which aborts generation upstream
+            stream.close()
+            router.end(self.backend, (time.monotonic() - t0) * 1000, ok)
+            self.first_token.set()
+            if ok is not None:
+                self.done.put((self, err))
+
+    def stop(self, timed_out: bool = False) -> None:
+        """Cancel from another thread, also when blocked waiting on the backend."""
+        self.timed_out = timed_out
+        self.cancel.set()
+        self.abort.abort()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+class Hedger:
+    """
+    Tail-latency hedging for Generate.
+
+    The primary backend is streamed. If it has not produced a first token within the
+    HEDGE_PERCENTILE of its observed time-to-first-token, the same request is sent to
+    the next backend of the routing plan; the first one to complete wins and the other
+    is cancelled (its connection is shut down, even mid-read). Hedges draw from a token
+    bucket refilled by HEDGE_BUDGET_RATIO per request, which caps the extra load. No
+    call waits longer than the request's timeout_ms, or HEDGE_TIMEOUT_S without one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        # per backend: calls on it that were hedged / hedges sent to it that won
+        self.hedged: Counter = Counter()
+        self.hedge_wins: Counter = Counter()
+
+    def snapshot(self) -> Dict[Backend, Tuple[int, int]]:
+        with self._lock:
+            return {b: (self.hedged[b], self.hedge_wins[b]) for b in set(self.hedged) | set(self.hedge_wins)}
+
+    def _earn(self) -> None:
+        with self._lock:
+            self._tokens = min(10.0, self._tokens + settings.HEDGE_BUDGET_RATIO)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def delay_ms(self, backend: Backend) -> float | None:
+        st = router.stats(backend)
+        if len(st.first_token_ms) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        p = st.first_token_percentile(settings.HEDGE_PERCENTILE) or 0.0
+        return max(float(settings.HEDGE_MIN_DELAY_MS), p)
+
+    def generate(self, plan: List[Backend], kwargs: dict) -> Tuple[Backend, str, str]:
+        """Return (backend, text, finish_reason) from the winning attempt."""
+        self._earn()
+        timeout_ms = kwargs.get("timeout_ms")
+        limit_s = timeout_ms / 1000 if timeout_ms else settings.HEDGE_TIMEOUT_S
+        deadline = time.monotonic() + limit_s
+        done: "queue.Queue[Tuple[_Attempt, Exception | None]]" = queue.Queue()
+        pending = list(plan)
+        if len(pending) == 1 and settings.HEDGE_SAME_BACKEND:
+            pending.append(pending[0])
+
+        def launch() -> _Attempt:
+            a = _Attempt(pending.pop(0), kwargs, done)
+            self._pool.submit(a.run)
+            return a
+
+        running = [launch()]
+        hedge: _Attempt | None = None
+        delay = self.delay_ms(running[0].backend)
+        if pending and delay is not None:
+            running[0].first_token.wait(delay / 1000)
+            if not running[0].first_token.is_set() and self._spend():
+                hedge = launch()
+                running.append(hedge)
+                with self._lock:
+                    self.hedged[running[0].backend] += 1
+
+        last_error: Exception | None = None
+        while running:
+            try:
+                attempt, err = done.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                for other in running:
+                    other.stop(timed_out=True)
+                raise TimeoutError(f"no backend answered within {limit_s:g}s")
+            running.remove(attempt)
+            if err is None:
+                # losers drop their connection now, wherever they are blocked
+                for other in running:
+                    other.stop()
+                if attempt is hedge:
+                    with self._lock:
+                        self.hedge_wins[attempt.backend] += 1
+                return attempt.backend, attempt.text, attempt.finish
+            last_error = err
+            # failed attempt: fail over to the next backend if nothing else is in flight
+            if not running and pending:
+                running.append(launch())
+        raise last_error or RuntimeError("no backend available")
+
+
+hedger = Hedger()
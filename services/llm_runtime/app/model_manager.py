@@ -0,0 +1,157 @@
+from __future__ import annotations
+import threading, time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from app.settings import settings
+from app.providers import get_provider, resolve_model
+
+
+@dataclass
+class ModelState:
+    provider: str
+    model: str
+    state: str = "unloaded"        # unloaded | loading | loaded | error | remote
+    last_used: float = 0.0         # unix seconds
+    loaded_at: float = 0.0
+    load_latency_ms: int = 0
+    error: str = ""
+
+
+def _same_model(a: str, b: str) -> bool:
+    # Ollama reports "llama3.2:latest" for a model requested as "llama3.2"
+    strip = lambda m: m[:-len(":latest")] if m.endswith(":latest") else m
+    return strip(a) == strip(b)
+
+
+class ModelManager:
+    """
+    Keeps configured models hot:
+      - preloads WARMUP_MODELS at startup (measuring load latency),
+      - pings recently used local models every KEEPALIVE_INTERVAL_S so
+        Ollama does not evict them while there is traffic,
+      - exposes per-model state for the `Models` RPC.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[Tuple[str, str], ModelState] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _state(self, provider_name: str, model: str) -> ModelState:
+        key = (provider_name, model)
+        st = self._states.get(key)
+        if st is None:
+            st = ModelState(provider=provider_name, model=model)
+            st.state = "unloaded" if provider_name == "ollama" else "remote"
+            self._states[key] = st
+        return st
+
+    def configured(self) -> List[Tuple[str, str]]:
+        names = [n.strip() for n in (settings.WARMUP_MODELS or "").split(",") if n.strip()]
+        return [resolve_model(n) for n in names]
+
+    # ---- traffic hooks
+    def touch(self, provider_name: str, model: str, ok: bool = True, error: str = "") -> None:
+        with self._lock:
+            st = self._state(provider_name, model)
+            st.last_used = time.time()
+            if provider_name != "ollama":
+                st.state = "remote"
+            elif ok:
+                if st.state != "loaded":
+                    st.loaded_at = st.last_used
+                st.state = "loaded"
+                st.error = ""
+            else:
+                st.state = "error"
+                st.error = error[:500]
+
+    # ---- warm-up / keep-alive
+    def load(self, provider_name: str, model: str) -> ModelState:
+        """
+        Load (or, for a model already loaded, keep-alive ping) a model. Only a cold
+        load shows as "loading" and sets loaded_at / load_latency_ms: a ping answers
+        fast and would otherwise replace the cold-load latency the Models RPC reports.
+        """
+        provider = get_provider(provider_name)
+        with self._lock:
+            st = self._state(provider_name, model)
+            cold = st.state != "loaded"
+            if provider_name == "ollama" and cold:
+                st.state = "loading"
+        t0 = time.monotonic()
+        try:
+            provider.load(model=model, keep_alive=settings.OLLAMA_KEEP_ALIVE or None)
+            ok, err = True, ""
+        except Exception as e:
+            ok, err = False, str(e)
+        latency_ms = int((time.monotonic() - t0) * 1000)
+        with self._lock:
+            if provider_name == "ollama":
+                st.state = "loaded" if ok else "error"
+                st.error = err[:500]
+                if ok and cold:
+                    st.loaded_at = time.time()
+                    st.load_latency_ms = latency_ms
+            return st
+
+    def warmup(self) -> None:
+        for provider_name, model in self.configured():
+            st = self.load(provider_name, model)
+            print(f"[llm-runtime] warm-up {provider_name}/{model}: {st.state} ({st.load_latency_ms} ms) {st.error}")
+
+    def keepalive_once(self) -> None:
+        now = time.time()
+        with self._lock:
+            states = list(self._states.values())
+        # Any recent traffic keeps the configured models warm too; fully idle runtimes let them go.
+        busy = any(now - s.last_used <= settings.KEEPALIVE_IDLE_S for s in states if s.last_used)
+        pinned = set(self.configured())
+        for st in states:
+            if st.provider != "ollama":
+                continue
+            recent = st.last_used and now - st.last_used <= settings.KEEPALIVE_IDLE_S
+            if recent or (busy and (st.provider, st.model) in pinned):
+                self.load(st.provider, st.model)
+
+    def _loop(self) -> None:
+        self.warmup()
+        while not self._stop.wait(max(1, settings.KEEPALIVE_INTERVAL_S)):
+            try:
+                self.keepalive_once()
+            except Exception as e:
+                print(f"[llm-runtime] keep-alive failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="model-keepalive", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---- introspection
+    def refresh(self) -> None:
+        """Reconcile local state with what Ollama actually has resident (best effort)."""
+        try:
+            resident = get_provider("ollama").loaded_models()
+        except Exception:
+            return
+        if resident is None:
+            return
+        with self._lock:
+            for st in self._states.values():
+                if st.provider != "ollama" or st.state == "loading":
+                    continue
+                if any(_same_model(st.model, r) for r in resident if r):
+                    st.state = "loaded"
+                elif st.state == "loaded":
+                    st.state = "unloaded"
+
+    def snapshot(self) -> List[ModelState]:
+        with self._lock:
+            return [ModelState(**vars(s)) for s in self._states.values()]
+
+
+model_manager = ModelManager()
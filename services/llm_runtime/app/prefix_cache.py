@@ -0,0 +1,156 @@
+from __future__ import annotations
+import hashlib, threading, time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from app.settings import settings
+
+Backend = Tuple[str, str]   # (provider_name, model)
+
+
+def _stable(part: str | None) -> str:
+    # Byte-identical prefixes are what backend KV / prompt caches key on:
+    # normalise line endings and trailing whitespace that callers tend to vary.
+    if not part:
+        return ""
+    lines = part.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(l.rstrip() for l in lines).strip()
+
+
+@dataclass(frozen=True)
+class ShapedPrompt:
+    """
+    A request laid out as   System -> Context -> User   so that the stable parts
+    (system prompt, application JSON) form a shared prefix across requests and only
+    the question varies at the end.
+    """
+    system: str
+    context: str
+    prompt: str
+    prefix: str            # rendered system + context blocks
+    text: str              # full rendered prompt (prefix + user block)
+    key: str               # digest of the prefix
+
+    @property
+    def user(self) -> str:
+        """Context + question, for chat-style APIs that take the system prompt separately."""
+        return f"Context:\n{self.context}\n\nUser:\n{self.prompt}" if self.context else self.prompt
+
+
+def shape(system: str | None, context: str | None, prompt: str) -> ShapedPrompt:
+    system, context = _stable(system), _stable(context)
+    blocks = []
+    if system:
+        blocks.append(f"System:\n{system}")
+    if context:
+        blocks.append(f"Context:\n{context}")
+    prefix = "".join(b + "\n\n" for b in blocks)
+    text = f"{prefix}User:\n{prompt}" if prefix else prompt
+    key = hashlib.sha1(prefix.encode("utf-8")).hexdigest()[:16] if prefix else ""
+    return ShapedPrompt(system=system, context=context, prompt=prompt, prefix=prefix, text=text, key=key)
+
+
+@dataclass
+class PrefixStats:
+    requests: int = 0
+    prefix_hits: int = 0              # stable prefix already sent to this backend recently
+    continuations: int = 0            # served from a session's KV state (Ollama `context`)
+    reused_chars: int = 0
+    prefill_chars: int = 0
+
+
+@dataclass
+class _Session:
+    key: str
+    texts: List[str]                  # accepted renderings of prompt + answer
+    tokens: List[int] = field(default_factory=list)
+    ts: float = 0.0
+
+
+class PrefixCache:
+    """
+    Prefix accounting plus per-session KV handles.
+
+    - `observe()` counts a hit when the same prefix went to the same backend within the
+      last PREFIX_CACHE_ENTRIES distinct prefixes (that is when Ollama's slot cache and
+      OpenAI prompt caching can skip prefill).
+    - `continuation()` / `remember()` keep the Ollama `context` tokens returned for a
+      session so the next turn, if it only appends to the previous prompt + answer, is
+      sent as the delta on top of that KV state instead of re-prefilling everything.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen: "OrderedDict[Tuple[Backend, str], float]" = OrderedDict()
+        self._sessions: "OrderedDict[Tuple[str, Backend], _Session]" = OrderedDict()
+        self._stats: Dict[Backend, PrefixStats] = {}
+
+    def stats(self, backend: Backend) -> PrefixStats:
+        with self._lock:
+            return self._stats.setdefault(backend, PrefixStats())
+
+    def snapshot(self) -> Dict[Backend, PrefixStats]:
+        with self._lock:
+            return {b: PrefixStats(**vars(s)) for b, s in self._stats.items()}
+
+    # ---- prefix accounting
+    def observe(self, backend: Backend, shaped: ShapedPrompt, reused_chars: int | None = None) -> bool:
+        """Record a served request; `reused_chars` overrides the estimate (session continuation)."""
+        with self._lock:
+            st = self._stats.setdefault(backend, PrefixStats())
+            st.requests += 1
+            hit = False
+            if shaped.key:
+                k = (backend, shaped.key)
+                hit = k in self._seen
+                self._seen[k] = time.time()
+                self._seen.move_to_end(k)
+                while len(self._seen) > max(1, settings.PREFIX_CACHE_ENTRIES):
+                    self._seen.popitem(last=False)
+            reused = reused_chars if reused_chars is not None else (len(shaped.prefix) if hit else 0)
+            if hit or reused:
+                st.prefix_hits += 1
+            st.reused_chars += reused
+            st.prefill_chars += max(0, len(shaped.text) - reused)
+            return hit or bool(reused)
+
+    # ---- session KV handles
+    def continuation(self, session_id: str | None, backend: Backend, shaped: ShapedPrompt) -> Tuple[str, List[int], int] | None:
+        """(delta_prompt, context_tokens, reused_chars) when `shaped` extends the session's last turn."""
+        if not session_id:
+            return None
+        now = time.time()
+        with self._lock:
+            s = self._sessions.get((session_id, backend))
+            if s is None or s.key != shaped.key or not s.tokens:
+                return None
+            if now - s.ts > settings.PREFIX_SESSION_TTL_S:
+                self._sessions.pop((session_id, backend), None)
+                return None
+            for done in s.texts:
+                if len(shaped.text) > len(done) and shaped.text.startswith(done):
+                    self._stats.setdefault(backend, PrefixStats()).continuations += 1
+                    return shaped.text[len(done):], list(s.tokens), len(done)
+            return None
+
+    def remember(self, session_id: str | None, backend: Backend, shaped: ShapedPrompt,
+                 answer: str, tokens: List[int] | None) -> None:
+        if not session_id or not tokens:
+            return
+        # Callers usually store the answer stripped and re-render it after a space
+        # ("Assistant: ..."), so accept the common renderings.
+        a = answer.strip()
+        texts = list(dict.fromkeys([shaped.text + answer, shaped.text + " " + a, shaped.text + a]))
+        with self._lock:
+            k = (session_id, backend)
+            self._sessions[k] = _Session(key=shaped.key, texts=texts, tokens=list(tokens), ts=time.time())
+            self._sessions.move_to_end(k)
+            while len(self._sessions) > max(1, settings.PREFIX_SESSION_MAX):
+                self._sessions.popitem(last=False)
+
+    def forget(self, session_id: str, backend: Backend) -> None:
+        with self._lock:
+            self._sessions.pop((session_id, backend), None)
+
+
+prefix_cache = PrefixCache()
@@ -0,0 +1,27 @@
+from typing import Dict, Tuple
+from .base import BaseProvider
+from .openai_provider import OpenAIProvider
+from .ollama_provider import OllamaProvider
+from .stub_provider import StubProvider
+from ..settings import settings
+
+# Providers are thin HTTP wrappers (the stub keeps a simulated KV cache); share one instance per backend.
+_PROVIDERS: Dict[str, BaseProvider] = {}
+
+def get_provider(name: str) -> BaseProvider:
+    if name not in _PROVIDERS:
+        _PROVIDERS[name] = {"ollama": OllamaProvider, "stub": StubProvider}.get(name, OpenAIProvider)()
+    return _PROVIDERS[name]
+
+def resolve_model(model: str | None, explicit_provider: str | None = None) -> Tuple[str, str]:
+    """Map a (possibly prefixed) model name to (provider_name, bare_model)."""
+    provider_name = explicit_provider or settings.DEFAULT_PROVIDER
+    m = model or settings.DEFAULT_MODEL
+    for prefix in ("ollama", "stub"):
+        if m.startswith(prefix + ":"):
+            provider_name = prefix
+            m = m[len(prefix) + 1:]
+            break
+    if provider_name not in ("ollama", "stub"):
+        provider_name = "openai"
+    return provider_name, m
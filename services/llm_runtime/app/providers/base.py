@@ -1,19 +1,42 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, Set, Tuple
+
+def parse_schema(json_schema: str | None) -> dict | None:
+    """Decode the request's JSON Schema string; None when absent or not a JSON object."""
+    if not json_schema:
+        return None
+    try:
+        schema = json.loads(json_schema)
+    except ValueError:
+        return None
+    return schema if isinstance(schema, dict) else None
 
 class BaseProvider(ABC):
     name: str
 
+    # `context` is stable material (e.g. application JSON) placed after the system prompt and
+    # before the question; `session_id` lets a backend resume its KV state for follow-up turns.
     @abstractmethod
     def generate(self, *, model: str, prompt: str, system: str | None,
                  options: Dict[str, str], json_mode: bool,
                  json_schema: str | None, max_tokens: int | None,
-                 temperature: float | None, timeout_ms: int | None) -> Tuple[str, str]:
+                 temperature: float | None, timeout_ms: int | None,
+                 context: str | None = None, session_id: str | None = None) -> Tuple[str, str]:
         """Return (text, finish_reason)."""
 
     @abstractmethod
     def generate_stream(self, *, model: str, prompt: str, system: str | None,
                         options: Dict[str, str], json_mode: bool,
                         json_schema: str | None, max_tokens: int | None,
-                        temperature: float | None, timeout_ms: int | None) -> Iterable[Tuple[str, bool, str]]:
+                        temperature: float | None, timeout_ms: int | None,
+                        context: str | None = None, session_id: str | None = None) -> Iterable[Tuple[str, bool, str]]:
         """Yield (delta, done, finish_reason)."""
+
+    def load(self, *, model: str, keep_alive: str | None = None, timeout_ms: int | None = None) -> bool:
+        """Make sure `model` is resident and ready to serve. Remote APIs have nothing to load."""
+        return True
+
+    def loaded_models(self) -> Set[str] | None:
+        """Names of models currently resident in the backend, or None if not applicable."""
+        return None
@@ -1,6 +1,8 @@
 import json, requests
-from typing import Dict, Iterable, Tuple
-from .base import BaseProvider
+from typing import Dict, Iterable, Set, Tuple
+from .base import BaseProvider, parse_schema
+from .streams import stream_session
+from ..prefix_cache import ShapedPrompt, prefix_cache, shape
 from ..settings import settings
 
 class OllamaProvider(BaseProvider):
@@ -14,41 +16,70 @@ class OllamaProvider(BaseProvider):
         if max_tokens is not None: opts["num_predict"] = max_tokens
         return opts
 
+    def _format(self, json_mode: bool, json_schema: str | None):
+        # Ollama >= 0.5 accepts a JSON Schema object in `format` and constrains decoding to it
+        schema = parse_schema(json_schema)
+        if schema is not None:
+            return schema
+        return "json" if json_mode else None
+
+    def _prompt(self, payload: dict, model: str, shaped: ShapedPrompt, session_id: str | None) -> int | None:
+        # A follow-up turn that only appends to the session's last prompt + answer is sent as
+        # the delta on top of the returned `context` tokens, so Ollama skips re-prefilling it.
+        # Otherwise the full prompt goes out with a byte-identical prefix for the slot cache.
+        cont = prefix_cache.continuation(session_id, (self.name, model), shaped)
+        if cont is None:
+            payload["prompt"] = shaped.text
+            return None
+        delta, tokens, reused = cont
+        payload["prompt"] = delta
+        payload["context"] = tokens
+        return reused
+
     def generate(self, *, model, prompt, system, options, json_mode, json_schema,
-                 max_tokens, temperature, timeout_ms) -> Tuple[str, str]:
+                 max_tokens, temperature, timeout_ms, context=None, session_id=None) -> Tuple[str, str]:
         url = f"{settings.OLLAMA_ENDPOINT}/api/generate"
-        prompt_text = prompt if not system else f"System:\n{system}\n\nUser:\n{prompt}"
+        shaped = shape(system, context, prompt)
         payload = {
             "model": model,
-            "prompt": prompt_text,
             "stream": False,
             "options": self._options(options, max_tokens, temperature)
         }
-        if json_mode:
-            # basic JSON guard
-            payload["format"] = "json"
+        reused = self._prompt(payload, model, shaped, session_id)
+        if settings.OLLAMA_KEEP_ALIVE:
+            payload["keep_alive"] = settings.OLLAMA_KEEP_ALIVE
+        fmt = self._format(json_mode, json_schema)
+        if fmt is not None:
+            payload["format"] = fmt
 
         to = (timeout_ms/1000) if (timeout_ms and timeout_ms>0) else 120
         r = requests.post(url, json=payload, timeout=to)
         r.raise_for_status()
         data = r.json()
-        return data.get("response",""), data.get("done_reason","stop")
+        text = data.get("response","")
+        prefix_cache.observe((self.name, model), shaped, reused)
+        prefix_cache.remember(session_id, (self.name, model), shaped, text, data.get("context"))
+        return text, data.get("done_reason","stop")
 
     def generate_stream(self, *, model, prompt, system, options, json_mode, json_schema,
-                        max_tokens, temperature, timeout_ms) -> Iterable[Tuple[str,bool,str]]:
+                        max_tokens, temperature, timeout_ms, context=None, session_id=None) -> Iterable[Tuple[str,bool,str]]:
         url = f"{settings.OLLAMA_ENDPOINT}/api/generate"
-        prompt_text = prompt if not system else f"System:\n{system}\n\nUser:\n{prompt}"
+        shaped = shape(system, context, prompt)
         payload = {
             "model": model,
-            "prompt": prompt_text,
             "stream": True,
             "options": self._options(options, max_tokens, temperature)
         }
-        if json_mode:
-            payload["format"] = "json"
+        reused = self._prompt(payload, model, shaped, session_id)
+        if settings.OLLAMA_KEEP_ALIVE:
+            payload["keep_alive"] = settings.OLLAMA_KEEP_ALIVE
+        fmt = self._format(json_mode, json_schema)
+        if fmt is not None:
+            payload["format"] = fmt
 
         to = (timeout_ms/1000) if (timeout_ms and timeout_ms>0) else None
-        with requests.post(url, json=payload, stream=True, timeout=to) as r:
+        parts = []
+        with stream_session.post(url, json=payload, stream=True, timeout=to) as r:
             r.raise_for_status()
             for line in r.iter_lines():
                 if not line: continue
@@ -59,6 +90,28 @@ class OllamaProvider(BaseProvider):
                 delta = obj.get("response","")
                 done = bool(obj.get("done"))
                 finish = obj.get("done_reason","")
+                parts.append(delta)
+                if done:
+                    # the final chunk carries the `context` handle for this turn
+                    prefix_cache.observe((self.name, model), shaped, reused)
+                    prefix_cache.remember(session_id, (self.name, model), shaped, "".join(parts), obj.get("context"))
                 yield (delta, done, finish)
                 if done:
                     break
+
+    def load(self, *, model, keep_alive=None, timeout_ms=None) -> bool:
+        # An empty prompt makes Ollama load the model (and refresh its keep_alive) without generating.
+        url = f"{settings.OLLAMA_ENDPOINT}/api/generate"
+        payload = {"model": model, "prompt": "", "stream": False}
+        ka = keep_alive or settings.OLLAMA_KEEP_ALIVE
+        if ka:
+            payload["keep_alive"] = ka
+        to = (timeout_ms/1000) if (timeout_ms and timeout_ms>0) else 300
+        r = requests.post(url, json=payload, timeout=to)
+        r.raise_for_status()
+        return True
+
+    def loaded_models(self) -> Set[str] | None:
+        r = requests.get(f"{settings.OLLAMA_ENDPOINT}/api/ps", timeout=5)
+        r.raise_for_status()
+        return {m.get("name") or m.get("model") for m in r.json().get("models", [])}
@@ -1,7 +1,9 @@
 import os, json, time
 from typing import Dict, Iterable, Tuple
 import requests
-from .base import BaseProvider
+from .base import BaseProvider, parse_schema
+from .streams import stream_session
+from ..prefix_cache import ShapedPrompt, prefix_cache, shape
 from ..settings import settings
 
 class OpenAIProvider(BaseProvider):
@@ -10,27 +12,42 @@ class OpenAIProvider(BaseProvider):
     def _headers(self):
         return {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
 
-    def generate(self, *, model, prompt, system, options, json_mode, json_schema,
-                 max_tokens, temperature, timeout_ms) -> Tuple[str, str]:
-        url = f"{settings.OPENAI_BASE_URL}/chat/completions"
+    def _response_format(self, json_mode: bool, json_schema: str | None):
+        schema = parse_schema(json_schema)
+        if schema is not None:
+            # Structured outputs; non-strict because our schemas use nullable unions / optional keys
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": str(schema.get("title") or "response"), "schema": schema, "strict": False},
+            }
+        return {"type": "json_object"} if json_mode else None
+
+    def _messages(self, shaped: ShapedPrompt):
+        # system, then context, then question: OpenAI caches the longest shared message prefix
         msgs = []
-        if system:
-            msgs.append({"role": "system", "content": system})
-        msgs.append({"role": "user", "content": prompt})
+        if shaped.system:
+            msgs.append({"role": "system", "content": shaped.system})
+        msgs.append({"role": "user", "content": shaped.user})
+        return msgs
 
+    def generate(self, *, model, prompt, system, options, json_mode, json_schema,
+                 max_tokens, temperature, timeout_ms, context=None, session_id=None) -> Tuple[str, str]:
+        url = f"{settings.OPENAI_BASE_URL}/chat/completions"
+        shaped = shape(system, context, prompt)
         payload = {
             "model": model,
-            "messages": msgs,
+            "messages": self._messages(shaped),
             "stream": False
         }
+        if settings.OPENAI_PROMPT_CACHE_KEY and shaped.key:
+            payload["prompt_cache_key"] = shaped.key
         if max_tokens is not None: payload["max_tokens"] = max_tokens
         if temperature is not None: payload["temperature"] = temperature
 
-        # JSON mode (for structured extraction)
-        if json_mode:
-            payload["response_format"] = {"type": "json_object"}
-            # You can add JSON schema with new OpenAI structured output if desired
-            # (here we keep it simple; the model will return valid JSON)
+        # JSON mode / JSON Schema (for structured extraction)
+        response_format = self._response_format(json_mode, json_schema)
+        if response_format is not None:
+            payload["response_format"] = response_format
 
         to = (timeout_ms/1000) if (timeout_ms and timeout_ms>0) else 120
         r = requests.post(url, headers=self._headers(), json=payload, timeout=to)
@@ -38,28 +55,27 @@ class OpenAIProvider(BaseProvider):
         data = r.json()
         text = data["choices"][0]["message"]["content"]
         finish = data["choices"][0].get("finish_reason", "stop")
+        prefix_cache.observe((self.name, model), shaped)
         return text, finish
 
     def generate_stream(self, **kw) -> Iterable[Tuple[str, bool, str]]:
         url = f"{settings.OPENAI_BASE_URL}/chat/completions"
-        msgs = []
-        system = kw.get("system")
-        if system:
-            msgs.append({"role":"system","content":system})
-        msgs.append({"role":"user","content":kw["prompt"]})
-
+        shaped = shape(kw.get("system"), kw.get("context"), kw["prompt"])
         payload = {
             "model": kw["model"],
-            "messages": msgs,
+            "messages": self._messages(shaped),
             "stream": True
         }
+        if settings.OPENAI_PROMPT_CACHE_KEY and shaped.key:
+            payload["prompt_cache_key"] = shaped.key
         if kw.get("max_tokens") is not None: payload["max_tokens"] = kw["max_tokens"]
         if kw.get("temperature") is not None: payload["temperature"] = kw["temperature"]
-        if kw.get("json_mode"):
-            payload["response_format"] = {"type":"json_object"}
+        response_format = self._response_format(bool(kw.get("json_mode")), kw.get("json_schema"))
+        if response_format is not None:
+            payload["response_format"] = response_format
 
         to = (kw.get("timeout_ms",0)/1000) if kw.get("timeout_ms") else None
-        with requests.post(url, headers=self._headers(), json=payload, timeout=to, stream=True) as r:
+        with stream_session.post(url, headers=self._headers(), json=payload, timeout=to, stream=True) as r:
             r.raise_for_status()
             finish = "stop"
             for line in r.iter_lines():
@@ -67,6 +83,7 @@ class OpenAIProvider(BaseProvider):
                 if line.startswith(b"data: "):
                     chunk = line[6:]
                     if chunk == b"[DONE]":
+                        prefix_cache.observe((self.name, kw["model"]), shaped)
                         yield ("", True, finish)
                         break
                     try:
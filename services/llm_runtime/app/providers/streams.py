@@ -0,0 +1,117 @@
+"""
+Streaming HTTP that another thread can abort.
+
+A stream blocked in a socket read (e.g. a backend that has not sent its first
+token yet) does not notice a flag, and closing the `requests` response from
+another thread does not wake the read either. Connections made through
+`stream_session` register their socket with the StreamAbort bound to the
+calling thread as soon as the request is sent, so abort() can shut the socket
+down: the blocked read raises, the generator unwinds and the connection is
+dropped, which also stops generation upstream. A connection handed back to
+the pool is unregistered first, so an abort can never hit a socket that
+another request picked up.
+"""
+from __future__ import annotations
+import socket, threading
+from contextlib import contextmanager
+from typing import Iterator, List
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_local = threading.local()
+
+
+class StreamAbort:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._socks: List[socket.socket] = []
+        self.aborted = False
+
+    @contextmanager
+    def bind(self) -> Iterator["StreamAbort"]:
+        """Register requests sent from this thread (through stream_session) with this handle."""
+        _local.abort = self
+        try:
+            yield self
+        finally:
+            _local.abort = None
+
+    def _watch(self, sock: socket.socket | None) -> None:
+        if sock is None:
+            return
+        with self._lock:
+            self._socks.append(sock)
+            aborted = self.aborted
+        if aborted:
+            _shutdown(sock)
+
+    def _unwatch(self, sock: socket.socket | None) -> None:
+        with self._lock:
+            if sock in self._socks:
+                self._socks.remove(sock)
+
+    def abort(self) -> None:
+        with self._lock:
+            self.aborted = True
+            socks, self._socks = self._socks, []
+        for sock in socks:
+            _shutdown(sock)
+
+
+def _shutdown(sock: socket.socket) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # already closed
+
+
+class _Watched:
+    def request(self, *args, **kwargs):
+        super().request(*args, **kwargs)
+        self.abort_handle = getattr(_local, "abort", None)
+        if self.abort_handle is not None:
+            self.abort_handle._watch(self.sock)
+
+
+class _HTTPConnection(_Watched, HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_Watched, HTTPSConnection):
+    pass
+
+
+class _ReleasingPool:
+    def _put_conn(self, conn):
+        handle = getattr(conn, "abort_handle", None)
+        if handle is not None:
+            handle._unwatch(conn.sock)
+            conn.abort_handle = None
+        super()._put_conn(conn)
+
+
+class _HTTPPool(_ReleasingPool, HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSPool(_ReleasingPool, HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class _Adapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+
+def _session() -> requests.Session:
+    s = requests.Session()
+    s.mount("http://", _Adapter())
+    s.mount("https://", _Adapter())
+    return s
+
+
+# shared by the providers' generate_stream; keep-alive connections are reused as usual
+stream_session = _session()
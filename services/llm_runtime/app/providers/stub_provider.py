@@ -0,0 +1,61 @@
+import json, threading, time
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+from .base import BaseProvider, parse_schema
+from ..prefix_cache import ShapedPrompt, prefix_cache, shape
+from ..settings import settings
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+class StubProvider(BaseProvider):
+    """
+    Offline backend for local runs and load tests ("stub:<name>").
+
+    Mimics an inference server's KV cache: the last STUB_KV_SLOTS prompts per model are
+    kept, the longest shared prefix with any of them counts as cached, and only the
+    rest is "prefilled" (STUB_PREFILL_MS_PER_KCHAR). Answers are deterministic.
+    """
+    name = "stub"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: Dict[str, "OrderedDict[str, None]"] = {}
+
+    def _prefill(self, model: str, shaped: ShapedPrompt) -> int:
+        with self._lock:
+            slots = self._slots.setdefault(model, OrderedDict())
+            cached = max((_common_prefix(shaped.text, s) for s in slots), default=0)
+            slots[shaped.text] = None
+            slots.move_to_end(shaped.text)
+            while len(slots) > max(1, settings.STUB_KV_SLOTS):
+                slots.popitem(last=False)
+        time.sleep((len(shaped.text) - cached) / 1000 * settings.STUB_PREFILL_MS_PER_KCHAR / 1000)
+        return cached
+
+    def _answer(self, model: str, shaped: ShapedPrompt, json_mode: bool, json_schema: str | None) -> str:
+        if json_mode or parse_schema(json_schema) is not None:
+            return json.dumps({"model": model, "prefix": shaped.key})
+        last = shaped.prompt.strip().splitlines()[-1] if shaped.prompt.strip() else ""
+        return f"[stub:{model}] {last}"
+
+    def generate(self, *, model, prompt, system, options, json_mode, json_schema,
+                 max_tokens, temperature, timeout_ms, context=None, session_id=None) -> Tuple[str, str]:
+        shaped = shape(system, context, prompt)
+        self._prefill(model, shaped)
+        prefix_cache.observe((self.name, model), shaped)
+        return self._answer(model, shaped, json_mode, json_schema), "stop"
+
+    def generate_stream(self, *, model, prompt, system, options, json_mode, json_schema,
+                        max_tokens, temperature, timeout_ms, context=None, session_id=None) -> Iterable[Tuple[str,bool,str]]:
+        shaped = shape(system, context, prompt)
+        self._prefill(model, shaped)
+        words = self._answer(model, shaped, json_mode, json_schema).split(" ")
+        for i, w in enumerate(words):
+            yield (w if i == 0 else " " + w, False, "")
+        prefix_cache.observe((self.name, model), shaped)
+        yield ("", True, "stop")
@@ -0,0 +1,211 @@
+from __future__ import annotations
+import threading, time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
+from app.settings import settings
+from app.providers import resolve_model
+
+Backend = Tuple[str, str]   # (provider_name, model)
+
+
+@dataclass
+class BackendStats:
+    ewma_latency_ms: float = 0.0
+    ewma_error_rate: float = 0.0
+    inflight: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    breaker: str = "closed"            # closed | open | half_open
+    opened_at: float = 0.0
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=256))
+    first_token_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=256))
+
+    def percentile(self, q: float) -> float | None:
+        return _percentile(self.latencies_ms, q)
+
+    def first_token_percentile(self, q: float) -> float | None:
+        return _percentile(self.first_token_ms, q)
+
+
+def _percentile(window: Deque[float], q: float) -> float | None:
+    if not window:
+        return None
+    xs = sorted(window)
+    i = min(len(xs) - 1, max(0, int(round(q * (len(xs) - 1)))))
+    return xs[i]
+
+
+def _parse_groups(spec: str) -> List[List[Backend]]:
+    """
+    "ollama:llama3.2|gpt-4o-mini; ollama:qwen2.5|gpt-4o" -> groups of interchangeable
+    backends, listed in order of preference (local first by convention).
+    """
+    groups = []
+    for g in (spec or "").split(";"):
+        members = [resolve_model(m.strip()) for m in g.split("|") if m.strip()]
+        if members:
+            groups.append(members)
+    return groups
+
+
+class Router:
+    """
+    Tracks live latency / error rate / queue depth per backend and turns a requested
+    model into an ordered list of backends to try.
+
+    Policies (ROUTING_POLICY):
+      - "static":       only the requested backend (legacy behaviour)
+      - "prefer_local": first healthy backend in the peer group, spilling to the next one
+                        when its in-flight queue reaches ROUTE_SPILL_QUEUE_DEPTH
+      - "fastest":      healthy peers ordered by expected latency (EWMA x queue)
+    Backends whose circuit breaker is open are skipped until ROUTE_BREAKER_COOLDOWN_S
+    elapses; then one trial request is let through (half-open).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Backend, BackendStats] = {}
+        self._groups = _parse_groups(settings.ROUTE_PEERS)
+
+    def stats(self, backend: Backend) -> BackendStats:
+        with self._lock:
+            return self._stats.setdefault(backend, BackendStats())
+
+    def snapshot(self) -> Dict[Backend, BackendStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    # ---- health
+    def _available(self, backend: Backend, st: BackendStats, now: float) -> bool:
+        if st.breaker == "open":
+            # after the cooldown one trial may go out; begin() moves the breaker to
+            # half_open only when it is actually dispatched
+            return now - st.opened_at >= settings.ROUTE_BREAKER_COOLDOWN_S and st.inflight == 0
+        if st.breaker == "half_open":
+            # one trial at a time
+            return st.inflight == 0
+        return True
+
+    def _peers(self, backend: Backend) -> List[Backend]:
+        for g in self._groups:
+            if backend in g:
+                return list(g)
+        return [backend]
+
+    # ---- policy
+    def plan(self, model: str | None, explicit_provider: str | None = None) -> List[Backend]:
+        requested = resolve_model(model, explicit_provider)
+        policy = settings.ROUTING_POLICY
+        peers = [requested] if policy == "static" else self._peers(requested)
+        now = time.time()
+        with self._lock:
+            stats = {b: self._stats.setdefault(b, BackendStats()) for b in peers}
+            healthy = [b for b in peers if self._available(b, stats[b], now)]
+            if policy == "fastest":
+                def cost(b: Backend) -> float:
+                    st = stats[b]
+                    # unknown backends get a neutral cost so they are sampled
+                    base = st.ewma_latency_ms or 1.0
+                    return base * (1 + st.inflight)
+                healthy.sort(key=cost)
+            else:  # prefer_local
+                depth = settings.ROUTE_SPILL_QUEUE_DEPTH
+                busy = [b for b in healthy if depth > 0 and stats[b].inflight >= depth]
+                healthy = [b for b in healthy if b not in busy] + busy
+        # empty when every peer has its breaker open: callers fail fast instead of queueing
+        return healthy
+
+    # ---- accounting
+    def begin(self, backend: Backend) -> BackendStats:
+        with self._lock:
+            st = self._stats.setdefault(backend, BackendStats())
+            if st.breaker == "open":
+                st.breaker = "half_open"
+            st.inflight += 1
+            return st
+
+    def end(self, backend: Backend, latency_ms: float, ok: bool | None) -> None:
+        """ok=None means the call was abandoned (e.g. a cancelled hedge) and is not scored."""
+        if ok is not None:
+            self.record(backend, latency_ms, ok)
+        with self._lock:
+            self._stats[backend].inflight -= 1
+
+    @contextmanager
+    def track(self, backend: Backend) -> Iterator[BackendStats]:
+        st = self.begin(backend)
+        t0 = time.monotonic()
+        ok = False
+        try:
+            yield st
+            ok = True
+        finally:
+            self.end(backend, (time.monotonic() - t0) * 1000, ok)
+
+    def stream(self, backend: Backend, chunks: Iterable[Tuple[str, bool, str]]) -> Iterator[Tuple[str, bool, str]]:
+        """
+        Pass a provider stream of (delta, done, finish) through and score the backend
+        on its own time only: latency is time spent waiting on the backend, not on the
+        consumer; a provider error counts as a failure. A consumer that stops early
+        (client cancel -> GeneratorExit) leaves the call unscored, like a lost hedge.
+        """
+        self.begin(backend)
+        it = iter(chunks)
+        waited = 0.0
+        first = True
+        ok: bool | None = None
+        try:
+            while True:
+                t = time.monotonic()
+                try:
+                    chunk = next(it)
+                except StopIteration:
+                    ok = True
+                    break
+                finally:
+                    waited += time.monotonic() - t
+                if first and chunk[0]:
+                    self.record_first_token(backend, waited * 1000)
+                    first = False
+                yield chunk
+        except Exception:
+            ok = False
+            raise
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()  # drops the HTTP stream when the consumer went away
+            self.end(backend, waited * 1000, ok)
+
+    def record_first_token(self, backend: Backend, ms: float) -> None:
+        with self._lock:
+            self._stats.setdefault(backend, BackendStats()).first_token_ms.append(ms)
+
+    def record(self, backend: Backend, latency_ms: float, ok: bool) -> None:
+        a = settings.ROUTE_EWMA_ALPHA
+        with self._lock:
+            st = self._stats.setdefault(backend, BackendStats())
+            st.requests += 1
+            st.ewma_error_rate = (1 - a) * st.ewma_error_rate + a * (0.0 if ok else 1.0)
+            if ok:
+                st.ewma_latency_ms = latency_ms if not st.ewma_latency_ms else (1 - a) * st.ewma_latency_ms + a * latency_ms
+                st.latencies_ms.append(latency_ms)
+                st.consecutive_failures = 0
+                st.breaker = "closed"
+                return
+            st.failures += 1
+            st.consecutive_failures += 1
+            tripped = (
+                st.breaker == "half_open"
+                or st.consecutive_failures >= settings.ROUTE_BREAKER_FAILURES
+                or (st.requests >= 10 and st.ewma_error_rate >= settings.ROUTE_BREAKER_ERROR_RATE)
+            )
+            if tripped:
+                st.breaker = "open"
+                st.opened_at = time.time()
+
+
+router = Router()
@@ -2,6 +2,7 @@ from concurrent import futures
 import grpc
 from app.settings import settings
 from app.service_impl import LlmRuntimeService
+from app.model_manager import model_manager
 from llmruntime.v1 import llm_pb2_grpc  # <-- top-level package import
 
 def serve():
@@ -11,6 +12,8 @@ def serve():
     server.add_insecure_port(listen)
     print(f"[llm-runtime] listening on {listen} (default: {settings.DEFAULT_PROVIDER}/{settings.DEFAULT_MODEL})")
     server.start()
+    # preload configured models + keep recently used ones resident
+    model_manager.start()
     server.wait_for_termination()
 
 if __name__ == "__main__":
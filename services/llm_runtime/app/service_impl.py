@@ -1,64 +1,123 @@
 import grpc
+from contextlib import closing
 from app.settings import settings
-from app.providers.openai_provider import OpenAIProvider
-from app.providers.ollama_provider import OllamaProvider
-from app.providers.base import BaseProvider
+from app.providers import get_provider
+from app.model_manager import model_manager
+from app.router import router
+from app.hedging import hedger
+from app.prefix_cache import prefix_cache
 from app.observability.langfuse import start_trace, generation, end_safe
 from llmruntime.v1 import llm_pb2, llm_pb2_grpc   # <-- top-level package import
 
-def _choose_provider(model: str | None, explicit_provider: str | None) -> tuple[str, BaseProvider, str]:
-    # Provider by model prefix or explicit default
-    provider_name = explicit_provider or settings.DEFAULT_PROVIDER
-    m = model or settings.DEFAULT_MODEL
-    if m.startswith("ollama:"):
-        provider_name = "ollama"
-        m = m[len("ollama:"):]
-    if provider_name == "ollama":
-        return provider_name, OllamaProvider(), m
-    return "openai", OpenAIProvider(), m
+def _generate_kwargs(request: llm_pb2.GenerateRequest) -> dict:
+    return dict(
+        prompt=request.prompt,
+        system=request.system or None,
+        options=dict(request.options),
+        json_mode=request.json_mode,
+        json_schema=request.json_schema or None,
+        max_tokens=(request.max_tokens or None),
+        temperature=(request.temperature if request.temperature != 0 else None),
+        timeout_ms=(request.timeout_ms or None),
+        context=(request.context or None),
+        session_id=(request.session_id or None),
+    )
 
 class LlmRuntimeService(llm_pb2_grpc.LlmRuntimeServicer):
     def Generate(self, request: llm_pb2.GenerateRequest, context: grpc.ServicerContext):
-        provider_name, provider, model = _choose_provider(request.model, None)
+        plan = router.plan(request.model or None)
+        if not plan:
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"all backends for '{request.model}' are unavailable (circuit open)")
         trace = start_trace(
             name="llm_runtime.generate",
             user_id=(request.user_id or None),
-            metadata={"request_id": request.request_id or "", "model": request.model or "", "provider": self.provider.name},
-        )
-        text, finish = provider.generate(
-            model=model,
-            prompt=request.prompt,
-            system=request.system or None,
-            options=dict(request.options),
-            json_mode=request.json_mode,
-            json_schema=request.json_schema or None,
-            max_tokens=(request.max_tokens or None),
-            temperature=(request.temperature if request.temperature != 0 else None),
-            timeout_ms=(request.timeout_ms or None)
-        )
-        end_safe(finish)
-        end_safe(trace)
-        return llm_pb2.GenerateResponse(
-            text=text, model=model, provider=provider_name,
-            finish_reason=finish or "stop", request_id=request.request_id or ""
+            metadata={"request_id": request.request_id or "", "model": request.model or "", "provider": plan[0][0],
+                      "plan": [f"{p}/{m}" for p, m in plan]},
         )
+        kwargs = _generate_kwargs(request)
+        last_error: Exception | None = None
+        try:
+            if settings.HEDGE_ENABLED:
+                try:
+                    (provider_name, model), text, finish = hedger.generate(plan, kwargs)
+                except Exception as e:
+                    model_manager.touch(plan[0][0], plan[0][1], ok=False, error=str(e))
+                    raise
+                model_manager.touch(provider_name, model)
+                return llm_pb2.GenerateResponse(
+                    text=text, model=model, provider=provider_name,
+                    finish_reason=finish or "stop", request_id=request.request_id or ""
+                )
+            # fail over along the routing plan; the first backend that answers wins
+            for provider_name, model in plan:
+                provider = get_provider(provider_name)
+                try:
+                    with router.track((provider_name, model)):
+                        text, finish = provider.generate(model=model, **kwargs)
+                except Exception as e:
+                    model_manager.touch(provider_name, model, ok=False, error=str(e))
+                    last_error = e
+                    continue
+                model_manager.touch(provider_name, model)
+                return llm_pb2.GenerateResponse(
+                    text=text, model=model, provider=provider_name,
+                    finish_reason=finish or "stop", request_id=request.request_id or ""
+                )
+            raise last_error or RuntimeError("no backend available")
+        finally:
+            end_safe(trace)
 
     def GenerateStream(self, request, context):
-        provider_name, provider, model = _choose_provider(request.model, None)
-        for delta, done, finish in provider.generate_stream(
-            model=model,
-            prompt=request.prompt,
-            system=request.system or None,
-            options=dict(request.options),
-            json_mode=request.json_mode,
-            json_schema=request.json_schema or None,
-            max_tokens=(request.max_tokens or None),
-            temperature=(request.temperature if request.temperature != 0 else None),
-            timeout_ms=(request.timeout_ms or None)
-        ):
-            yield llm_pb2.GenerateChunk(
-                delta=delta, model=model, provider=provider_name, done=done, finish_reason=finish or ""
-            )
+        plan = router.plan(request.model or None)
+        if not plan:
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"all backends for '{request.model}' are unavailable (circuit open)")
+        kwargs = _generate_kwargs(request)
+        for i, (provider_name, model) in enumerate(plan):
+            provider = get_provider(provider_name)
+            started = False
+            try:
+                with closing(router.stream((provider_name, model), provider.generate_stream(model=model, **kwargs))) as chunks:
+                    for delta, done, finish in chunks:
+                        started = True
+                        yield llm_pb2.GenerateChunk(
+                            delta=delta, model=model, provider=provider_name, done=done, finish_reason=finish or ""
+                        )
+            except Exception as e:
+                model_manager.touch(provider_name, model, ok=False, error=str(e))
+                # a partially streamed answer cannot be replayed on another backend
+                if started or i == len(plan) - 1:
+                    raise
+                continue
+            model_manager.touch(provider_name, model)
+            return
 
     def Health(self, request, context):
         return llm_pb2.HealthResponse(status="ok", provider_default=settings.DEFAULT_PROVIDER, model_default=settings.DEFAULT_MODEL)
+
+    def Models(self, request, context):
+        model_manager.refresh()
+        routes = router.snapshot()
+        prefixes = prefix_cache.snapshot()
+        hedges = hedger.snapshot()
+        out = []
+        for st in model_manager.snapshot():
+            rs = routes.get((st.provider, st.model))
+            ps = prefixes.get((st.provider, st.model))
+            hedged, hedge_wins = hedges.get((st.provider, st.model), (0, 0))
+            out.append(llm_pb2.ModelInfo(
+                provider=st.provider, model=st.model, state=st.state,
+                last_used_unix_ms=int(st.last_used * 1000),
+                loaded_at_unix_ms=int(st.loaded_at * 1000),
+                load_latency_ms=st.load_latency_ms, error=st.error,
+                ewma_latency_ms=(rs.ewma_latency_ms if rs else 0.0),
+                error_rate=(rs.ewma_error_rate if rs else 0.0),
+                inflight=(rs.inflight if rs else 0),
+                breaker=(rs.breaker if rs else "closed"),
+                prefix_requests=(ps.requests if ps else 0),
+                prefix_hits=(ps.prefix_hits if ps else 0),
+                prefix_continuations=(ps.continuations if ps else 0),
+                prefix_reused_chars=(ps.reused_chars if ps else 0),
+                prefix_prefill_chars=(ps.prefill_chars if ps else 0),
+                hedged=hedged, hedge_wins=hedge_wins,
+            ))
+        return llm_pb2.ModelsResponse(models=out)
@@ -16,6 +16,40 @@ class Settings(BaseSettings):
 
     # Ollama
     OLLAMA_ENDPOINT: str = "http://ollama:11434"
+    OLLAMA_KEEP_ALIVE: str = "30m"            # sent with every Ollama request; "" = server default
+
+    # Warm-up / keep-alive
+    WARMUP_MODELS: str = ""                   # comma-separated, e.g. "ollama:llama3.2:3b-instruct,gpt-4o-mini"
+    KEEPALIVE_INTERVAL_S: int = 240           # ping period for recently used local models
+    KEEPALIVE_IDLE_S: int = 1800              # stop pinging once a model saw no traffic for this long
+
+    # Routing / failover
+    ROUTING_POLICY: str = "prefer_local"      # "static" | "prefer_local" | "fastest"
+    ROUTE_PEERS: str = ""                     # ";"-separated groups of interchangeable models, e.g. "ollama:llama3.2|gpt-4o-mini"
+    ROUTE_SPILL_QUEUE_DEPTH: int = 2          # prefer_local: spill to the next peer at this many in-flight requests (0 = never)
+    ROUTE_EWMA_ALPHA: float = 0.2
+    ROUTE_BREAKER_FAILURES: int = 3           # consecutive failures that open the circuit
+    ROUTE_BREAKER_ERROR_RATE: float = 0.5     # ...or EWMA error rate above this
+    ROUTE_BREAKER_COOLDOWN_S: float = 30.0    # open -> half-open after this long
+
+    # Hedging (duplicate slow Generate calls to a second backend)
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 0.95            # hedge when no first token after this percentile of observed TTFT
+    HEDGE_MIN_SAMPLES: int = 20               # need this many TTFT samples before hedging
+    HEDGE_MIN_DELAY_MS: int = 250
+    HEDGE_BUDGET_RATIO: float = 0.1           # at most ~10% extra requests
+    HEDGE_SAME_BACKEND: bool = False          # allow the duplicate to hit the same backend when it has no peer
+    HEDGE_TIMEOUT_S: float = 120.0            # give up on a hedged call after this long when the request has no timeout_ms
+
+    # Prompt-prefix reuse
+    PREFIX_CACHE_ENTRIES: int = 512           # distinct (backend, prefix) pairs remembered for hit accounting
+    PREFIX_SESSION_TTL_S: int = 1800          # keep a session's Ollama `context` handle this long
+    PREFIX_SESSION_MAX: int = 256             # sessions with a live `context` handle
+    OPENAI_PROMPT_CACHE_KEY: bool = True      # send the prefix digest as `prompt_cache_key`
+
+    # Stub backend ("stub:<name>"): no network, simulated prefill cost
+    STUB_PREFILL_MS_PER_KCHAR: float = 5.0    # sleep per 1000 prompt chars not covered by the simulated KV cache
+    STUB_KV_SLOTS: int = 4
 
     # Langfuse (Cloud)
     LANGFUSE_PUBLIC_KEY: str | None = os.getenv("LANGFUSE_PUBLIC_KEY")
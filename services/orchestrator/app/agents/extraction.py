@@ -4,6 +4,7 @@ from typing import Any, Dict, List
 from crewai import Crew, Process, Task
 from app.agents._base import make_agent
 from app.agents.tools import ExtractBatchTool
+from schemas.json_repair import extract_json
 
 
 def run_extraction_agent(
@@ -46,10 +47,7 @@ Protocol:
     crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False)
     result = crew.kickoff()
     raw = getattr(result, "raw", str(result))
-    try:
-        out = json.loads(raw)
-        if not isinstance(out, list):
-            raise ValueError
-        return out
-    except Exception:
+    out = extract_json(raw, expect=list)
+    if out is None:
         return [{"raw_output": raw, "error": "ExtractionAgent returned non-JSON"}]
+    return out
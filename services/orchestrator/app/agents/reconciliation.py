@@ -4,6 +4,7 @@ from typing import Any, Dict, List
 from crewai import Crew, Process, Task
 from app.agents._base import make_agent
 from app.agents.tools import AskUserTool
+from schemas.json_repair import extract_json
 
 
 def run_reconciliation_agent(
@@ -56,24 +57,21 @@ Protocol:
     result = crew.kickoff()
     raw = getattr(result, "raw", str(result))
 
-    try:
-        rec = json.loads(raw)
-        if not isinstance(rec, dict):
-            raise ValueError
+    rec = extract_json(raw, expect=dict)
+    if rec is not None:
         return rec
-    except Exception:
-        return {
-            "reconciled_profile": {},
-            "unresolved_issues": [
-                {
-                    "code": "LLM_PARSE_ERROR",
-                    "key": "reconciliation_output",
-                    "reason": "Reconciliation Agent returned invalid JSON.",
-                    "severity": "high",
-                }
-            ],
-            "pending_questions": [],
-            "confidence": 0.0,
-            "raw_output": raw,
-        }
+    return {
+        "reconciled_profile": {},
+        "unresolved_issues": [
+            {
+                "code": "LLM_PARSE_ERROR",
+                "key": "reconciliation_output",
+                "reason": "Reconciliation Agent returned invalid JSON.",
+                "severity": "high",
+            }
+        ],
+        "pending_questions": [],
+        "confidence": 0.0,
+        "raw_output": raw,
+    }
 
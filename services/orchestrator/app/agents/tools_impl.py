@@ -17,6 +17,8 @@ from crewai.tools import BaseTool
 EV_BASE_URL = os.getenv("EV_BASE_URL", "http://extract_validate:8002")
 SCORE_BASE_URL = os.getenv("SCORE_BASE_URL","http://localhost:8004")  # no default -> must configure
 RECOMMEND_BASE_URL = os.getenv("RECOMMEND_SERVICE_URL", "http://recommend:8006")  # <— NEW
+SCORE_BATCH_SIZE = int(os.getenv("SCORE_BATCH_SIZE", "1000"))  # records per /score/batch call
+SCORE_REASONS_TOP_K = int(os.getenv("SCORE_REASONS_TOP_K", "3"))  # reason codes returned with each score (0 = none)
 
 # -------------------------------------------------------------------
 # 1) Extraction tool: calls /extract/batch
@@ -165,6 +167,7 @@ class ScoreTool(BaseTool):
         "eid": ...,
         "probability": ...,
         "decision": "APPROVE" | "REVIEW" | "SOFT_DECLINE",
+        "reasons": [{"code", "feature", "value", "contribution", "text"}, ...],  # absent when the model cannot be explained
         ...
       }
     """
@@ -204,10 +207,31 @@ class ScoreTool(BaseTool):
             "asset_value": asset_value,
             "liabilities_value": liabilities_value,
         }
-        resp = requests.post(url, json=payload, timeout=60)
+        resp = requests.post(url, json=payload, params={"top_k": SCORE_REASONS_TOP_K}, timeout=60)
         resp.raise_for_status()
         return json.dumps(resp.json(), ensure_ascii=False)
 
+    def score_many(self, records: List[Dict[str, Any]], top_k: int = SCORE_REASONS_TOP_K) -> List[Dict[str, Any]]:
+        """
+        Score many ScoreInput-shaped dicts through /score/batch, SCORE_BATCH_SIZE
+        per call; results come back in input order, each with top_k reason codes.
+        For caseload runs (re-scoring after a model update, backfills) where
+        per-call overhead dominates.
+        """
+        if not SCORE_BASE_URL:
+            raise RuntimeError("SCORE_BASE_URL environment variable is not configured")
+
+        url = f"{SCORE_BASE_URL}/score/batch"
+        payloads = [ScoreInput.model_validate(r).model_dump() for r in records]
+        results: List[Dict[str, Any]] = []
+        with requests.Session() as session:
+            for start in range(0, len(payloads), SCORE_BATCH_SIZE):
+                resp = session.post(url, json=payloads[start:start + SCORE_BATCH_SIZE],
+                                    params={"top_k": top_k}, timeout=120)
+                resp.raise_for_status()
+                results.extend(resp.json())
+        return results
+
 class RecommendTool(BaseTool):
     """
     Calls the Recommendation microservice to get:
@@ -5,6 +5,24 @@ from crewai import Crew, Process, Task
 from app.agents._base import make_agent
 from app.agents.tools import ValidateTool
 from app.utils.extracts import facts_by_doc_from_extracts
+from pydantic import ValidationError
+from schemas.json_repair import extract_json
+from schemas.models import ValidationReport
+
+# a report missing any of these (e.g. cut off by max_tokens) is not a report
+_REQUIRED_KEYS = ("application_id", "issues", "next_action")
+
+
+def _parse_report(raw: str) -> Dict[str, Any] | None:
+    """The agent's ValidationReport as a dict, or None if it is invalid or was truncated."""
+    report = extract_json(raw, expect=dict, allow_truncated=False)
+    if report is None or any(k not in report for k in _REQUIRED_KEYS):
+        return None
+    try:
+        ValidationReport.model_validate(report)
+    except ValidationError:
+        return None
+    return report
 
 
 def run_validation_agent(
@@ -49,10 +67,8 @@ Protocol:
     result = crew.kickoff()
     raw = getattr(result, "raw", str(result))
 
-    try:
-        report = json.loads(raw)
-        if not isinstance(report, dict):
-            raise ValueError
+    report = _parse_report(raw)
+    if report is not None:
         # if clarifications exist and no critical, allow proceed
         clar = (application or {}).get("clarification_answers") or {}
         if clar:
@@ -60,22 +76,21 @@ Protocol:
             if not has_critical and report.get("next_action") in {"ask_user", "halt"}:
                 report["next_action"] = "proceed"
         return report
-    except Exception:
-        return {
-            "application_id": application_id,
-            "issues": [
-                {
-                    "code": "LLM_PARSE_ERROR",
-                    "key": "validation_output",
-                    "severity": "critical",
-                    "message": "Validation Agent returned invalid JSON.",
-                    "sources": [],
-                    "suggested_value": None,
-                    "confidence": 0.0,
-                }
-            ],
-            "next_action": "halt",
-            "reconciled": {},
-            "raw_output": raw,
-        }
+    return {
+        "application_id": application_id,
+        "issues": [
+            {
+                "code": "LLM_PARSE_ERROR",
+                "key": "validation_output",
+                "severity": "critical",
+                "message": "Validation Agent returned an invalid or truncated ValidationReport.",
+                "sources": [],
+                "suggested_value": None,
+                "confidence": 0.0,
+            }
+        ],
+        "next_action": "halt",
+        "reconciled": {},
+        "raw_output": raw,
+    }
 
@@ -7,6 +7,7 @@ from uuid import uuid4
 import os, time
 from fastapi import Body
 from app.pipeline import run_multi_agent_pipeline
+from app.services import dup_index
 from schemas.models import (
     Application, Applicant, ApplicantForm, ExtractResult
 )
@@ -80,8 +81,13 @@ def attach_extracts(eid: str, req: AttachExtractsRequest):
 
     now = int(time.time())
     ops: list = []
+    failed: list = []
 
     for er in req.extracts:
+        if er.status != "ok":
+            # keep whatever was stored for this doc before; the client retries it separately
+            failed.append(er.doc_id)
+            continue
         if er.applicant_eid != eid:
             raise HTTPException(status_code=400, detail=f"EID mismatch in extract {er.doc_id}")
         if er.application_id != req.application_id:
@@ -101,12 +107,21 @@ def attach_extracts(eid: str, req: AttachExtractsRequest):
     if ops:
         db.extracts.bulk_write(ops)
 
+    # cross-applicant collisions (same IBAN / phone, near-identical address or statement);
+    # all extracts of the EID, so a partial re-attach keeps the earlier documents indexed
+    extracts = db.extracts.find(
+        {"applicant_eid": eid},
+        projection={"_id": False, "doc_type": True, "raw.account_ids": True, "raw.txn_count": True,
+                    "raw.txn_minhash": True, "facts.structured.contact": True},
+    )
+    duplicates = dup_index.check_and_add(eid, app_row, extracts)
+
     db.applications.update_one(
         {"applicant.emirates_id": eid},
-        {"$set": {"status.updated_at": now}},
+        {"$set": {"status.updated_at": now, "duplicate_flags": duplicates}},
     )
 
-    return {"ok": True, "attached": len(ops)}
+    return {"ok": True, "attached": len(ops), "failed": failed, "duplicates": duplicates}
 
 from fastapi import Query
 from fastapi.responses import JSONResponse
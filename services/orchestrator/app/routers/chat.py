@@ -52,6 +52,17 @@ class ChatResponse(BaseModel):
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
+_CHAT_SYSTEM_PROMPT = (
+    "You are an AI assistant helping with government social-support applications.\n"
+    "You are chatting with an applicant or case worker about a social support application.\n"
+    "You must strictly base your answers on the provided application context "
+    "(form data and document extracts, given as JSON). If something is not in the context, "
+    "say you don't know.\n"
+    "Do not invent eligibility decisions; explain using the given facts only.\n"
+    "Answer the user's last message as the Assistant. Be concise and clear."
+)
+
+
 def _build_app_context(eid: str) -> dict:
     """Build the JSON context for the LLM (application + extracts)."""
     db = mongo()
@@ -194,31 +205,24 @@ def chat_with_application(eid: str, req: ChatRequest):
             return ChatResponse(ok=False, reply=err, history=messages)
 
     # 5) Regular chat flow (non-pipeline message)
+    # Stable parts first (system, application JSON), then the append-only conversation:
+    # the runtime reuses the cached prefix and, on follow-up turns, the session's KV state.
     context = _build_app_context(eid)
     history_text = _format_history_for_prompt(history)
-    context_json = json.dumps(context, ensure_ascii=False, indent=2)
-
-    system = (
-        "You are an AI assistant helping with government social-support applications.\n"
-        "You must strictly base your answers on the provided application context "
-        "(form data and document extracts). If something is not in the context, "
-        "say you don't know.\n"
-        "Do not invent eligibility decisions; explain using the given facts only."
-    )
+    context_json = json.dumps(context, ensure_ascii=False, indent=2, sort_keys=True)
 
     prompt = (
-        "You are chatting with an applicant or case worker about a social support application.\n"
-        "Below is the application context as JSON (form + document extracts):\n\n"
-        f"{context_json}\n\n"
         "Conversation so far:\n"
-        f"{history_text}\n\n"
-        "Now answer the user's last message as the Assistant. Be concise and clear.\n"
+        f"{history_text}\n"
+        "Assistant:"
     )
 
     try:
         raw_reply = generate_answer(
             prompt=prompt,
-            system=system,
+            system=_CHAT_SYSTEM_PROMPT,
+            context=context_json,
+            session_id=eid,
             temperature=0.2,
             max_tokens=512,
         )
@@ -12,6 +12,8 @@ def generate_answer(
     *,
     prompt: str,
     system: str = "",
+    context: str = "",
+    session_id: str = "",
     model: Optional[str] = None,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
@@ -21,6 +23,10 @@ def generate_answer(
     """
     Simple wrapper over LLM Runtime Generate.
     Returns plain text (no JSON parsing).
+
+    `context` is stable material (e.g. application JSON) that the runtime places
+    between `system` and `prompt`; `session_id` lets it resume the backend's KV
+    cache on follow-up turns, so `prompt` should only ever grow by appending.
     """
     channel = grpc.insecure_channel(LLM_ADDR)
     stub = llm_pb2_grpc.LlmRuntimeStub(channel)
@@ -32,6 +38,8 @@ def generate_answer(
         json_mode=False,
         json_schema="",
         options=(options or {}),
+        context=(context or ""),
+        session_id=(session_id or ""),
     )
 
     if temperature is not None:
@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import redis
+from schemas import fingerprints as fp
+
+logger = logging.getLogger("orchestrator.dup_index")
+
+# ------------------------------------------------------------------------------
+# Config
+# ------------------------------------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+DUP_INDEX_ENABLED = os.getenv("DUP_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+DUP_ADDRESS_MIN_SIM = float(os.getenv("DUP_ADDRESS_MIN_SIM", "0.8"))   # estimated Jaccard of address 4-grams
+DUP_TXN_MIN_SIM = float(os.getenv("DUP_TXN_MIN_SIM", "0.7"))           # estimated Jaccard of statement transactions
+DUP_MAX_BUCKET = int(os.getenv("DUP_MAX_BUCKET", "50"))                # members read per bucket (caps hot buckets)
+DUP_MAX_CANDIDATES = int(os.getenv("DUP_MAX_CANDIDATES", "50"))        # LSH candidates verified per kind (most shared bands first)
+
+_MIN_ADDRESS_CHARS = 12    # "Dubai" alone would put everyone in one bucket
+_MIN_TXNS = 5
+
+# Key helpers (namespaced & explicit). Identifier values are hashed, never stored in keys.
+def _k_bucket(kind: str, h: str) -> str: return f"dup:{kind}:{h}"     # SET of EIDs
+def _k_sig(eid: str) -> str: return f"dup:sig:{eid}"                  # HSET kind -> signature
+def _k_member(eid: str) -> str: return f"dup:member:{eid}"            # SET of bucket keys the EID is in
+
+# ------------------------------------------------------------------------------
+# Identifiers of one applicant
+# ------------------------------------------------------------------------------
+_IBAN = re.compile(r"^[A-Z]{2}\d{2}[A-Z0-9]{11,30}$")
+
+
+def normalize_iban(v: Any) -> Optional[str]:
+    s = re.sub(r"\s+", "", str(v or "")).upper()
+    return s if _IBAN.match(s) else None
+
+
+def normalize_phone(v: Any) -> Optional[str]:
+    """National significant number: '+971 50 123 4567' / '00971501234567' / '0501234567' -> '501234567'."""
+    digits = re.sub(r"\D", "", str(v or ""))
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if digits.startswith("971"):
+        digits = digits[3:]
+    digits = digits.lstrip("0")
+    return digits[-9:] if len(digits) >= 7 else None
+
+
+def _as_list(v: Any) -> List[Any]:
+    if v is None:
+        return []
+    return list(v) if isinstance(v, (list, tuple, set)) else [v]
+
+
+@dataclass
+class Identifiers:
+    ibans: Set[str] = field(default_factory=set)
+    phones: Set[str] = field(default_factory=set)
+    address_sig: List[int] = field(default_factory=list)
+    txn_sig: List[int] = field(default_factory=list)
+
+    def buckets(self) -> Dict[str, str]:
+        """bucket key -> kind."""
+        h = lambda v: hashlib.sha1(v.encode("utf-8")).hexdigest()[:20]
+        out = {_k_bucket("iban", h(v)): "iban" for v in self.ibans}
+        out.update({_k_bucket("phone", h(v)): "phone" for v in self.phones})
+        out.update({_k_bucket("addr", b): "address" for b in fp.band_keys(self.address_sig)})
+        out.update({_k_bucket("txn", b): "transactions" for b in fp.band_keys(self.txn_sig)})
+        return out
+
+    def signatures(self) -> Dict[str, str]:
+        sigs = {"address": self.address_sig, "transactions": self.txn_sig}
+        return {k: fp.pack(v) for k, v in sigs.items() if v}
+
+
+def identifiers_from(application: Dict[str, Any], extracts: Iterable[Dict[str, Any]]) -> Identifiers:
+    """IBANs, phones, address and statement fingerprint from the stored application + its extracts."""
+    applicant = application.get("applicant") or {}
+    form = application.get("form") or {}
+    ids = Identifiers()
+    for v in _as_list(form.get("iban")) + _as_list(applicant.get("iban")):
+        if normalize_iban(v):
+            ids.ibans.add(normalize_iban(v))
+    for v in _as_list(form.get("phone")) + _as_list(applicant.get("phone")):
+        if normalize_phone(v):
+            ids.phones.add(normalize_phone(v))
+
+    address = fp.normalize_address(applicant.get("address") or "")
+    if len(address) >= _MIN_ADDRESS_CHARS:
+        ids.address_sig = fp.minhash(fp.token_hashes(fp.text_shingles(address)))
+
+    for er in extracts:
+        raw, facts = er.get("raw") or {}, er.get("facts") or {}
+        if er.get("doc_type") == "bank":
+            for v in raw.get("account_ids") or []:
+                if normalize_iban(v):
+                    ids.ibans.add(normalize_iban(v))
+            if (raw.get("txn_count") or 0) >= _MIN_TXNS and raw.get("txn_minhash"):
+                ids.txn_sig = list(raw["txn_minhash"])
+        elif er.get("doc_type") == "resume":
+            contact = (facts.get("structured") or {}).get("contact") or {}
+            for v in _as_list(contact.get("phone")) + _as_list(contact.get("phones")):
+                if normalize_phone(v):
+                    ids.phones.add(normalize_phone(v))
+    return ids
+
+# ------------------------------------------------------------------------------
+# Index
+# ------------------------------------------------------------------------------
+_MIN_SIM = {"address": DUP_ADDRESS_MIN_SIM, "transactions": DUP_TXN_MIN_SIM}
+
+
+class DuplicateIndex:
+    """
+    Blocking index over all applicants in Redis: exact buckets for IBAN / phone,
+    LSH band buckets for the address and statement MinHash signatures. An update
+    is two pipelined round trips whatever the caseload size: (1) join this EID's
+    buckets and read the other members, (2) read the candidates' signatures to
+    confirm LSH hits and leave buckets this EID no longer belongs to.
+    """
+
+    def __init__(self, client: "redis.Redis"):
+        self.r = client
+
+    def check_and_add(self, eid: str, ids: Identifiers) -> List[Dict[str, Any]]:
+        buckets = ids.buckets()
+        keys = list(buckets)
+        # join first, then read: of two concurrent duplicates at least one sees the other
+        pipe = self.r.pipeline(transaction=False)
+        for k in keys:
+            pipe.sadd(k, eid)
+        pipe.delete(_k_sig(eid))
+        if ids.signatures():
+            pipe.hset(_k_sig(eid), mapping=ids.signatures())
+        for k in keys:
+            pipe.srandmember(k, DUP_MAX_BUCKET + 1)
+        pipe.smembers(_k_member(eid))
+        replies = pipe.execute()
+        members, old_keys = replies[-len(keys) - 1:-1], replies[-1]
+
+        exact: Dict[Tuple[str, str], float] = {}
+        # LSH candidates ranked by shared bands (itself a rough similarity estimate)
+        candidates: Dict[str, Counter] = {"address": Counter(), "transactions": Counter()}
+        for k, found in zip(keys, members):
+            kind = buckets[k]
+            for other in found or ():
+                other = other.decode() if isinstance(other, bytes) else other
+                if other == eid:
+                    continue
+                if kind in candidates:
+                    candidates[kind][other] += 1
+                else:
+                    exact[(kind, other)] = 1.0
+
+        checks = [(kind, other) for kind, counts in candidates.items()
+                  for other, _ in counts.most_common(DUP_MAX_CANDIDATES)]
+        pipe = self.r.pipeline(transaction=False)
+        for kind, other in checks:
+            pipe.hget(_k_sig(other), kind)
+        stale = {k.decode() if isinstance(k, bytes) else k for k in old_keys or ()} - set(keys)
+        for k in stale:
+            pipe.srem(k, eid)
+        pipe.delete(_k_member(eid))
+        if keys:
+            pipe.sadd(_k_member(eid), *keys)
+        replies = pipe.execute()
+
+        own = {"address": ids.address_sig, "transactions": ids.txn_sig}
+        for kind in candidates:
+            found = [(other, sig) for (k, other), sig in zip(checks, replies) if k == kind and sig]
+            scores = fp.similarities(own[kind], [sig for _, sig in found])
+            for (other, _), score in zip(found, scores.tolist()):
+                if score >= _MIN_SIM[kind]:
+                    exact[(kind, other)] = round(score, 3)
+
+        return [{"kind": kind, "eid": other, "similarity": score}
+                for (kind, other), score in sorted(exact.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+
+def _get_client() -> Optional["redis.Redis"]:
+    try:
+        return redis.from_url(REDIS_URL, decode_responses=True)
+    except Exception:
+        return None
+
+_index = DuplicateIndex(_get_client()) if DUP_INDEX_ENABLED else None
+
+
+def check_and_add(eid: str, application: Dict[str, Any], extracts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Index the applicant and return collisions with other EIDs:
+    [{"kind": "iban"|"phone"|"address"|"transactions", "eid": ..., "similarity": ...}].
+    Fail-soft: [] when the index is disabled or Redis is unavailable.
+    """
+    if _index is None or _index.r is None:
+        return []
+    try:
+        return _index.check_and_add(eid, identifiers_from(application, extracts))
+    except redis.RedisError as e:
+        logger.warning("duplicate index unavailable for %s: %s", eid, e)
+        return []
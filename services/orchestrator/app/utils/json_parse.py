@@ -1,20 +1,12 @@
-import json
-import re
 from typing import Any, Dict
+from schemas.json_repair import extract_json
 
 
 def parse_json_lenient(raw: str) -> Dict[str, Any]:
-    """Try strict JSON, else pull the largest {...} block; fallback to REVIEW."""
-    try:
-        return json.loads(raw)
-    except Exception:
-        pass
-    m = re.search(r"\{(?:[^{}]|(?R))*\}", raw, re.DOTALL)
-    if m:
-        try:
-            return json.loads(m.group(0))
-        except Exception:
-            pass
+    """Try strict JSON, else extract/repair the first {...} object; fallback to REVIEW."""
+    data = extract_json(raw, expect=dict)
+    if data is not None:
+        return data
     return {
         "final_decision": "REVIEW",
         "ml_decision": "REVIEW",
@@ -0,0 +1,73 @@
+"""
+Feature building benchmark and parity check.
+
+    python -m app.bench_features --rows 1000000 --repeat 3
+
+Generates a synthetic training frame, checks build_features_from_dataframe and
+build_features_batch against the per-record build_features on a sample, then
+times the columnar builders. tests/test_features.py runs the same check_parity.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from .features import ApplicationRecord, build_features, build_features_batch, build_features_from_dataframe
+
+_EMPLOYMENT = np.array(["Employed", "Unemployed", "Self-Employed", "unemployed", "Unknown"])
+
+def synthetic_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    income = rng.gamma(2.0, 2000.0, rows).round(2)
+    return pd.DataFrame({
+        "eid": [f"784{i:012d}" for i in range(rows)],
+        "declared_monthly_income": (income * rng.uniform(0.8, 1.2, rows)).round(2),
+        "family_size": rng.integers(1, 10, rows),
+        "employment_status": _EMPLOYMENT[rng.integers(0, len(_EMPLOYMENT), rows)],
+        "avg_monthly_income": np.where(rng.random(rows) < 0.05, 0.0, income),
+        "avg_monthly_expenses": rng.gamma(2.0, 1500.0, rows).round(2),
+        "credit_score": rng.integers(300, 850, rows),
+        "total_debt": rng.gamma(1.0, 10000.0, rows).round(2),
+        "asset_value": rng.gamma(1.0, 20000.0, rows).round(2),
+        "liabilities_value": rng.gamma(1.0, 15000.0, rows).round(2),
+        "eligible": rng.integers(0, 2, rows),
+    })
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def check_parity(df: pd.DataFrame) -> None:
+    """Raise AssertionError unless the columnar builders match build_features row by row."""
+    apps = [ApplicationRecord(**{k: v for k, v in r.items() if k != "eligible"}) for r in df.to_dict("records")]
+    expected = pd.concat([build_features(a)[0] for a in apps], ignore_index=True)
+    X, meta = build_features_from_dataframe(df)
+    pd.testing.assert_frame_equal(X.reset_index(drop=True), expected)
+    assert meta.feature_names == list(expected.columns)
+    pd.testing.assert_frame_equal(build_features_batch(apps)[0], expected)
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--parity-rows", type=int, default=2_000)
+    args = ap.parse_args()
+
+    df = synthetic_frame(args.rows)
+    check_parity(df.head(args.parity_rows))
+    print(f"parity ok on {min(args.parity_rows, len(df)):,} rows")
+
+    sample = df.head(min(len(df), 1_000))
+    apps = [ApplicationRecord(**{k: v for k, v in r.items() if k != "eligible"}) for r in df.to_dict("records")]
+    per_record = _time(lambda: [build_features(a) for a in apps[:len(sample)]], 1) / len(sample)
+
+    print(f"rows={len(df):,}")
+    print(f"build_features_from_dataframe {_time(lambda: build_features_from_dataframe(df), args.repeat) * 1000:8.1f} ms")
+    print(f"build_features_batch          {_time(lambda: build_features_batch(apps), args.repeat) * 1000:8.1f} ms")
+    print(f"build_features x rows (est.)  {per_record * len(df) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,31 @@ class Settings(BaseSettings):
     MODEL_DIR: str = "/app/models/eligibility_v1"
     PORT: int = 8004
 
+    # Model registry: one immutable directory per version under MODELS_ROOT, and a
+    # CURRENT pointer file naming the live one (MODEL_DIR is used until a version
+    # is published). Every worker polls the pointer every MODEL_POLL_S seconds,
+    # preloads + warms the new bundle, then switches; MODEL_CACHE_SIZE bundles stay in memory.
+    MODELS_ROOT: str = "/app/models"
+    MODEL_POLL_S: float = 2.0
+    MODEL_CACHE_SIZE: int = 2
+
+    # Training jobs (jobs.py): one subprocess per job, off the serving process.
+    # CV_JOBS > 1 fits the calibration folds in parallel; every process is capped to
+    # BLAS_THREADS threads, pinned to TRAIN_CPUS (e.g. "2,3" / "2-3"; empty = any) and niced.
+    TRAIN_JOBS_DIR: str = ""            # default <MODELS_ROOT>/.jobs
+    TRAIN_MAX_CONCURRENT: int = 1
+    TRAIN_CV_JOBS: int = 1
+    TRAIN_BLAS_THREADS: int = 1
+    TRAIN_CPUS: str = ""
+    TRAIN_NICE: int = 10
+    TRAIN_TIMEOUT_S: float = 3600.0
+    TRAIN_JOBS_KEEP: int = 50
+
+    # Explanations: k-means background size saved at train time, and the model
+    # evaluations per row when only KernelExplainer applies (non-linear, non-tree models)
+    SHAP_BACKGROUND_K: int = 50
+    SHAP_NSAMPLES: int = 200
+
     class Config:
         env_prefix = "SCORE_"
 
@@ -1,9 +1,45 @@
 # services/score/app/explain.py
+"""
+Per-feature contributions for the eligibility model, in probability units.
+
+The engine for a model is built once per loaded bundle and picks the cheapest
+exact method the model allows:
+  - "linear": (calibrated) logistic regression behind per-feature scalers. The
+    interventional SHAP value of a linear margin is closed form,
+    w_j * (z_j - E[z_j]), one matrix product for a whole batch.
+  - "tree": gradient-boosted trees (behind the same kind of scalers) via
+    shap.TreeExplainer on the raw log-odds margin.
+  - "kernel": anything else, shap.KernelExplainer over the background set with
+    settings.SHAP_NSAMPLES evaluations.
+
+With sigmoid calibration (what train.py fits) each CV fold's probability is
+sigmoid(L), L = -(a * margin + b). Each fold's margin attributions are
+multiplied by -a (log-odds units), then mapped to probability units with the
+secant slope of the sigmoid between E[L] and L(x), and the folds are averaged.
+Signs are kept, and the contributions sum to predict_proba(x) - base_value.
+
+The background is the weighted k-means summary of the training features saved
+by train.py (background.json). Bundles trained before it existed fall back to
+the scaler means (linear) or the tree path statistics (tree).
+"""
 from __future__ import annotations
-import os, json, joblib, shap, pandas as pd
+import os, json, threading
+import numpy as np
+import pandas as pd
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.pipeline import Pipeline
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MaxAbsScaler, MinMaxScaler, RobustScaler, StandardScaler
+from .config import settings
 from .features import build_features, ApplicationRecord
+from .score_core import _MODEL_CACHE, _cache_lock, load_model_bundle
+
+BACKGROUND_FILE = "background.json"
+
+# transforms that map each column on its own, affinely: attributions stay per input feature
+_PER_FEATURE = (StandardScaler, MinMaxScaler, MaxAbsScaler, RobustScaler)
 
 
 @dataclass
@@ -13,17 +49,238 @@ class FeatureContribution:
     shap_value: float
 
 
-_explainer_cache = {}
+@dataclass
+class Attribution:
+    values: np.ndarray        # [n_rows, n_features], probability units
+    base_value: float
+    method: str               # "linear" | "tree" | "kernel"
+
+
+# -----------------------------
+# Background set (written at train time)
+# -----------------------------
+
+def build_background(X: pd.DataFrame, k: int, max_rows: int = 20_000, seed: int = 0) -> Dict[str, object]:
+    """
+    Weighted k-means summary of the training features: k centers found on
+    standardized columns (so large-valued features do not dominate), mapped back
+    to feature units, integer columns rounded; weights are cluster shares.
+    """
+    from sklearn.cluster import KMeans
+
+    sample = X.sample(n=max_rows, random_state=seed) if len(X) > max_rows else X
+    values = sample.to_numpy(dtype=np.float64)
+    mu, sd = values.mean(axis=0), values.std(axis=0)
+    sd[sd == 0] = 1.0
+    k = max(1, min(k, len(np.unique(values, axis=0))))
+    km = KMeans(n_clusters=k, n_init=3, random_state=seed).fit((values - mu) / sd)
+    centers = km.cluster_centers_ * sd + mu
+    for j, dtype in enumerate(sample.dtypes):
+        if pd.api.types.is_integer_dtype(dtype):
+            centers[:, j] = np.round(centers[:, j])
+    weights = np.bincount(km.labels_, minlength=k) / len(values)
+    return {"feature_names": list(X.columns), "data": centers.tolist(), "weights": weights.tolist()}
+
+
+def load_background(model_dir: str, feature_names: List[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    path = os.path.join(model_dir, BACKGROUND_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        bg = json.load(f)
+    data = pd.DataFrame(bg["data"], columns=bg["feature_names"])[feature_names].to_numpy(dtype=np.float64)
+    return data, np.asarray(bg["weights"], dtype=np.float64)
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+
+def _split(estimator) -> Tuple[List[object], object]:
+    """(per-feature transforms, final estimator), unwrapping a Pipeline."""
+    if isinstance(estimator, Pipeline):
+        steps = [s for _, s in estimator.steps]
+        return [s for s in steps[:-1] if s not in (None, "passthrough")], steps[-1]
+    return [], estimator
+
+
+def _transform(pre: List[object], X: np.ndarray) -> np.ndarray:
+    for step in pre:
+        names = getattr(step, "feature_names_in_", None)
+        X = step.transform(pd.DataFrame(X, columns=names) if names is not None else X)
+    return np.asarray(X, dtype=np.float64)
+
+
+def _affine(pre: List[object], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The per-feature transforms folded into z = x * scale + offset (found by transforming 0 and 1)."""
+    X = _transform(pre, np.vstack([np.zeros(n_features), np.ones(n_features)]))
+    return X[1] - X[0], X[0]
+
+
+# boosted trees whose raw output is the log-odds margin (what calibration and the sigmoid see).
+# Not HistGradientBoosting: its float64 bin thresholds disagree with shap's float32 inputs on ties.
+_BOOSTED = ("GradientBoostingClassifier", "XGBClassifier", "LGBMClassifier")
+
+
+def _is_boosted_tree(est) -> bool:
+    return type(est).__name__ in _BOOSTED
 
 
-def load_model(model_dir: str):
-    with open(os.path.join(model_dir, "metrics.json")) as f:
-        metrics = json.load(f)
-    model_path = os.path.join(model_dir, metrics["model_file"])
-    model = joblib.load(model_path)
-    with open(os.path.join(model_dir, "feature_meta.json")) as f:
-        meta = json.load(f)
-    return model, meta["feature_names"]
+def _folds(model) -> Optional[List[Tuple[object, float, float]]]:
+    """[(estimator, a, b)] with p = sigmoid(-(a * margin + b)); None when that form does not hold."""
+    if isinstance(model, CalibratedClassifierCV):
+        out = []
+        for cc in model.calibrated_classifiers_:
+            cal = cc.calibrators[0] if len(cc.calibrators) == 1 else None
+            if cal is None or not hasattr(cal, "a_"):
+                return None  # isotonic / multiclass
+            out.append((getattr(cc, "estimator", None) or cc.base_estimator, float(cal.a_), float(cal.b_)))
+        return out
+    return [(model, -1.0, 0.0)]  # plain classifier: p = sigmoid(margin)
+
+
+class _MarginExplainer:
+    """SHAP values of one fold's raw margin, on features mapped by its per-feature transforms."""
+
+    def __init__(self, estimator, n_features: int, background: Optional[Tuple[np.ndarray, np.ndarray]]):
+        pre, est = _split(estimator)
+        if not all(isinstance(s, _PER_FEATURE) for s in pre):
+            raise TypeError("non per-feature preprocessing")
+        self.pre = pre
+        self.scale, self.offset = _affine(pre, n_features)
+        if isinstance(est, LogisticRegression) and est.coef_.shape[0] == 1:
+            self.kind = "linear"
+            self.w = est.coef_[0].astype(np.float64)
+            if background is not None:
+                self.z_ref = np.average(self._z(background[0]), axis=0, weights=background[1])
+            elif pre and getattr(pre[0], "mean_", None) is not None:
+                # no background saved: the training mean, as kept by the first scaler
+                self.z_ref = self._z(pre[0].mean_[None, :])[0]
+            else:
+                raise TypeError("no background for a linear model without a fitted scaler")
+            self.expected = float(self.w @ self.z_ref + est.intercept_[0])
+        elif _is_boosted_tree(est):
+            import shap
+            self.kind = "tree"
+            # trees split on exact values: use the fitted transforms, not the folded affine (1-ulp ties flip splits)
+            data = _transform(pre, background[0]) if background is not None else None
+            self.tree = shap.TreeExplainer(est, data=data, model_output="raw",
+                                           feature_perturbation="interventional" if data is not None else "tree_path_dependent")
+            self.expected = float(np.atleast_1d(self.tree.expected_value)[-1])
+        else:
+            raise TypeError(f"no exact explainer for {type(est).__name__}")
+
+    def _z(self, X: np.ndarray) -> np.ndarray:
+        return X * self.scale + self.offset
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        if self.kind == "linear":
+            return (self._z(X) - self.z_ref) * self.w
+        vals = self.tree.shap_values(_transform(self.pre, X), check_additivity=False)
+        if isinstance(vals, list):
+            vals = vals[-1]
+        vals = np.asarray(vals)
+        return vals[..., -1] if vals.ndim == 3 else vals
+
+
+def _secant(l: np.ndarray, l0: float) -> np.ndarray:
+    """(sigmoid(l) - sigmoid(l0)) / (l - l0), with the derivative where l ~= l0."""
+    s, s0 = 1.0 / (1.0 + np.exp(-l)), 1.0 / (1.0 + np.exp(-l0))
+    d = l - l0
+    near = np.abs(d) < 1e-9
+    return np.where(near, s * (1.0 - s), (s - s0) / np.where(near, 1.0, d))
+
+
+def _reference(folds, background: Optional[Tuple[np.ndarray, np.ndarray]]) -> Optional[np.ndarray]:
+    """Weighted background mean; else the training mean kept by the first scaler; else None."""
+    if background is not None:
+        return np.average(background[0], axis=0, weights=background[1])
+    pre, _ = _split(folds[0][0]) if folds else ([], None)
+    mean = getattr(pre[0], "mean_", None) if pre else None
+    return None if mean is None else np.asarray(mean, dtype=np.float64)
+
+
+class ExplanationEngine:
+    def __init__(self, model, feature_names: List[str], background: Optional[Tuple[np.ndarray, np.ndarray]],
+                 nsamples: int = 200):
+        self.model = model
+        self.feature_names = feature_names
+        self.nsamples = nsamples
+        self._folds: List[Tuple[_MarginExplainer, float, float]] = []
+        folds = _folds(model)
+        try:
+            if folds is None:
+                raise TypeError("calibration is not sigmoid")
+            self._folds = [(_MarginExplainer(est, len(feature_names), background), a, b) for est, a, b in folds]
+            self.method = self._folds[0][0].kind
+        except TypeError:
+            if background is None:
+                raise ValueError(f"{BACKGROUND_FILE} is required to explain {type(model).__name__}; retrain the model")
+            import shap
+            self.method = "kernel"
+            self._kernel = shap.KernelExplainer(self._predict, background[0])
+        # each fold's log-odds at the background: L_i = -(a_i * margin_i + b_i)
+        self._l_ref = [-(a * m.expected + b) for m, a, b in self._folds]
+        # the typical applicant, in feature units (reason codes say above / below it)
+        self.reference = _reference(folds, background)
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        proba = self.model.predict_proba(pd.DataFrame(X, columns=self.feature_names))
+        return proba[:, 0] if proba.shape[1] == 1 else proba[:, 1]
+
+    def explain(self, X: pd.DataFrame) -> Attribution:
+        x = X[self.feature_names].to_numpy(dtype=np.float64)
+        if self.method == "kernel":
+            vals = self._kernel.shap_values(x, nsamples=self.nsamples, silent=True)
+            if isinstance(vals, list):
+                vals = vals[-1]
+            return Attribution(np.asarray(vals), float(np.atleast_1d(self._kernel.expected_value)[-1]), "kernel")
+
+        phi = np.zeros_like(x)
+        for (m, a, _), l_ref in zip(self._folds, self._l_ref):
+            fold = -a * m(x)
+            phi += fold * _secant(l_ref + fold.sum(axis=1), l_ref)[:, None]
+        phi /= len(self._folds)
+        base = float(np.mean([1.0 / (1.0 + np.exp(-l)) for l in self._l_ref]))
+        return Attribution(phi, base, self.method)
+
+
+_explainer_cache: Dict[str, ExplanationEngine] = {}
+_explainer_lock = threading.Lock()
+
+
+def get_engine(model_dir: str) -> ExplanationEngine:
+    """
+    Engine for the cached model bundle of model_dir; rebuilt when that bundle is
+    reloaded, dropped when the bundle leaves the model cache. Built under a lock,
+    so concurrent requests share one engine instead of each building their own.
+    """
+    model, _ = load_model_bundle(model_dir)
+    with _explainer_lock:
+        engine = _explainer_cache.get(model_dir)
+        if engine is None or engine.model is not model:
+            with open(os.path.join(model_dir, "feature_meta.json")) as f:
+                feature_names = json.load(f)["feature_names"]
+            engine = ExplanationEngine(model, feature_names, load_background(model_dir, feature_names),
+                                       nsamples=settings.SHAP_NSAMPLES)
+            _explainer_cache[model_dir] = engine
+            with _cache_lock:
+                live = set(_MODEL_CACHE)
+            for d in [d for d in _explainer_cache if d not in live]:
+                _explainer_cache.pop(d, None)
+    return engine
+
+
+def top_contributions(engine: ExplanationEngine, X: pd.DataFrame, attr: Attribution, top_k: int) -> List[List[FeatureContribution]]:
+    """The top_k contributions by magnitude for every row of X."""
+    x = X[engine.feature_names].to_numpy(dtype=np.float64)
+    k = min(top_k, x.shape[1])
+    order = np.argsort(-np.abs(attr.values), axis=1, kind="stable")[:, :k]
+    names = engine.feature_names
+    return [
+        [FeatureContribution(name=names[j], value=float(x[i, j]), shap_value=float(attr.values[i, j])) for j in row]
+        for i, row in enumerate(order.tolist())
+    ]
 
 
 def explain_single(
@@ -33,39 +290,16 @@ def explain_single(
     top_k: int = 5,
 ) -> List[FeatureContribution]:
     """
-    Compute SHAP values for a single applicant safely.
-    Works for binary/single-class models and avoids 'length-1 array' errors.
+    Top-k SHAP contributions (probability units) for a single applicant, sorted
+    by magnitude. background_data overrides the saved background for this call.
     """
-    model, feature_names = load_model(model_dir)
+    if background_data is not None:
+        model, _ = load_model_bundle(model_dir)
+        engine = get_engine(model_dir)
+        bg = background_data[engine.feature_names].to_numpy(dtype=np.float64)
+        engine = ExplanationEngine(model, engine.feature_names, (bg, np.full(len(bg), 1.0 / len(bg))),
+                                   nsamples=settings.SHAP_NSAMPLES)
+    else:
+        engine = get_engine(model_dir)
     x, _ = build_features(app_rec)
-    x = x[feature_names]
-
-    # Define a scalar prediction function returning the prob of class 1
-    def predict_fn(X):
-        # X may come as numpy array, wrap to DataFrame
-        if not isinstance(X, pd.DataFrame):
-            X = pd.DataFrame(X, columns=feature_names)
-        proba = model.predict_proba(X)
-        # handle 1- or 2-column outputs
-        if proba.shape[1] == 1:
-            return proba[:, 0]
-        return proba[:, 1]
-
-    cache_key = model_dir
-    if cache_key not in _explainer_cache:
-        bg = background_data or x.copy()
-        _explainer_cache[cache_key] = shap.KernelExplainer(predict_fn, bg)
-    explainer = _explainer_cache[cache_key]
-
-    shap_vals = explainer.shap_values(x)
-    # If list, pick first array
-    if isinstance(shap_vals, list):
-        shap_vals = shap_vals[0]
-
-    shap_row = shap_vals[0]
-    feats = [
-        FeatureContribution(name=n, value=float(v), shap_value=float(s))
-        for n, v, s in zip(feature_names, x.iloc[0].values, shap_row)
-    ]
-    feats.sort(key=lambda f: abs(f.shap_value), reverse=True)
-    return feats[:top_k]
+    return top_contributions(engine, x, engine.explain(x), top_k)[0]
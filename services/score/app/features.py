@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import List, Tuple
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
 
@@ -74,32 +75,94 @@ def build_features(app: ApplicationRecord) -> Tuple[pd.DataFrame, FeaturesMeta]:
     return df, meta
 
 
+# numeric ApplicationRecord fields -> (dtype, default); employment_status is the only text input
+_NUMERIC_FIELDS = {
+    "declared_monthly_income": (np.float64, 0.0),
+    "family_size": (np.int64, 1),
+    "avg_monthly_income": (np.float64, 0.0),
+    "avg_monthly_expenses": (np.float64, 0.0),
+    "credit_score": (np.float64, 600.0),
+    "total_debt": (np.float64, 0.0),
+    "asset_value": (np.float64, 0.0),
+    "liabilities_value": (np.float64, 0.0),
+}
+
+
+def _feature_frame(c: Dict[str, np.ndarray], employment: np.ndarray, index=None) -> pd.DataFrame:
+    """build_features over whole columns: c maps each numeric field to an array, employment is lower-cased."""
+    income_floor = np.maximum(c["avg_monthly_income"], 1.0)
+    return pd.DataFrame({
+        "declared_monthly_income": c["declared_monthly_income"],
+        "family_size": c["family_size"],
+        "employment_is_unemployed": (employment == "unemployed").astype(np.int64),
+        "employment_is_self_employed": (employment == "self-employed").astype(np.int64),
+
+        "avg_monthly_income": c["avg_monthly_income"],
+        "avg_monthly_expenses": c["avg_monthly_expenses"],
+        "credit_score": c["credit_score"],
+        "total_debt": c["total_debt"],
+        "asset_value": c["asset_value"],
+        "liabilities_value": c["liabilities_value"],
+
+        # Derived features
+        "net_worth": c["asset_value"] - c["liabilities_value"],
+        "debt_to_income_ratio": c["total_debt"] / income_floor,
+        "financial_stress_index": (c["liabilities_value"] + c["avg_monthly_expenses"]) / income_floor,
+        "income_per_capita": c["avg_monthly_income"] / np.maximum(c["family_size"], 1),
+    }, index=index)
+
+
+def build_features_batch(apps: Sequence[ApplicationRecord]) -> Tuple[pd.DataFrame, FeaturesMeta]:
+    """
+    Same features as build_features for many records at once: one row per record,
+    in input order, same columns and dtypes. Each feature is one array operation
+    over the batch instead of a DataFrame per record.
+    """
+    cols = {
+        name: np.fromiter((getattr(a, name) for a in apps), dtype=dtype, count=len(apps))
+        for name, (dtype, _) in _NUMERIC_FIELDS.items()
+    }
+    employment = np.array([a.employment_status.lower() for a in apps], dtype=object)
+    df = _feature_frame(cols, employment)
+    meta = FeaturesMeta(feature_names=list(df.columns))
+    return df, meta
+
+
 # -----------------------------
 # 3. Helper for training: multi-row build
 # -----------------------------
 
 def build_features_from_dataframe(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, FeaturesMeta]:
     """
-    Vectorized helper for training: take a df with columns matching ApplicationRecord fields
-    + 'eligible' label, and return X, meta.
+    Columnar helper for training: take a df with columns matching ApplicationRecord fields
+    (+ 'eligible' label, ignored) and return X, meta. Row i of X equals
+    build_features(ApplicationRecord(**row i)): missing columns take the record
+    defaults, numeric strings are parsed, unparseable values raise ValueError, and
+    so does None, as in the record (NaN in a float column is kept, like the record).
+    X keeps df_raw's index so it stays aligned with the label column.
     """
-    records = []
-    for _, row in df_raw.iterrows():
-        app = ApplicationRecord(
-            eid=str(row.get("eid", "")),
-            declared_monthly_income=float(row.get("declared_monthly_income", 0.0)),
-            family_size=int(row.get("family_size", 1)),
-            employment_status=str(row.get("employment_status", "Unknown")),
-            avg_monthly_income=float(row.get("avg_monthly_income", 0.0)),
-            avg_monthly_expenses=float(row.get("avg_monthly_expenses", 0.0)),
-            credit_score=float(row.get("credit_score", 600.0)),
-            total_debt=float(row.get("total_debt", 0.0)),
-            asset_value=float(row.get("asset_value", 0.0)),
-            liabilities_value=float(row.get("liabilities_value", 0.0)),
-        )
-        features_row, _ = build_features(app)
-        records.append(features_row.iloc[0])
-
-    X = pd.DataFrame(records)
+    n = len(df_raw)
+    cols = {}
+    for name, (dtype, default) in _NUMERIC_FIELDS.items():
+        if name not in df_raw:
+            cols[name] = np.full(n, default, dtype=dtype)
+            continue
+        column = df_raw[name]
+        # to_numeric would turn None into NaN; ApplicationRecord rejects it
+        if column.dtype == object and any(v is None for v in column.to_numpy()):
+            raise ValueError(f"{name}: None is not a valid number")
+        values = pd.to_numeric(column, errors="raise").to_numpy(dtype=np.float64, na_value=np.nan)
+        if dtype is np.int64:
+            if np.isnan(values).any():
+                raise ValueError(f"{name}: missing values cannot be converted to int")
+            values = np.trunc(values)
+        cols[name] = values.astype(dtype)
+
+    if "employment_status" in df_raw:
+        employment = df_raw["employment_status"].astype("string").str.lower().to_numpy(dtype=object, na_value="nan")
+    else:
+        employment = np.full(n, "unknown", dtype=object)
+
+    X = _feature_frame(cols, employment, index=df_raw.index)
     meta = FeaturesMeta(feature_names=list(X.columns))
     return X, meta
@@ -0,0 +1,299 @@
+# services/score/app/jobs.py
+"""
+Asynchronous training jobs.
+
+POST /train queues a job and returns its id. Jobs run in a separate process
+(python -m app.train_worker), so training never holds the GIL or the BLAS
+threads of the serving process. That process is pinned to settings.TRAIN_CPUS,
+niced by settings.TRAIN_NICE, and capped to settings.TRAIN_BLAS_THREADS threads
+per pool. At most settings.TRAIN_MAX_CONCURRENT jobs run at once.
+
+Job state lives on disk (<jobs dir>/<id>/job.json, train.log), so any worker
+can report status, logs or cancel a job. Only the worker that accepted the job
+runs it. A successful job's bundle is committed to the registry as a new
+version and, with activate, published (registry.py).
+"""
+from __future__ import annotations
+import datetime, json, logging, os, queue, shutil, signal, socket, subprocess, sys, tempfile, threading, time, uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO, Dict, List, Optional
+from .config import settings
+from .registry import registry
+
+logger = logging.getLogger("score.jobs")
+
+JOB_FILE, LOG_FILE, DATA_FILE, RESULT_FILE = "job.json", "train.log", "data.csv", "result.json"
+CANCEL_FILE = "cancel"  # marker, separate from job.json so the runner's writes never drop it
+ACTIVE = ("queued", "running")
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_KILL_GRACE_S = 5.0
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def _start_ticks(pid: int) -> str:
+    """Process start time (clock ticks since boot, /proc/<pid>/stat field 22); "" when unknown."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return ""
+
+
+def _owner() -> str:
+    """
+    Identity of this worker process: host, pid and pid start time. A container that
+    restarts comes back with the same pid (often 1) but a new start time.
+    """
+    pid = os.getpid()
+    return f"{socket.gethostname()}:{pid}:{_start_ticks(pid)}"
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _owner_alive(owner: str, pid: Optional[int]) -> bool:
+    if not owner:
+        return _alive(pid)  # job written before owners were recorded
+    host, owner_pid, started = owner.rsplit(":", 2)
+    if host != socket.gethostname():
+        return True  # another host's worker: its processes cannot be checked from here
+    return _alive(int(owner_pid)) and _start_ticks(int(owner_pid)) == started
+
+
+@dataclass
+class TrainingJob:
+    id: str
+    version: str
+    staging_dir: str
+    activate: bool = True
+    status: str = "queued"          # queued | running | succeeded | failed | cancelled | lost
+    progress: float = 0.0
+    message: str = ""
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    pid: Optional[int] = None       # training process (also its process group)
+    owner_pid: int = field(default_factory=os.getpid)
+    owner: str = ""                 # _owner() of the accepting worker, survives pid reuse
+    cancel_requested: bool = False
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class TrainingJobs:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._procs: Dict[str, subprocess.Popen] = {}
+
+    @property
+    def root(self) -> str:
+        return settings.TRAIN_JOBS_DIR or os.path.join(settings.MODELS_ROOT, ".jobs")
+
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, os.path.basename(job_id))
+
+    # ---- state on disk
+    def _save(self, job: TrainingJob) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=".job-", dir=self._dir(job.id))
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp, os.path.join(self._dir(job.id), JOB_FILE))
+
+    def _load(self, job_id: str) -> Optional[TrainingJob]:
+        try:
+            with open(os.path.join(self._dir(job_id), JOB_FILE)) as f:
+                job = TrainingJob(**json.load(f))
+        except FileNotFoundError:
+            return None
+        job.cancel_requested = self._cancelled(job_id)
+        return job
+
+    def _cancelled(self, job_id: str) -> bool:
+        return os.path.exists(os.path.join(self._dir(job_id), CANCEL_FILE))
+
+    def _update(self, job_id: str, **changes) -> TrainingJob:
+        with self._lock:
+            job = self._load(job_id)
+            for k, v in changes.items():
+                setattr(job, k, v)
+            self._save(job)
+            return job
+
+    def _tail(self, job_id: str, max_bytes: int = 64 * 1024) -> str:
+        try:
+            with open(os.path.join(self._dir(job_id), LOG_FILE), "rb") as f:
+                f.seek(max(0, os.fstat(f.fileno()).st_size - max_bytes))
+                return f.read().decode("utf-8", "replace")
+        except FileNotFoundError:
+            return ""
+
+    # ---- API
+    def submit(self, data: BinaryIO, version: Optional[str] = None, activate: bool = True) -> TrainingJob:
+        """Queue a training job on the uploaded CSV; the version is reserved (staged) now."""
+        version, staging = registry.stage(version)
+        job = TrainingJob(id=uuid.uuid4().hex[:12], version=version, staging_dir=staging, activate=activate,
+                          owner=_owner())
+        os.makedirs(self._dir(job.id))
+        with open(os.path.join(self._dir(job.id), DATA_FILE), "wb") as f:
+            shutil.copyfileobj(data, f)
+        self._save(job)
+        self._prune()
+        self._queue.put(job.id)
+        self._ensure_runners()
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        job = self._load(job_id)
+        if job is None:
+            return None
+        if job.status in ACTIVE and not _owner_alive(job.owner, job.owner_pid):
+            # recorded once, and the version it reserved is freed for a new job
+            job = self._update(job_id, status="lost", error="the worker that ran this job exited",
+                               finished_at=_now())
+            registry.discard(job.staging_dir)
+        if job.status == "running":
+            for line in reversed(self._tail(job_id, 8 * 1024).splitlines()):
+                if line.startswith("PROGRESS "):
+                    _, fraction, *message = line.split(" ", 2)
+                    job.progress, job.message = float(fraction), (message or [""])[0]
+                    break
+        return job
+
+    def list(self) -> List[TrainingJob]:
+        ids = os.listdir(self.root) if os.path.isdir(self.root) else []
+        jobs = [j for j in (self.get(i) for i in ids) if j is not None]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def logs(self, job_id: str) -> Optional[str]:
+        return self._tail(job_id) if self._load(job_id) else None
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """Request cancellation; a running job's process group gets SIGTERM now, SIGKILL after a grace period."""
+        job = self._load(job_id)
+        if job is None or job.status not in ACTIVE:
+            return job
+        open(os.path.join(self._dir(job_id), CANCEL_FILE), "w").close()
+        job = self._load(job_id)
+        if job.status == "queued":
+            # the runner skips it when its turn comes (and frees the staged version)
+            job = self._update(job_id, status="cancelled", finished_at=_now())
+        elif job.pid:
+            try:
+                os.killpg(job.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        return job
+
+    def stop(self) -> None:
+        """Kill the training processes this worker started (service shutdown)."""
+        for proc in list(self._procs.values()):
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    # ---- runner
+    def _ensure_runners(self) -> None:
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < max(1, settings.TRAIN_MAX_CONCURRENT):
+                t = threading.Thread(target=self._loop, name=f"train-runner-{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _loop(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.exception("training job %s crashed", job_id)
+                self._update(job_id, status="failed", error=str(e), finished_at=_now())
+
+    def _command(self, job: TrainingJob) -> List[str]:
+        return [
+            sys.executable, "-m", "app.train_worker",
+            os.path.join(self._dir(job.id), DATA_FILE), job.staging_dir,
+            "--result", os.path.join(self._dir(job.id), RESULT_FILE),
+            "--cv-jobs", str(settings.TRAIN_CV_JOBS),
+            "--blas-threads", str(settings.TRAIN_BLAS_THREADS),
+            "--cpus", settings.TRAIN_CPUS,
+            "--nice", str(settings.TRAIN_NICE),
+        ]
+
+    def _run(self, job_id: str) -> None:
+        job = self._load(job_id)
+        if job.cancel_requested:
+            registry.discard(job.staging_dir)
+            self._update(job_id, status="cancelled", finished_at=_now())
+            return
+
+        threads = str(max(1, settings.TRAIN_BLAS_THREADS))
+        env = {**os.environ, "OMP_NUM_THREADS": threads, "OPENBLAS_NUM_THREADS": threads,
+               "MKL_NUM_THREADS": threads, "PYTHONUNBUFFERED": "1"}
+        with open(os.path.join(self._dir(job_id), LOG_FILE), "ab") as log:
+            proc = subprocess.Popen(self._command(job), cwd=_SERVICE_ROOT, env=env, stdout=log,
+                                    stderr=subprocess.STDOUT, start_new_session=True)
+        self._procs[job_id] = proc
+        job = self._update(job_id, status="running", pid=proc.pid, started_at=_now())
+
+        deadline = time.monotonic() + settings.TRAIN_TIMEOUT_S
+        killed_at, timed_out = None, False
+        while True:
+            try:
+                proc.wait(timeout=1.0)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            # cancellation may come from another worker: it only flips the flag on disk
+            cancel = self._cancelled(job_id)
+            timed_out = timed_out or time.monotonic() > deadline
+            if (cancel or timed_out) and killed_at is None:
+                killed_at = time.monotonic()
+                os.killpg(proc.pid, signal.SIGTERM)
+            elif killed_at is not None and time.monotonic() - killed_at > _KILL_GRACE_S:
+                os.killpg(proc.pid, signal.SIGKILL)
+        self._procs.pop(job_id, None)
+
+        job = self._load(job_id)
+        os.remove(os.path.join(self._dir(job_id), DATA_FILE))
+        if job.cancel_requested or timed_out or proc.returncode != 0:
+            registry.discard(job.staging_dir)
+            if job.cancel_requested:
+                self._update(job_id, status="cancelled", finished_at=_now())
+            else:
+                error = f"timed out after {settings.TRAIN_TIMEOUT_S:.0f}s" if timed_out else \
+                    (self._tail(job_id, 2048).strip().splitlines() or [f"exit code {proc.returncode}"])[-1]
+                self._update(job_id, status="failed", error=error, finished_at=_now())
+            return
+
+        with open(os.path.join(self._dir(job_id), RESULT_FILE)) as f:
+            result = json.load(f)
+        result["model_dir"] = registry.commit(job.version, job.staging_dir)
+        result["version"] = job.version
+        if job.activate:
+            registry.publish(job.version)
+        self._update(job_id, status="succeeded", progress=1.0, message="done", result=result, finished_at=_now())
+
+    def _prune(self) -> None:
+        """Keep the newest settings.TRAIN_JOBS_KEEP finished jobs on disk."""
+        finished = [j for j in self.list() if j.status not in ACTIVE]
+        for job in finished[settings.TRAIN_JOBS_KEEP:]:
+            shutil.rmtree(self._dir(job.id), ignore_errors=True)
+
+
+jobs = TrainingJobs()
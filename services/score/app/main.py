@@ -1,33 +1,103 @@
 # services/score/app/main.py
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-import os, shutil, tempfile, datetime
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from typing import List
+from dataclasses import asdict
+import json, logging, os
 
 from .config import settings
 from .features import ApplicationRecord
-from .score_core import score_application, load_model_bundle
+from .score_core import score_application, score_applications, load_model_bundle
 from .explain import explain_single
-from .train import train_model
+from .jobs import jobs
+from .registry import RegistryError, registry
+
+logger = logging.getLogger("score.main")
 
 
 app = FastAPI(title=settings.APP_NAME)
 
+@app.on_event("startup")
+def _startup():
+    # serve + follow the registry's CURRENT pointer (load failures surface on first request)
+    try:
+        registry.current_dir()
+    except Exception as e:
+        logger.warning("no model loaded at startup: %s", e)
+    registry.start()
+
+@app.on_event("shutdown")
+def _shutdown():
+    registry.stop()
+    jobs.stop()
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
 
 
+_TOP_K = Query(0, ge=0, le=20, description="also return the top-k contributions as reason codes")
+
+
 @app.post("/score")
-def score_endpoint(app_rec: ApplicationRecord):
+def score_endpoint(app_rec: ApplicationRecord, top_k: int = _TOP_K):
+    try:
+        return score_application(app_rec, registry.current_dir(), top_k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+_RECORD = TypeAdapter(ApplicationRecord)
+_RECORDS = TypeAdapter(List[ApplicationRecord])
+
+
+def _parse_ndjson(body: bytes) -> List[ApplicationRecord]:
+    recs = []
+    for lineno, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            recs.append(_RECORD.validate_json(line))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail={"line": lineno, "errors": e.errors(include_url=False, include_input=False)})
+    return recs
+
+
+@app.post("/score/batch")
+async def score_batch_endpoint(request: Request, top_k: int = _TOP_K):
+    """
+    Score many applications in one call: a JSON array of ApplicationRecord, or
+    NDJSON (Content-Type: application/x-ndjson, one record per line). Returns one
+    /score result per record, in input order, in the same encoding as the request.
+    ?top_k=N adds N reason codes to every result.
+    """
+    body = await request.body()
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    if ndjson:
+        recs = _parse_ndjson(body)
+    else:
+        try:
+            recs = _RECORDS.validate_json(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_input=False))
+
     try:
-        return score_application(app_rec, settings.MODEL_DIR)
+        results = await run_in_threadpool(score_applications, recs, registry.current_dir(), top_k)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if ndjson:
+        return Response(content="".join(json.dumps(r) + "\n" for r in results),
+                        media_type="application/x-ndjson")
+    return results
+
 
 @app.post("/explain")
 def explain_endpoint(app_rec: ApplicationRecord):
     try:
-        feats = explain_single(app_rec, settings.MODEL_DIR)
+        feats = explain_single(app_rec, registry.current_dir())
         return {"eid": app_rec.eid, "top_features": [f.__dict__ for f in feats]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -35,29 +105,73 @@ def explain_endpoint(app_rec: ApplicationRecord):
 
 @app.get("/thresholds")
 def thresholds_endpoint():
-    _, thr = load_model_bundle(settings.MODEL_DIR)
+    _, thr = load_model_bundle(registry.current_dir())
     return {"approve": thr.approve, "review": thr.review}
 
 
-@app.post("/train")
+@app.post("/train", status_code=202)
 def train_endpoint(
     file: UploadFile = File(...),
-    version: str = Form(default=None)
+    version: str = Form(default=None),
+    activate: bool = Form(default=True),
 ):
-    """Train a new model from uploaded CSV and version it."""
+    """
+    Queue training on the uploaded CSV (returns at once with a job id). The job
+    runs in its own capped process and writes a new immutable registry
+    version; with activate (default) it becomes current for every worker once warmed.
+    """
+    try:
+        job = jobs.submit(file.file, version, activate)
+    except RegistryError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"job_id": job.id, "status": job.status, "version": job.version}
+
+
+@app.get("/train/jobs")
+def train_jobs_endpoint():
+    return [asdict(j) for j in jobs.list()]
+
+
+@app.get("/train/jobs/{job_id}")
+def train_job_endpoint(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return asdict(job)
+
+
+@app.get("/train/jobs/{job_id}/logs", response_class=PlainTextResponse)
+def train_job_logs_endpoint(job_id: str):
+    text = jobs.logs(job_id)
+    if text is None:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return text
+
+
+@app.post("/train/jobs/{job_id}/cancel")
+def train_job_cancel_endpoint(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return asdict(job)
+
+
+@app.get("/models")
+def models_endpoint():
+    """Registry versions and the one being served by this worker."""
+    try:
+        current = registry.current_version()
+    except Exception:
+        current = None
+    return {"current": current, "versions": registry.versions()}
+
+
+@app.post("/models/{version}/activate")
+def activate_endpoint(version: str):
+    """Make an existing version current (rollout / rollback); warmed before the pointer moves."""
     try:
-        # Save temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-
-        ver = version or datetime.datetime.now().strftime("eligibility_v%Y%m%d_%H%M")
-        out_dir = f"/app/models/{ver}"
-        os.makedirs(out_dir, exist_ok=True)
-
-        result = train_model(tmp_path, out_dir)
-        # update latest pointer (you can store symlink or config update)
-        settings.MODEL_DIR = out_dir
-        return {"status": "trained", "model": result}
+        return {"current": os.path.basename(registry.publish(version))}
+    except RegistryError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
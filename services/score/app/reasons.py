@@ -0,0 +1,86 @@
+# services/score/app/reasons.py
+"""
+Human-readable reason codes for the top SHAP contributions of a decision.
+
+A reason depends only on the feature, whether the applicant is above or below
+the typical applicant (the explanation background) and which way it pushed the
+score. That is a small fixed set per feature, so each one is built once
+(lru_cache) and reused; per row only the value and contribution are attached.
+
+    {"code": "OBSERVED_INCOME_LOW", "feature": "avg_monthly_income", "value": 2200.0,
+     "contribution": 0.041, "text": "Observed monthly income below typical applicant; supports eligibility"}
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .explain import Attribution, ExplanationEngine
+
+# feature -> (code stem, label); binary flags name the condition that holds when the flag is 1
+_FEATURES: Dict[str, Tuple[str, str]] = {
+    "declared_monthly_income": ("DECLARED_INCOME", "Declared monthly income"),
+    "family_size": ("FAMILY_SIZE", "Household size"),
+    "avg_monthly_income": ("OBSERVED_INCOME", "Observed monthly income"),
+    "avg_monthly_expenses": ("EXPENSES", "Monthly expenses"),
+    "credit_score": ("CREDIT_SCORE", "Credit score"),
+    "total_debt": ("DEBT", "Total debt"),
+    "asset_value": ("ASSETS", "Asset value"),
+    "liabilities_value": ("LIABILITIES", "Liabilities"),
+    "net_worth": ("NET_WORTH", "Net worth"),
+    "debt_to_income_ratio": ("DEBT_TO_INCOME", "Debt-to-income ratio"),
+    "financial_stress_index": ("FINANCIAL_STRESS", "Financial stress index"),
+    "income_per_capita": ("INCOME_PER_CAPITA", "Income per household member"),
+}
+_FLAGS: Dict[str, Tuple[str, str]] = {
+    "employment_is_unemployed": ("UNEMPLOYED", "Applicant is unemployed"),
+    "employment_is_self_employed": ("SELF_EMPLOYED", "Applicant is self-employed"),
+}
+
+
+@lru_cache(maxsize=None)
+def reason(feature: str, level: Optional[str], supports: bool) -> Tuple[str, str]:
+    """
+    (code, text) for one feature. level is "HIGH" / "LOW" against the typical
+    applicant (None when there is no reference); supports = pushed toward approval.
+    """
+    effect = "supports eligibility" if supports else "weighs against eligibility"
+    if feature in _FLAGS:
+        stem, condition = _FLAGS[feature]
+        if level == "LOW":
+            return f"NOT_{stem}", f"{condition.replace(' is ', ' is not ', 1)}; {effect}"
+        return stem, f"{condition}; {effect}"
+    stem, label = _FEATURES.get(feature, (feature.upper(), feature.replace("_", " ").capitalize()))
+    if level is None:
+        return stem, f"{label}; {effect}"
+    return f"{stem}_{level}", f"{label} {'above' if level == 'HIGH' else 'below'} typical applicant; {effect}"
+
+
+def top_reasons(engine: ExplanationEngine, X: pd.DataFrame, attr: Attribution, top_k: int) -> List[List[Dict[str, Any]]]:
+    """The top_k contributions by magnitude for every row of X, as reason-code dicts."""
+    x = X[engine.feature_names].to_numpy(dtype=np.float64)
+    k = min(top_k, x.shape[1])
+    if k <= 0:
+        return [[] for _ in range(len(x))]
+    rows = np.arange(len(x))[:, None]
+    order = np.argsort(-np.abs(attr.values), axis=1, kind="stable")[:, :k]
+    values, contrib = x[rows, order], attr.values[rows, order]
+    names = engine.feature_names
+    is_flag = np.array([n in _FLAGS for n in names])[order]
+    # levels: flags by their own value, other features against the reference ("" = no reference)
+    if engine.reference is not None:
+        high = values >= engine.reference[order]
+    else:
+        high = np.zeros_like(values, dtype=bool)
+    level = np.where(high, "HIGH", "LOW").astype(object)
+    if engine.reference is None:
+        level[~is_flag] = ""
+    level[is_flag] = np.where(values[is_flag] >= 0.5, "HIGH", "LOW")
+    out = []
+    for cols, vals, phis, levels in zip(order.tolist(), values.tolist(), contrib.tolist(), level.tolist()):
+        row = []
+        for j, v, phi, lv in zip(cols, vals, phis, levels):
+            code, text = reason(names[j], lv or None, phi > 0)
+            row.append({"code": code, "feature": names[j], "value": v, "contribution": phi, "text": text})
+        out.append(row)
+    return out
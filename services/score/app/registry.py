@@ -0,0 +1,204 @@
+# services/score/app/registry.py
+"""
+Versioned model registry shared by all workers through the filesystem.
+
+Layout under settings.MODELS_ROOT:
+    <version>/                      immutable bundle (model .pkl, metrics.json, feature_meta.json,
+                                    background.json, report.md); never rewritten once in place
+    .staging-<version>/             a bundle being written; renamed to <version>/ when complete.
+                                    Created with os.mkdir, so it also reserves the version:
+                                    a second stage() of the same version fails at once
+    CURRENT                         {"version": ..., "published_at": ...}, replaced atomically
+
+Publishing writes CURRENT through a temp file + os.replace, so a reader sees
+the old pointer or the new one, never a partial file, and the directory it
+names is complete because the rename came first. Each worker polls the pointer
+(settings.MODEL_POLL_S). On a change it loads and warms the new bundle
+(predict + explanation engine) off the request path, then switches one
+reference. In-flight requests finish on the bundle they started with; the model
+cache keeps settings.MODEL_CACHE_SIZE bundles. Until a version is published,
+settings.MODEL_DIR is served.
+"""
+from __future__ import annotations
+import datetime, json, logging, os, re, shutil, tempfile, threading
+from typing import Any, Dict, List, Optional, Tuple
+from .config import settings
+from .features import ApplicationRecord
+from .score_core import load_model_bundle, score_applications
+
+logger = logging.getLogger("score.registry")
+
+POINTER_FILE = "CURRENT"
+_STAGING_PREFIX = ".staging-"
+_VERSION = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$")
+
+
+class RegistryError(ValueError):
+    pass
+
+
+def warm(model_dir: str) -> None:
+    """Load the bundle and run one scoring pass through it (explanations best effort)."""
+    load_model_bundle(model_dir)
+    probe = [ApplicationRecord(eid="warmup")]
+    score_applications(probe, model_dir)
+    score_applications(probe, model_dir, top_k=3)  # builds the explainer; logs when it cannot
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[str] = None
+        self._pointer_stamp: Optional[Tuple[int, int, int]] = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def root(self) -> str:
+        return settings.MODELS_ROOT
+
+    def version_dir(self, version: str) -> str:
+        if not _VERSION.match(version or ""):
+            raise RegistryError(f"invalid model version {version!r}")
+        return os.path.join(self.root, version)
+
+    # ---- serving side
+    def current_dir(self) -> str:
+        """Model dir to serve now. The first call resolves the pointer synchronously."""
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._follow()
+        return self._current
+
+    def current_version(self) -> str:
+        return os.path.basename(os.path.normpath(self.current_dir()))
+
+    def _pointer(self) -> Tuple[Optional[Tuple[int, int, int]], Optional[str]]:
+        path = os.path.join(self.root, POINTER_FILE)
+        try:
+            with open(path) as f:
+                st = os.fstat(f.fileno())
+                return (st.st_mtime_ns, st.st_size, st.st_ino), json.load(f)["version"]
+        except FileNotFoundError:
+            return None, None
+
+    def _follow(self) -> bool:
+        """Switch to the bundle CURRENT names if it changed (caller holds the lock). True if switched."""
+        stamp, version = self._pointer()
+        if stamp is not None and stamp == self._pointer_stamp:
+            return False
+        target = self.version_dir(version) if version else settings.MODEL_DIR
+        switched = target != self._current
+        if switched:
+            warm(target)  # raises: keep serving the previous bundle, retry on the next poll
+            self._current = target
+        self._pointer_stamp = stamp
+        return switched
+
+    def refresh(self) -> bool:
+        with self._lock:
+            return self._follow()
+
+    # ---- publishing side
+    def staging_dir(self, version: str) -> str:
+        return os.path.join(self.root, f"{_STAGING_PREFIX}{os.path.basename(self.version_dir(version))}")
+
+    def stage(self, version: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Reserve a new version: (version, staging dir). Raises RegistryError when the
+        version exists or is already staged. Without a version one is made from
+        the time, with a -2, -3... suffix when that second is taken.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        if version:
+            return version, self._reserve(version)
+        base = datetime.datetime.now().strftime("eligibility_v%Y%m%d_%H%M%S")
+        for n in range(1, 100):
+            candidate = base if n == 1 else f"{base}-{n}"
+            try:
+                return candidate, self._reserve(candidate)
+            except RegistryError:
+                continue
+        raise RegistryError(f"no free model version for {base}")
+
+    def _reserve(self, version: str) -> str:
+        staging = self.staging_dir(version)
+        try:
+            os.mkdir(staging)  # atomic: exactly one caller gets the version
+        except FileExistsError:
+            raise RegistryError(f"model version {version} is already being trained") from None
+        if os.path.exists(self.version_dir(version)):
+            os.rmdir(staging)
+            raise RegistryError(f"model version {version} already exists")
+        return staging
+
+    def commit(self, version: str, staging_dir: str) -> str:
+        """Move a complete staging dir into place as <version>/ (atomic; fails if it exists)."""
+        final = self.version_dir(version)
+        if os.path.exists(final):
+            raise RegistryError(f"model version {version} already exists")
+        os.rename(staging_dir, final)
+        return final
+
+    @staticmethod
+    def discard(staging_dir: str) -> None:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def publish(self, version: str) -> str:
+        """Make <version> current for every worker. Warmed here first, so a broken bundle is never published."""
+        model_dir = self.version_dir(version)
+        if not os.path.exists(os.path.join(model_dir, "metrics.json")):
+            raise RegistryError(f"model version {version} not found")
+        warm(model_dir)
+        fd, tmp = tempfile.mkstemp(prefix=".pointer-", dir=self.root)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": version, "published_at": datetime.datetime.now().isoformat(timespec="seconds")}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, os.path.join(self.root, POINTER_FILE))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with self._lock:
+            self._follow()
+        return model_dir
+
+    def versions(self) -> List[Dict[str, Any]]:
+        current = self._current or ""
+        out = []
+        for name in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []:
+            path = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.exists(os.path.join(path, "metrics.json")):
+                continue
+            with open(os.path.join(path, "metrics.json")) as f:
+                roc_auc = json.load(f).get("roc_auc")
+            out.append({
+                "version": name,
+                "roc_auc": roc_auc,
+                "created_at": datetime.datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds"),
+                "current": os.path.normpath(path) == os.path.normpath(current),
+            })
+        return out
+
+    # ---- watcher
+    def _loop(self) -> None:
+        while not self._stop.wait(max(0.1, settings.MODEL_POLL_S)):
+            try:
+                if self.refresh():
+                    logger.info("now serving %s", self._current)
+            except Exception as e:
+                logger.warning("model switch failed, still serving %s: %s", self._current, e)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="model-registry", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+registry = ModelRegistry()
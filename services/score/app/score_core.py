@@ -1,17 +1,25 @@
 # services/score/app/score_core.py
 from __future__ import annotations
-import json, os, joblib
-import pandas as pd
-from typing import Literal, Dict, Tuple
+import json, logging, os, joblib, threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
 
-from .features import ApplicationRecord, build_features
+from .config import settings
+from .features import ApplicationRecord, build_features_batch
 from .thresholds import Metrics, pick_thresholds
 
-_MODEL_CACHE: Dict[str, Tuple[object, object]] = {}
+logger = logging.getLogger("score.core")
+
+# model_dir -> (model, thresholds), least recently used first; at most settings.MODEL_CACHE_SIZE
+_MODEL_CACHE: "OrderedDict[str, Tuple[object, object]]" = OrderedDict()
+_cache_lock = threading.Lock()
 
 def load_model_bundle(model_dir: str):
-    if model_dir in _MODEL_CACHE:
-        return _MODEL_CACHE[model_dir]
+    with _cache_lock:
+        if model_dir in _MODEL_CACHE:
+            _MODEL_CACHE.move_to_end(model_dir)
+            return _MODEL_CACHE[model_dir]
 
     metrics_path = os.path.join(model_dir, "metrics.json")
     with open(metrics_path) as f:
@@ -28,24 +36,53 @@ def load_model_bundle(model_dir: str):
         roc_auc=metrics_raw["roc_auc"],
     )
     thr = pick_thresholds(metrics)
-    _MODEL_CACHE[model_dir] = (model, thr)
+    with _cache_lock:
+        _MODEL_CACHE[model_dir] = (model, thr)
+        while len(_MODEL_CACHE) > max(1, settings.MODEL_CACHE_SIZE):
+            _MODEL_CACHE.popitem(last=False)
     return model, thr
 
 
-def score_application(app: ApplicationRecord, model_dir: str):
+def score_application(app: ApplicationRecord, model_dir: str, top_k: int = 0):
+    return score_applications([app], model_dir, top_k)[0]
+
+
+def score_applications(apps: Sequence[ApplicationRecord], model_dir: str, top_k: int = 0) -> List[Dict[str, Any]]:
+    """
+    Score many records: one feature frame and one predict_proba call for the
+    whole batch. Results are in input order. With top_k > 0 each result also
+    carries "reasons", the top_k SHAP contributions as reason codes (see
+    reasons.py). They are computed on the same feature frame in one vectorized
+    pass, best effort: when the explanation engine fails (e.g. a bundle without
+    feature_meta.json or background.json) the error is logged and the results
+    come without "reasons", so scoring never depends on SHAP.
+    """
+    if not apps:
+        return []
     model, thr = load_model_bundle(model_dir)
-    X, _ = build_features(app)
-    p = float(model.predict_proba(X)[0, 1])
-    if p >= thr.approve:
-        decision: Literal["APPROVE", "REVIEW", "SOFT_DECLINE"] = "APPROVE"
-    elif p >= thr.review:
-        decision = "REVIEW"
-    else:
-        decision = "SOFT_DECLINE"
-    return {
-        "eid": app.eid,
-        "probability": p,
-        "decision": decision,
-        "approve_threshold": thr.approve,
-        "review_threshold": thr.review,
-    }
+    X, _ = build_features_batch(apps)
+    p = model.predict_proba(X)[:, 1]
+    decisions = np.where(p >= thr.approve, "APPROVE", np.where(p >= thr.review, "REVIEW", "SOFT_DECLINE"))
+    results = [
+        {
+            "eid": app.eid,
+            "probability": prob,
+            "decision": decision,
+            "approve_threshold": thr.approve,
+            "review_threshold": thr.review,
+        }
+        for app, prob, decision in zip(apps, p.tolist(), decisions.tolist())
+    ]
+    if top_k > 0:
+        from .explain import get_engine  # explain imports this module
+        from .reasons import top_reasons
+
+        try:
+            engine = get_engine(model_dir)
+            reasons = top_reasons(engine, X, engine.explain(X), top_k)
+        except Exception as e:
+            logger.warning("%s: explanations unavailable, scoring without reasons: %s", model_dir, e)
+            return results
+        for res, r in zip(results, reasons):
+            res["reasons"] = r
+    return results
@@ -2,21 +2,38 @@
 from __future__ import annotations
 import os, json, hashlib, joblib
 import pandas as pd
+from typing import Callable, Optional
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import roc_auc_score, precision_recall_curve, classification_report
+from .config import settings
 from .features import build_features_from_dataframe, FeaturesMeta
+from .explain import BACKGROUND_FILE, build_background
 
 
-def train_model(data_path: str, out_dir: str, label_col: str = "eligible"):
+def train_model(
+    data_path: str,
+    out_dir: str,
+    label_col: str = "eligible",
+    cv_jobs: int = 1,
+    progress: Optional[Callable[[float, str], None]] = None,
+):
+    """
+    Train + calibrate + write the bundle into out_dir. cv_jobs > 1 fits the
+    calibration folds in parallel processes; progress(fraction, message) is
+    called between stages.
+    """
+    report_progress = progress or (lambda fraction, message: None)
     os.makedirs(out_dir, exist_ok=True)
+    report_progress(0.0, "reading data")
     df = pd.read_csv(data_path)
     y = df[label_col].astype(int)
     X_raw = df.drop(columns=[label_col])
 
+    report_progress(0.1, f"building features for {len(df)} rows")
     X, meta = build_features_from_dataframe(X_raw)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y)
 
@@ -24,16 +41,19 @@ def train_model(data_path: str, out_dir: str, label_col: str = "eligible"):
         ("scaler", StandardScaler()),
         ("model", LogisticRegression(max_iter=1000))
     ])
-    pipe.fit(X_train, y_train)
 
-    cal = CalibratedClassifierCV(pipe, cv=5, method="sigmoid")
+    # CalibratedClassifierCV fits its own clone of pipe per fold
+    report_progress(0.2, f"fitting 5 calibration folds ({cv_jobs} in parallel)")
+    cal = CalibratedClassifierCV(pipe, cv=5, method="sigmoid", n_jobs=cv_jobs)
     cal.fit(X_train, y_train)
+    report_progress(0.8, "evaluating")
 
     y_proba = cal.predict_proba(X_test)[:, 1]
     roc_auc = roc_auc_score(y_test, y_proba)
     precision, recall, thresholds = precision_recall_curve(y_test, y_proba)
     report = classification_report(y_test, (y_proba >= 0.5).astype(int), output_dict=True)
 
+    report_progress(0.9, "writing bundle")
     feature_hash = hashlib.md5(",".join(meta.feature_names).encode()).hexdigest()[:8]
     model_file = f"eligibility_model_{feature_hash}.pkl"
     model_path = os.path.join(out_dir, model_file)
@@ -42,6 +62,10 @@ def train_model(data_path: str, out_dir: str, label_col: str = "eligible"):
     with open(os.path.join(out_dir, "feature_meta.json"), "w") as f:
         f.write(meta.model_dump_json(indent=2))
 
+    # representative background for SHAP (explain.py): k-means summary of the training rows
+    with open(os.path.join(out_dir, BACKGROUND_FILE), "w") as f:
+        json.dump(build_background(X_train, settings.SHAP_BACKGROUND_K), f)
+
     metrics = {
         "roc_auc": float(roc_auc),
         "precision": precision.tolist(),
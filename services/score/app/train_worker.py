@@ -0,0 +1,58 @@
+"""
+Training job worker: one process per job, started by jobs.py.
+
+    python -m app.train_worker <data.csv> <out_dir> --result result.json \
+        [--cv-jobs N] [--blas-threads N] [--cpus 2,3] [--nice 10]
+
+Runs train_model with the resource caps applied to itself before any heavy
+work: CPU affinity, a lower scheduling priority, and BLAS/OpenMP thread pools
+capped (the parent also sets OMP/OPENBLAS/MKL_NUM_THREADS so the caps hold
+from interpreter start and are inherited by the parallel CV fold processes).
+Progress goes to stdout as "PROGRESS <fraction> <message>" lines.
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def parse_cpus(spec: str) -> set:
+    """'2,3' / '0-3' / '0-1,6' -> {cpu ids}."""
+    cpus = set()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("data")
+    ap.add_argument("out_dir")
+    ap.add_argument("--result", required=True)
+    ap.add_argument("--cv-jobs", type=int, default=1)
+    ap.add_argument("--blas-threads", type=int, default=1)
+    ap.add_argument("--cpus", default="")
+    ap.add_argument("--nice", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, parse_cpus(args.cpus))
+    if args.nice:
+        os.nice(args.nice)
+
+    from threadpoolctl import threadpool_limits
+    from .train import train_model
+
+    def progress(fraction: float, message: str) -> None:
+        print(f"PROGRESS {fraction:.2f} {message}", flush=True)
+
+    with threadpool_limits(limits=max(1, args.blas_threads)):
+        result = train_model(args.data, args.out_dir, cv_jobs=max(1, args.cv_jobs), progress=progress)
+    with open(args.result, "w") as f:
+        json.dump(result, f)
+    progress(1.0, "done")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+import json
+import os
+
+import joblib
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.bench_features import synthetic_frame
+from app.features import build_features_from_dataframe
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A small logistic-regression bundle: model .pkl, metrics.json and feature_meta.json."""
+    df = synthetic_frame(300)
+    X, meta = build_features_from_dataframe(df)
+    model = Pipeline([("scale", StandardScaler()), ("clf", LogisticRegression(max_iter=500))])
+    model.fit(X, df["eligible"])
+    joblib.dump(model, tmp_path / "model.pkl")
+    with open(tmp_path / "metrics.json", "w") as f:
+        json.dump({"model_file": "model.pkl", "precision": [0.5, 1.0], "recall": [1.0, 0.0],
+                   "thresholds": [0.5], "roc_auc": 0.5}, f)
+    with open(tmp_path / "feature_meta.json", "w") as f:
+        json.dump(meta.model_dump(), f)
+    return str(tmp_path)
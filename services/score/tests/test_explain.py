@@ -0,0 +1,24 @@
+# Run from services/score: python -m pytest tests
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import explain
+from app.explain import get_engine
+from app.score_core import load_model_bundle
+
+
+def test_concurrent_requests_share_one_engine(model_dir, monkeypatch):
+    built = []
+    engine_cls = explain.ExplanationEngine
+
+    def counting(*args, **kwargs):
+        built.append(1)
+        time.sleep(0.05)  # a slow build widens the race
+        return engine_cls(*args, **kwargs)
+
+    monkeypatch.setattr(explain, "ExplanationEngine", counting)
+    load_model_bundle(model_dir)
+    with ThreadPoolExecutor(8) as pool:
+        engines = list(pool.map(lambda _: get_engine(model_dir), range(32)))
+    assert len(built) == 1
+    assert all(e is engines[0] for e in engines)
@@ -0,0 +1,49 @@
+# Run from services/score: python -m pytest tests
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from app.bench_features import check_parity, synthetic_frame
+from app.features import ApplicationRecord, build_features, build_features_from_dataframe
+
+
+def test_parity_on_synthetic_frame():
+    check_parity(synthetic_frame(500))
+
+
+def test_missing_columns_take_record_defaults():
+    check_parity(pd.DataFrame({"eid": ["a", "b"], "avg_monthly_income": [1000.0, 0.0]}))
+
+
+def test_numeric_strings_are_parsed():
+    df = pd.DataFrame({"eid": ["a", "b"], "family_size": ["3", "1"], "credit_score": ["700", "612.5"],
+                       "employment_status": ["Unemployed", "self-employed"]})
+    check_parity(df)
+
+
+def test_keeps_index_for_label_alignment():
+    df = synthetic_frame(5).set_index(pd.Index([10, 11, 12, 13, 14]))
+    X, _ = build_features_from_dataframe(df)
+    assert X.index.tolist() == [10, 11, 12, 13, 14]
+
+
+def test_nan_family_size_raises():
+    df = pd.DataFrame({"eid": ["a", "b"], "family_size": [2, np.nan]})
+    with pytest.raises(ValueError):
+        build_features_from_dataframe(df)
+    with pytest.raises(ValidationError):
+        ApplicationRecord(eid="b", family_size=np.nan)
+
+
+def test_none_raises_like_the_record():
+    df = pd.DataFrame({"eid": ["a", "b"], "total_debt": [100.0, None]}, dtype=object)
+    with pytest.raises(ValueError):
+        build_features_from_dataframe(df)
+    with pytest.raises(ValidationError):
+        build_features(ApplicationRecord(eid="b", total_debt=None))
+
+
+def test_unparseable_value_raises():
+    with pytest.raises(ValueError):
+        build_features_from_dataframe(pd.DataFrame({"eid": ["a"], "asset_value": ["lots"]}))
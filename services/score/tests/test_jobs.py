@@ -0,0 +1,36 @@
+# Run from services/score: python -m pytest tests
+import os
+
+import pytest
+
+from app.config import settings
+from app.jobs import TrainingJob, _owner, jobs
+from app.registry import registry
+
+
+@pytest.fixture(autouse=True)
+def models_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODELS_ROOT", str(tmp_path))
+    monkeypatch.setattr(settings, "TRAIN_JOBS_DIR", "")
+
+
+def _queued(job_id: str, owner: str) -> TrainingJob:
+    version, staging = registry.stage("v1")
+    job = TrainingJob(id=job_id, version=version, staging_dir=staging, owner=owner)
+    os.makedirs(jobs._dir(job_id))
+    jobs._save(job)
+    return job
+
+
+def test_job_of_a_live_worker_is_not_lost():
+    _queued("j1", _owner())
+    assert jobs.get("j1").status == "queued"
+
+
+def test_job_from_before_a_restart_with_the_same_pid_is_lost():
+    host, pid, started = _owner().rsplit(":", 2)
+    job = _queued("j1", f"{host}:{pid}:{int(started or 0) - 1}")
+    assert jobs.get("j1").status == "lost"
+    assert jobs._load("j1").status == "lost"
+    assert not os.path.exists(job.staging_dir)
+    registry.stage("v1")  # the version is free again
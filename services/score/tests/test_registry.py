@@ -0,0 +1,41 @@
+# Run from services/score: python -m pytest tests
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.registry import RegistryError, registry
+
+
+@pytest.fixture(autouse=True)
+def models_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODELS_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def test_stage_reserves_the_version():
+    version, staging = registry.stage("v1")
+    assert version == "v1" and os.path.isdir(staging)
+    with pytest.raises(RegistryError):
+        registry.stage("v1")
+    registry.discard(staging)
+    assert registry.stage("v1")[1] == staging
+
+
+def test_stage_rejects_existing_version():
+    registry.commit(*registry.stage("v1"))
+    with pytest.raises(RegistryError):
+        registry.stage("v1")
+
+
+def test_default_versions_never_collide():
+    versions = {registry.stage()[0] for _ in range(3)}
+    assert len(versions) == 3
+
+
+def test_train_duplicate_version_is_409():
+    registry.stage("v1")
+    r = TestClient(app).post("/train", files={"file": ("a.csv", b"x\n1\n")}, data={"version": "v1"})
+    assert r.status_code == 409
@@ -0,0 +1,20 @@
+# Run from services/score: python -m pytest tests
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_batch_malformed_json_is_422():
+    r = client.post("/score/batch", content=b"{bad")
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_batch_malformed_ndjson_reports_line():
+    r = client.post("/score/batch", content=b'{"eid": "a"}\n{bad\n',
+                    headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 422
+    assert r.json()["detail"]["line"] == 2
+    assert r.json()["detail"]["errors"][0]["type"] == "json_invalid"
@@ -0,0 +1,21 @@
+# Run from services/score: python -m pytest tests
+import os
+
+from app.features import ApplicationRecord
+from app.score_core import score_applications
+
+APPS = [ApplicationRecord(eid="a", avg_monthly_income=3000.0), ApplicationRecord(eid="b", total_debt=50000.0)]
+
+
+def test_reasons_come_with_the_scores(model_dir):
+    results = score_applications(APPS, model_dir, top_k=3)
+    assert [r["eid"] for r in results] == ["a", "b"]
+    assert all(len(r["reasons"]) == 3 for r in results)
+
+
+def test_scoring_survives_a_broken_explainer(model_dir, caplog):
+    os.remove(os.path.join(model_dir, "feature_meta.json"))
+    results = score_applications(APPS, model_dir, top_k=3)
+    assert [r["decision"] for r in results] == [r["decision"] for r in score_applications(APPS, model_dir)]
+    assert all("reasons" not in r for r in results)
+    assert "explanations unavailable" in caplog.text
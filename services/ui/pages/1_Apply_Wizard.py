@@ -115,5 +115,9 @@ def page():
             documents, extracts, attach = upload_extract_attach(app_id, applicant, files_with_types, st.session_state["form"])
         st.session_state.update({"documents": documents, "extracts": extracts})
         st.success(f"Attached {attach.get('attached', 0)} extracts to application {app_id}. Go to Review & Chat page.")
+        for er in extracts:
+            if er.get("status") == "error":
+                err = er.get("error") or {}
+                st.warning(f"Could not extract {er.get('doc_type')} ({er.get('doc_id')}): {err.get('message', 'unknown error')}")
 
 page()
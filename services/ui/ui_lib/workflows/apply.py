@@ -25,6 +25,7 @@ def upload_extract_attach(
     2) POST /extract/batch (ev service)
     3) POST /applications/{eid}/attach-extracts (orchestrator)
     Returns: (documents, extracts, attach_resp)
+    Failed extracts (status="error") are returned but not attached.
     """
     # 1) ingest
     ingest_resp = docs_client.ingest(
@@ -59,6 +60,22 @@ def upload_extract_attach(
         eid_raw=eid_raw,
     )
 
+    # Retry only the documents that failed transiently; successful extracts are kept as-is.
+    retry_ids = {
+        er["doc_id"] for er in extracts
+        if er.get("status") == "error" and (er.get("error") or {}).get("retryable")
+    }
+    if retry_ids:
+        retried = ev_client.extract_batch(
+            application_id=app_id,
+            applicant_eid=applicant["emirates_id"],
+            documents=[d for d in documents if d.get("doc_id") in retry_ids],
+            form=form,
+            eid_raw=eid_raw,
+        )
+        by_id = {er["doc_id"]: er for er in retried}
+        extracts = [by_id.get(er["doc_id"], er) for er in extracts]
+
     # 3) attach
     attach_resp = orch_client.attach_extracts(
         eid=applicant["emirates_id"],